@@ -657,6 +657,36 @@ async def demo_earthquake_prediction(latitude: float = 37.7749, longitude: float
         "note": "This is a demo prediction with random values"
     }
 
+BATCH_HANDLERS = {
+    "flood": predict_flood,
+    "earthquake": predict_earthquake
+}
+
+@app.post("/api/v1/predict/batch")
+async def predict_batch(batch: dict):
+    """Run several flood/earthquake predictions in one request.
+
+    Body: {"requests": [{"kind": "flood", "data": {...}}, ...]}. Responses
+    come back in request order; a failing item gets an error entry instead
+    of failing the whole batch.
+    """
+    items = batch.get('requests')
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Batch body must contain a 'requests' list")
+
+    responses = []
+    for item in items:
+        handler = BATCH_HANDLERS.get(item.get('kind')) if isinstance(item, dict) else None
+        if handler is None:
+            responses.append({"status_code": 400, "detail": f"Unknown prediction kind: {item.get('kind') if isinstance(item, dict) else item}"})
+            continue
+        try:
+            responses.append(await handler(item.get('data') or {}))
+        except HTTPException as e:
+            responses.append({"status_code": e.status_code, "detail": e.detail})
+
+    return {"responses": responses}
+
 # Prediction calculation functions
 def calculate_flood_probability(temperature, humidity, precipitation_24h, precipitation_48h,
                                wind_speed, water_level, river_flow, elevation, soil_type):
@@ -871,6 +901,7 @@ if __name__ == "__main__":
     print("❤️  Health: http://localhost:8000/health")
     print("🔮 Flood Prediction: http://localhost:8000/api/v1/predict/flood")
     print("🏔️  Earthquake Prediction: http://localhost:8000/api/v1/predict/earthquake")
+    print("📦 Batch Prediction: http://localhost:8000/api/v1/predict/batch")
 
     uvicorn.run(
         app,
@@ -94,20 +94,19 @@ def create_indexes(database_url: str):
         engine = create_engine(database_url)
         
         indexes = [
+            # Location + time indexes for weather, seismic and gauge data are declared on the models
+            
             # Weather data indexes
             "CREATE INDEX IF NOT EXISTS idx_weather_timestamp ON weather_data(timestamp)",
-            "CREATE INDEX IF NOT EXISTS idx_weather_location ON weather_data(latitude, longitude)",
             "CREATE INDEX IF NOT EXISTS idx_weather_created_at ON weather_data(created_at)",
             
             # Seismic data indexes
             "CREATE INDEX IF NOT EXISTS idx_seismic_timestamp ON seismic_data(timestamp)",
-            "CREATE INDEX IF NOT EXISTS idx_seismic_location ON seismic_data(latitude, longitude)",
             "CREATE INDEX IF NOT EXISTS idx_seismic_magnitude ON seismic_data(magnitude)",
             "CREATE INDEX IF NOT EXISTS idx_seismic_event_id ON seismic_data(event_id)",
             
             # River gauge data indexes
             "CREATE INDEX IF NOT EXISTS idx_gauge_timestamp ON river_gauge_data(timestamp)",
-            "CREATE INDEX IF NOT EXISTS idx_gauge_location ON river_gauge_data(latitude, longitude)",
             "CREATE INDEX IF NOT EXISTS idx_gauge_id ON river_gauge_data(gauge_id)",
             
             # Prediction indexes
@@ -115,6 +114,9 @@ def create_indexes(database_url: str):
             "CREATE INDEX IF NOT EXISTS idx_flood_pred_location ON flood_predictions(latitude, longitude)",
             "CREATE INDEX IF NOT EXISTS idx_earthquake_pred_time ON earthquake_predictions(prediction_time)",
             "CREATE INDEX IF NOT EXISTS idx_earthquake_pred_location ON earthquake_predictions(latitude, longitude)",
+            # Recent-predictions endpoints: newest first, read straight off the index
+            "CREATE INDEX IF NOT EXISTS idx_flood_pred_created_desc ON flood_predictions(created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_earthquake_pred_created_desc ON earthquake_predictions(created_at DESC)",
             
             # Alert indexes
             "CREATE INDEX IF NOT EXISTS idx_alerts_active ON alerts(is_active)",
@@ -138,6 +140,10 @@ def create_indexes(database_url: str):
                     logger.warning(f"Could not create index: {e}")
             
             conn.commit()
+            
+            if 'postgresql' in database_url:
+                create_spatial_indexes(conn)
+                create_brin_indexes(conn)
         
         engine.dispose()
         logger.info("Database indexes created successfully")
@@ -147,6 +153,45 @@ def create_indexes(database_url: str):
         raise
 
 
+def create_spatial_indexes(conn):
+    """Create PostGIS expression indexes used by radius queries (see src/api/geo.py)"""
+    tables = [
+        "weather_data", "river_gauge_data", "seismic_data",
+        "flood_predictions", "earthquake_predictions", "alerts", "historical_disasters"
+    ]
+    
+    for table in tables:
+        index_sql = (
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_geog ON {table} USING GIST "
+            f"(geography(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)))"
+        )
+        try:
+            with conn.begin_nested():
+                conn.execute(text(index_sql))
+            logger.info(f"Spatial index created: idx_{table}_geog")
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not create spatial index on {table}: {e}")
+    
+    conn.commit()
+
+
+def create_brin_indexes(conn):
+    """Create BRIN indexes for created_at range scans on the append-only sensor tables"""
+    tables = ["weather_data", "river_gauge_data", "seismic_data"]
+    
+    for table in tables:
+        index_sql = f"CREATE INDEX IF NOT EXISTS idx_{table}_created_brin ON {table} USING BRIN (created_at)"
+        try:
+            with conn.begin_nested():
+                conn.execute(text(index_sql))
+                conn.execute(text(f"ANALYZE {table}"))
+            logger.info(f"BRIN index created: idx_{table}_created_brin")
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not create BRIN index on {table}: {e}")
+    
+    conn.commit()
+
+
 def insert_sample_data(database_url: str):
     """Insert sample data for testing"""
     try:
@@ -0,0 +1,78 @@
+"""
+Response caching for read-only endpoints
+"""
+import os
+import functools
+import inspect
+
+from fastapi import Request, Response
+
+from ..utils.cache import TTLCache
+
+_MISSING = object()
+
+# Seconds a cached aggregate response stays fresh; 0 turns response caching off
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+
+class _CachedResponse:
+    """Body, status and headers of a Response an endpoint built itself"""
+
+    def __init__(self, response: Response):
+        self.body = response.body
+        self.status_code = response.status_code
+        self.raw_headers = list(response.raw_headers)
+
+    def build(self) -> Response:
+        """A new Response, so each request's headers are its own"""
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = list(self.raw_headers)
+        return response
+
+
+def cached_response(ttl: float = RESPONSE_CACHE_TTL, maxsize: int = 256):
+    """Cache an async endpoint's result for ttl seconds, keyed by path and query.
+
+    Responses carry X-Cache: HIT or MISS. Errors raised as HTTPException are
+    not cached, nor are streaming responses, and a ttl of 0 leaves the
+    endpoint uncached.
+    """
+    def decorator(endpoint):
+        if ttl <= 0:
+            return endpoint
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, _cache_request: Request, _cache_response: Response, **kwargs):
+            key = (_cache_request.url.path, tuple(sorted(_cache_request.query_params.multi_items())))
+            value = cache.get(key, _MISSING)
+            status = "HIT"
+            if value is _MISSING:
+                value = await endpoint(*args, **kwargs)
+                # Endpoints that build their own Response bypass the injected one;
+                # cache its contents, never the object every request would share
+                if isinstance(value, Response):
+                    if not hasattr(value, "body"):
+                        return value
+                    value = _CachedResponse(value)
+                cache.set(key, value)
+                status = "MISS"
+
+            if isinstance(value, _CachedResponse):
+                response = value.build()
+                response.headers["X-Cache"] = status
+                return response
+            _cache_response.headers["X-Cache"] = status
+            return value
+
+        # Expose the endpoint's own parameters plus the request/response FastAPI injects
+        signature = inspect.signature(endpoint)
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            inspect.Parameter("_cache_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response)
+        ])
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
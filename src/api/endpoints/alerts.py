@@ -7,7 +7,9 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 import logging
 
+from ..caching import cached_response
 from ..database import get_db
+from ..geo import within_radius
 from ...models.schemas import AlertCreate, AlertResponse
 from ...models.database import Alert
 
@@ -69,13 +71,7 @@ async def get_alerts(
         
         # Location filter
         if latitude is not None and longitude is not None:
-            lat_range = radius_km / 111.0
-            lon_range = radius_km / (111.0 * abs(latitude))
-            
-            query = query.filter(
-                Alert.latitude.between(latitude - lat_range, latitude + lat_range),
-                Alert.longitude.between(longitude - lon_range, longitude + lon_range)
-            )
+            query = query.filter(*within_radius(db, Alert, latitude, longitude, radius_km))
         
         alerts = query.order_by(Alert.created_at.desc()).limit(limit).all()
         return alerts
@@ -139,6 +135,7 @@ async def delete_alert(alert_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/statistics/summary")
+@cached_response()
 async def get_alert_statistics(db: Session = Depends(get_db)):
     """Get alert statistics and summary"""
     try:
@@ -1,14 +1,17 @@
 """
 Dashboard API endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, cast, bindparam, literal_column, DateTime, Text
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 import logging
 
+from ..caching import cached_response
 from ..database import get_db
+from ..geo import bounding_box
+from ..metrics import time_query
 from ...models.schemas import DashboardData, AlertResponse
 from ...models.database import (
     Alert, WeatherData, SeismicData, RiverGaugeData,
@@ -20,23 +23,27 @@ router = APIRouter()
 
 
 @router.get("/summary", response_model=DashboardData)
+@cached_response()
 async def get_dashboard_summary(db: Session = Depends(get_db)):
     """Get dashboard summary data"""
     try:
         # Active alerts
-        active_alerts = db.query(Alert).filter(
-            Alert.is_active == True,
-            (Alert.expires_at.is_(None)) | (Alert.expires_at > datetime.utcnow())
-        ).order_by(Alert.created_at.desc()).limit(10).all()
+        with time_query("dashboard_summary", "active_alerts"):
+            active_alerts = db.query(Alert).filter(
+                Alert.is_active == True,
+                (Alert.expires_at.is_(None)) | (Alert.expires_at > datetime.utcnow())
+            ).order_by(Alert.created_at.desc()).limit(10).all()
         
         # Recent predictions
-        recent_flood_predictions = db.query(FloodPrediction).order_by(
-            FloodPrediction.created_at.desc()
-        ).limit(5).all()
+        with time_query("dashboard_summary", "flood_predictions"):
+            recent_flood_predictions = db.query(FloodPrediction).order_by(
+                FloodPrediction.created_at.desc()
+            ).limit(5).all()
         
-        recent_earthquake_predictions = db.query(EarthquakePrediction).order_by(
-            EarthquakePrediction.created_at.desc()
-        ).limit(5).all()
+        with time_query("dashboard_summary", "earthquake_predictions"):
+            recent_earthquake_predictions = db.query(EarthquakePrediction).order_by(
+                EarthquakePrediction.created_at.desc()
+            ).limit(5).all()
         
         recent_predictions = {
             "flood": [
@@ -68,12 +75,14 @@ async def get_dashboard_summary(db: Session = Depends(get_db)):
         
         # Weather summary
         last_24h = datetime.utcnow() - timedelta(hours=24)
-        weather_summary = get_weather_summary(db, last_24h)
+        with time_query("dashboard_summary", "weather_summary"):
+            weather_summary = get_weather_summary(db, last_24h)
         
         # Recent seismic activity
-        recent_seismic = db.query(SeismicData).filter(
-            SeismicData.timestamp >= last_24h
-        ).order_by(SeismicData.timestamp.desc()).limit(10).all()
+        with time_query("dashboard_summary", "seismic_activity"):
+            recent_seismic = db.query(SeismicData).filter(
+                SeismicData.timestamp >= last_24h
+            ).order_by(SeismicData.timestamp.desc()).limit(10).all()
         
         seismic_activity = [
             {
@@ -90,7 +99,8 @@ async def get_dashboard_summary(db: Session = Depends(get_db)):
         ]
         
         # System status
-        system_status = get_system_status(db)
+        with time_query("dashboard_summary", "system_status"):
+            system_status = get_system_status(db)
         
         return DashboardData(
             active_alerts=active_alerts,
@@ -106,6 +116,7 @@ async def get_dashboard_summary(db: Session = Depends(get_db)):
 
 
 @router.get("/map-data")
+@cached_response()
 async def get_map_data(
     latitude: float,
     longitude: float,
@@ -115,113 +126,90 @@ async def get_map_data(
     """Get map data for a specific region"""
     try:
         # Calculate bounding box
-        lat_range = radius_km / 111.0
-        lon_range = radius_km / (111.0 * abs(latitude))
+        bbox = bounding_box(latitude, longitude, radius_km)
         
-        # Recent earthquakes
-        last_30d = datetime.utcnow() - timedelta(days=30)
-        earthquakes = db.query(SeismicData).filter(
-            SeismicData.timestamp >= last_30d,
-            SeismicData.latitude.between(latitude - lat_range, latitude + lat_range),
-            SeismicData.longitude.between(longitude - lon_range, longitude + lon_range)
-        ).all()
-        
-        # Active alerts in region
-        alerts = db.query(Alert).filter(
-            Alert.is_active == True,
-            Alert.latitude.between(latitude - lat_range, latitude + lat_range),
-            Alert.longitude.between(longitude - lon_range, longitude + lon_range)
-        ).all()
-        
-        # Recent predictions
-        flood_predictions = db.query(FloodPrediction).filter(
-            FloodPrediction.latitude.between(latitude - lat_range, latitude + lat_range),
-            FloodPrediction.longitude.between(longitude - lon_range, longitude + lon_range),
-            FloodPrediction.created_at >= datetime.utcnow() - timedelta(hours=24)
-        ).all()
-        
-        earthquake_predictions = db.query(EarthquakePrediction).filter(
-            EarthquakePrediction.latitude.between(latitude - lat_range, latitude + lat_range),
-            EarthquakePrediction.longitude.between(longitude - lon_range, longitude + lon_range),
-            EarthquakePrediction.created_at >= datetime.utcnow() - timedelta(hours=24)
-        ).all()
+        # Named parameters so every section shares the same bounding box values
+        min_lat, max_lat, min_lon, max_lon = (
+            bindparam(name, value)
+            for name, value in zip(("min_lat", "max_lat", "min_lon", "max_lon"), bbox)
+        )
         
-        # River gauges
-        gauges = db.query(RiverGaugeData).filter(
-            RiverGaugeData.latitude.between(latitude - lat_range, latitude + lat_range),
-            RiverGaugeData.longitude.between(longitude - lon_range, longitude + lon_range),
-            RiverGaugeData.timestamp >= datetime.utcnow() - timedelta(hours=6)
-        ).all()
+        def in_region(model):
+            return (
+                model.latitude.between(min_lat, max_lat),
+                model.longitude.between(min_lon, max_lon)
+            )
         
-        return {
-            "earthquakes": [
-                {
-                    "id": eq.id,
-                    "latitude": eq.latitude,
-                    "longitude": eq.longitude,
-                    "magnitude": eq.magnitude,
-                    "depth": eq.depth,
-                    "timestamp": eq.timestamp,
-                    "place": eq.place
-                }
-                for eq in earthquakes
-            ],
-            "alerts": [
-                {
-                    "id": alert.id,
-                    "latitude": alert.latitude,
-                    "longitude": alert.longitude,
-                    "alert_type": alert.alert_type,
-                    "severity": alert.severity,
-                    "title": alert.title,
-                    "created_at": alert.created_at
-                }
-                for alert in alerts
-            ],
-            "flood_predictions": [
-                {
-                    "id": fp.id,
-                    "latitude": fp.latitude,
-                    "longitude": fp.longitude,
-                    "probability": fp.flood_probability,
-                    "risk_level": fp.risk_level,
-                    "prediction_time": fp.prediction_time
-                }
-                for fp in flood_predictions
-            ],
-            "earthquake_predictions": [
-                {
-                    "id": ep.id,
-                    "latitude": ep.latitude,
-                    "longitude": ep.longitude,
-                    "probability": ep.risk_probability,
-                    "estimated_magnitude": ep.estimated_magnitude,
-                    "risk_level": ep.risk_level,
-                    "prediction_time": ep.prediction_time
-                }
-                for ep in earthquake_predictions
-            ],
-            "river_gauges": [
-                {
-                    "id": gauge.id,
-                    "gauge_id": gauge.gauge_id,
-                    "latitude": gauge.latitude,
-                    "longitude": gauge.longitude,
-                    "water_level": gauge.water_level,
-                    "flood_stage": gauge.flood_stage,
-                    "station_name": gauge.station_name,
-                    "timestamp": gauge.timestamp
-                }
-                for gauge in gauges
-            ]
+        now = datetime.utcnow()
+        sections = {
+            # Recent earthquakes
+            "earthquakes": db.query(_json_array(db, {
+                "id": SeismicData.id,
+                "latitude": SeismicData.latitude,
+                "longitude": SeismicData.longitude,
+                "magnitude": SeismicData.magnitude,
+                "depth": SeismicData.depth,
+                "timestamp": SeismicData.timestamp,
+                "place": SeismicData.place
+            })).filter(SeismicData.timestamp >= now - timedelta(days=30), *in_region(SeismicData)),
+            # Active alerts in region
+            "alerts": db.query(_json_array(db, {
+                "id": Alert.id,
+                "latitude": Alert.latitude,
+                "longitude": Alert.longitude,
+                "alert_type": Alert.alert_type,
+                "severity": Alert.severity,
+                "title": Alert.title,
+                "created_at": Alert.created_at
+            })).filter(Alert.is_active == True, *in_region(Alert)),
+            # Recent predictions
+            "flood_predictions": db.query(_json_array(db, {
+                "id": FloodPrediction.id,
+                "latitude": FloodPrediction.latitude,
+                "longitude": FloodPrediction.longitude,
+                "probability": FloodPrediction.flood_probability,
+                "risk_level": FloodPrediction.risk_level,
+                "prediction_time": FloodPrediction.prediction_time
+            })).filter(FloodPrediction.created_at >= now - timedelta(hours=24), *in_region(FloodPrediction)),
+            "earthquake_predictions": db.query(_json_array(db, {
+                "id": EarthquakePrediction.id,
+                "latitude": EarthquakePrediction.latitude,
+                "longitude": EarthquakePrediction.longitude,
+                "probability": EarthquakePrediction.risk_probability,
+                "estimated_magnitude": EarthquakePrediction.estimated_magnitude,
+                "risk_level": EarthquakePrediction.risk_level,
+                "prediction_time": EarthquakePrediction.prediction_time
+            })).filter(EarthquakePrediction.created_at >= now - timedelta(hours=24), *in_region(EarthquakePrediction)),
+            # River gauges
+            "river_gauges": db.query(_json_array(db, {
+                "id": RiverGaugeData.id,
+                "gauge_id": RiverGaugeData.gauge_id,
+                "latitude": RiverGaugeData.latitude,
+                "longitude": RiverGaugeData.longitude,
+                "water_level": RiverGaugeData.water_level,
+                "flood_stage": RiverGaugeData.flood_stage,
+                "station_name": RiverGaugeData.station_name,
+                "timestamp": RiverGaugeData.timestamp
+            })).filter(RiverGaugeData.timestamp >= now - timedelta(hours=6), *in_region(RiverGaugeData))
         }
         
+        # All sections in one round-trip, each arriving as a ready-made JSON array
+        with time_query("map_data", "all_sections"):
+            row = db.query(*[
+                query.scalar_subquery().label(name) for name, query in sections.items()
+            ]).one()
+        payload = ",".join(
+            f'"{name}":{value or "[]"}' for name, value in zip(sections, row)
+        )
+        return Response(content="{" + payload + "}", media_type="application/json")
+        
     except Exception as e:
         logger.error(f"Error getting map data: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving map data")
 
 
 @router.get("/analytics")
+@cached_response()
 async def get_analytics_data(
     days: int = 30,
     db: Session = Depends(get_db)
@@ -231,35 +219,38 @@ async def get_analytics_data(
         start_date = datetime.utcnow() - timedelta(days=days)
         
         # Alert trends
-        alert_trends = db.query(
-            func.date(Alert.created_at).label('date'),
-            Alert.alert_type,
-            func.count(Alert.id).label('count')
-        ).filter(
-            Alert.created_at >= start_date
-        ).group_by(
-            func.date(Alert.created_at),
-            Alert.alert_type
-        ).all()
+        with time_query("analytics", "alert_trends"):
+            alert_trends = db.query(
+                func.date(Alert.created_at).label('date'),
+                Alert.alert_type,
+                func.count(Alert.id).label('count')
+            ).filter(
+                Alert.created_at >= start_date
+            ).group_by(
+                func.date(Alert.created_at),
+                Alert.alert_type
+            ).all()
         
         # Earthquake magnitude distribution
-        earthquake_distribution = db.query(
-            func.floor(SeismicData.magnitude).label('magnitude_range'),
-            func.count(SeismicData.id).label('count')
-        ).filter(
-            SeismicData.timestamp >= start_date
-        ).group_by(
-            func.floor(SeismicData.magnitude)
-        ).all()
+        with time_query("analytics", "earthquake_distribution"):
+            earthquake_distribution = db.query(
+                func.floor(SeismicData.magnitude).label('magnitude_range'),
+                func.count(SeismicData.id).label('count')
+            ).filter(
+                SeismicData.timestamp >= start_date
+            ).group_by(
+                func.floor(SeismicData.magnitude)
+            ).all()
         
         # Prediction accuracy (simplified)
-        flood_predictions_count = db.query(FloodPrediction).filter(
-            FloodPrediction.created_at >= start_date
-        ).count()
-        
-        earthquake_predictions_count = db.query(EarthquakePrediction).filter(
-            EarthquakePrediction.created_at >= start_date
-        ).count()
+        with time_query("analytics", "prediction_counts"):
+            flood_predictions_count = db.query(FloodPrediction).filter(
+                FloodPrediction.created_at >= start_date
+            ).count()
+            
+            earthquake_predictions_count = db.query(EarthquakePrediction).filter(
+                EarthquakePrediction.created_at >= start_date
+            ).count()
         
         return {
             "alert_trends": [
@@ -344,3 +335,21 @@ def get_system_status(db: Session) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Error getting system status: {e}")
         return {"status": "error", "last_updated": datetime.utcnow()}
+
+
+def _json_array(db: Session, fields: Dict[str, Any]):
+    """Aggregate rows into a JSON array on the database side"""
+    dialect = db.get_bind().dialect.name
+    pairs = []
+    for key, column in fields.items():
+        if dialect != "postgresql" and isinstance(column.type, DateTime):
+            # SQLite stores "YYYY-MM-DD HH:MM:SS"; emit ISO 8601 like the API does
+            column = func.replace(column, " ", "T")
+        pairs.extend([literal_column(f"'{key}'"), column])
+    
+    if dialect == "postgresql":
+        return cast(
+            func.coalesce(func.json_agg(func.json_build_object(*pairs)), literal_column("'[]'::json")),
+            Text
+        )
+    return func.json_group_array(func.json_object(*pairs))
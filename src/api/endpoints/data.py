@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 import logging
 
 from ..database import get_db
+from ..geo import within_radius
 from ...models.schemas import (
     WeatherDataCreate, WeatherDataResponse,
     SeismicDataCreate, SeismicDataResponse,
@@ -57,13 +58,7 @@ async def get_weather_data(
         
         # Location filter (simplified bounding box)
         if latitude is not None and longitude is not None:
-            lat_range = radius_km / 111.0  # Approximate km to degrees
-            lon_range = radius_km / (111.0 * abs(latitude))
-            
-            query = query.filter(
-                WeatherData.latitude.between(latitude - lat_range, latitude + lat_range),
-                WeatherData.longitude.between(longitude - lon_range, longitude + lon_range)
-            )
+            query = query.filter(*within_radius(db, WeatherData, latitude, longitude, radius_km))
         
         weather_data = query.order_by(WeatherData.timestamp.desc()).limit(limit).all()
         return weather_data
@@ -115,13 +110,7 @@ async def get_seismic_data(
         
         # Location filter
         if latitude is not None and longitude is not None:
-            lat_range = radius_km / 111.0
-            lon_range = radius_km / (111.0 * abs(latitude))
-            
-            query = query.filter(
-                SeismicData.latitude.between(latitude - lat_range, latitude + lat_range),
-                SeismicData.longitude.between(longitude - lon_range, longitude + lon_range)
-            )
+            query = query.filter(*within_radius(db, SeismicData, latitude, longitude, radius_km))
         
         seismic_data = query.order_by(SeismicData.timestamp.desc()).limit(limit).all()
         return seismic_data
@@ -173,13 +162,7 @@ async def get_river_gauge_data(
         
         # Location filter
         if latitude is not None and longitude is not None:
-            lat_range = radius_km / 111.0
-            lon_range = radius_km / (111.0 * abs(latitude))
-            
-            query = query.filter(
-                RiverGaugeData.latitude.between(latitude - lat_range, latitude + lat_range),
-                RiverGaugeData.longitude.between(longitude - lon_range, longitude + lon_range)
-            )
+            query = query.filter(*within_radius(db, RiverGaugeData, latitude, longitude, radius_km))
         
         gauge_data = query.order_by(RiverGaugeData.timestamp.desc()).limit(limit).all()
         return gauge_data
@@ -231,13 +214,7 @@ async def get_historical_disasters(
         
         # Location filter
         if latitude is not None and longitude is not None:
-            lat_range = radius_km / 111.0
-            lon_range = radius_km / (111.0 * abs(latitude))
-            
-            query = query.filter(
-                HistoricalDisaster.latitude.between(latitude - lat_range, latitude + lat_range),
-                HistoricalDisaster.longitude.between(longitude - lon_range, longitude + lon_range)
-            )
+            query = query.filter(*within_radius(db, HistoricalDisaster, latitude, longitude, radius_km))
         
         disasters = query.order_by(HistoricalDisaster.event_date.desc()).limit(limit).all()
         return disasters
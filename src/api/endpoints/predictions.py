@@ -1,27 +1,99 @@
 """
 Prediction API endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, Response
+from sqlalchemy import select, bindparam
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import time
 
 from ..database import get_db
+from ..geo import within_radius, radius_clauses, radius_params
+from ..metrics import time_query
+from ...utils.cache import ttl_cache
 from ...models.schemas import (
     PredictionRequest, FloodPredictionResponse, EarthquakePredictionResponse,
     FloodPredictionCreate, EarthquakePredictionCreate
 )
 from ...models.database import FloodPrediction, EarthquakePrediction, WeatherData, SeismicData, RiverGaugeData
-from ...models.flood_predictor import FloodPredictor
-from ...models.earthquake_predictor import EarthquakePredictor
+from ...models.flood_predictor import FloodPredictor, WEATHER_DTYPE, RIVER_DTYPE, records_to_array
+from ...models.earthquake_predictor import EarthquakePredictor, records_to_columns
+
+# orjson is optional; stdlib json produces the same compact text, just slower
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize predictors (in production, these would be loaded from saved models)
-flood_predictor = FloodPredictor()
-earthquake_predictor = EarthquakePredictor()
+
+def _load_predictor(predictor_class, path: Optional[str]):
+    """Shared predictor for a saved model file, or an untrained one without a model"""
+    if path and os.path.exists(path):
+        try:
+            return predictor_class.get_shared(path)
+        except Exception as e:
+            logger.error(f"Error loading model from {path}: {e}")
+    return predictor_class()
+
+
+# Saved models are set with FLOOD_MODEL_PATH / EARTHQUAKE_MODEL_PATH; without
+# them the predictors are untrained and return default predictions
+flood_predictor = _load_predictor(FloodPredictor, os.getenv("FLOOD_MODEL_PATH"))
+earthquake_predictor = _load_predictor(EarthquakePredictor, os.getenv("EARTHQUAKE_MODEL_PATH"))
+
+
+def _features_json(features: list) -> str:
+    """Serialize feature names for the features_used JSON column"""
+    if orjson is not None:
+        return orjson.dumps(features).decode()
+    return json.dumps(features, separators=(',', ':'), ensure_ascii=False)
+
+
+def _predict_flood(weather, river, location_data: dict) -> dict:
+    """Flood features and prediction for one location.
+
+    Worker threads share one predictor. predict() never refits the scaler or
+    models, and the feature caches it fills are guarded by their own locks,
+    so concurrent calls are safe.
+    """
+    features = flood_predictor.feature_vector(weather, river, location_data)
+    return flood_predictor.predict(features)
+
+
+def _predict_earthquake(seismic_data, location_data: dict) -> dict:
+    """Earthquake features and prediction for one location; thread-safe like _predict_flood"""
+    features = earthquake_predictor.feature_vector(seismic_data, location_data)
+    return earthquake_predictor.predict(features)
+
+
+def warm_up_predictors():
+    """Run dummy predictions through each predictor so the first request doesn't pay for it.
+
+    This is the single warm-up entry point. The inputs are shaped like real
+    ones (multi-row columns, a catalog busy enough for the b-value), so the
+    feature kernels compile for the signatures requests will use.
+    """
+    now = datetime.utcnow()
+    readings = [{'timestamp': now - timedelta(hours=h)} for h in range(2)]
+    weather = records_to_array(readings, WEATHER_DTYPE)
+    river = records_to_array(readings, RIVER_DTYPE)
+    _predict_flood(weather, river, {'elevation': 0, 'slope': 0, 'soil_type': 0, 'land_use': 0})
+    
+    seismic = [{
+        'timestamp': now - timedelta(hours=h), 'latitude': 0.0, 'longitude': 0.0,
+        'magnitude': 3.0 + 0.1 * h, 'depth': 10.0
+    } for h in range(12)]
+    _predict_earthquake(seismic, {'latitude': 0.0, 'longitude': 0.0})
 
 
 @router.post("/flood", response_model=FloodPredictionResponse)
@@ -33,45 +105,7 @@ async def predict_flood(
     """Generate flood prediction for a location"""
     try:
         # Get recent weather and river data for the location
-        recent_time = datetime.utcnow() - timedelta(hours=72)
-        
-        # Query weather data within 50km radius (simplified)
-        weather_data = db.query(WeatherData).filter(
-            WeatherData.created_at >= recent_time,
-            WeatherData.latitude.between(request.latitude - 0.5, request.latitude + 0.5),
-            WeatherData.longitude.between(request.longitude - 0.5, request.longitude + 0.5)
-        ).all()
-        
-        # Query river gauge data
-        river_data = db.query(RiverGaugeData).filter(
-            RiverGaugeData.created_at >= recent_time,
-            RiverGaugeData.latitude.between(request.latitude - 0.5, request.latitude + 0.5),
-            RiverGaugeData.longitude.between(request.longitude - 0.5, request.longitude + 0.5)
-        ).all()
-        
-        # Convert to dictionaries
-        weather_dict = [
-            {
-                'timestamp': w.timestamp,
-                'temperature': w.temperature,
-                'humidity': w.humidity,
-                'pressure': w.pressure,
-                'precipitation': w.precipitation,
-                'wind_speed': w.wind_speed
-            }
-            for w in weather_data
-        ]
-        
-        river_dict = [
-            {
-                'timestamp': r.timestamp,
-                'water_level': r.water_level,
-                'flow_rate': r.flow_rate,
-                'gauge_height': r.gauge_height,
-                'flood_stage': r.flood_stage
-            }
-            for r in river_data
-        ]
+        weather, river = _load_flood_inputs(db, request.latitude, request.longitude)
         
         # Location data (would be enhanced with real GIS data)
         location_data = {
@@ -81,11 +115,8 @@ async def predict_flood(
             'land_use': 1
         }
         
-        # Prepare features
-        features = flood_predictor.prepare_features(weather_dict, river_dict, location_data)
-        
-        # Make prediction
-        prediction_result = flood_predictor.predict(features)
+        # Feature prep and inference are CPU-bound; keep them off the event loop
+        prediction_result = await asyncio.to_thread(_predict_flood, weather, river, location_data)
         
         # Create prediction record
         prediction_time = datetime.utcnow() + timedelta(hours=request.hours_ahead)
@@ -98,12 +129,13 @@ async def predict_flood(
             risk_level=prediction_result['risk_level'],
             confidence_score=prediction_result['confidence'],
             model_version="1.0",
-            features_used=str(prediction_result['features_used'])
+            features_used=_features_json(prediction_result['features_used'])
         )
         
-        db.add(flood_prediction)
-        db.commit()
-        db.refresh(flood_prediction)
+        with time_query("predict_flood", "insert_prediction"):
+            db.add(flood_prediction)
+            db.commit()
+            db.refresh(flood_prediction)
         
         # Schedule alert check in background
         if prediction_result['flood_probability'] > 0.7:
@@ -125,26 +157,7 @@ async def predict_earthquake(
     """Generate earthquake risk assessment for a location"""
     try:
         # Get recent seismic data
-        recent_time = datetime.utcnow() - timedelta(days=30)
-        
-        # Query seismic data within 500km radius
-        seismic_data = db.query(SeismicData).filter(
-            SeismicData.created_at >= recent_time,
-            SeismicData.latitude.between(request.latitude - 5, request.latitude + 5),
-            SeismicData.longitude.between(request.longitude - 5, request.longitude + 5)
-        ).all()
-        
-        # Convert to dictionaries
-        seismic_dict = [
-            {
-                'timestamp': s.timestamp,
-                'latitude': s.latitude,
-                'longitude': s.longitude,
-                'magnitude': s.magnitude,
-                'depth': s.depth
-            }
-            for s in seismic_data
-        ]
+        seismic_dict = _load_seismic_inputs(db, request.latitude, request.longitude)
         
         # Location data
         location_data = {
@@ -155,11 +168,8 @@ async def predict_earthquake(
             'slope': 0.1
         }
         
-        # Prepare features
-        features = earthquake_predictor.prepare_features(seismic_dict, location_data)
-        
-        # Make prediction
-        prediction_result = earthquake_predictor.predict(features)
+        # Feature prep and inference are CPU-bound; keep them off the event loop
+        prediction_result = await asyncio.to_thread(_predict_earthquake, seismic_dict, location_data)
         
         # Create prediction record
         prediction_time = datetime.utcnow() + timedelta(hours=request.hours_ahead)
@@ -173,12 +183,13 @@ async def predict_earthquake(
             risk_level=prediction_result['risk_level'],
             confidence_score=prediction_result['confidence'],
             model_version="1.0",
-            features_used=str(prediction_result['features_used'])
+            features_used=_features_json(prediction_result['features_used'])
         )
         
-        db.add(earthquake_prediction)
-        db.commit()
-        db.refresh(earthquake_prediction)
+        with time_query("predict_earthquake", "insert_prediction"):
+            db.add(earthquake_prediction)
+            db.commit()
+            db.refresh(earthquake_prediction)
         
         # Schedule alert check in background
         if prediction_result['risk_probability'] > 0.8:
@@ -193,6 +204,8 @@ async def predict_earthquake(
 
 @router.get("/flood/recent", response_model=List[FloodPredictionResponse])
 async def get_recent_flood_predictions(
+    request: Request,
+    response: Response,
     limit: int = 10,
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
@@ -201,20 +214,18 @@ async def get_recent_flood_predictions(
 ):
     """Get recent flood predictions"""
     try:
-        query = db.query(FloodPrediction).order_by(FloodPrediction.created_at.desc())
+        # Same statement with or without a location; only the bound values change
+        stmt = _recent_predictions_stmt(FloodPrediction, FloodPredictionResponse, db.get_bind().dialect.name)
+        params = radius_params(latitude, longitude, radius_km)
         
-        # Filter by location if provided
-        if latitude is not None and longitude is not None:
-            # Simple bounding box filter (would use PostGIS in production)
-            lat_range = radius_km / 111.0  # Approximate km to degrees
-            lon_range = radius_km / (111.0 * abs(latitude))
-            
-            query = query.filter(
-                FloodPrediction.latitude.between(latitude - lat_range, latitude + lat_range),
-                FloodPrediction.longitude.between(longitude - lon_range, longitude + lon_range)
-            )
+        with time_query("recent_flood_predictions", "predictions"):
+            predictions = db.execute(stmt, {**params, "limit": limit}).mappings().all()
         
-        predictions = query.limit(limit).all()
+        # Dashboard polls get a 304 until a prediction is added or removed
+        etag = _rows_etag(predictions)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
         return predictions
         
     except Exception as e:
@@ -224,6 +235,8 @@ async def get_recent_flood_predictions(
 
 @router.get("/earthquake/recent", response_model=List[EarthquakePredictionResponse])
 async def get_recent_earthquake_predictions(
+    request: Request,
+    response: Response,
     limit: int = 10,
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
@@ -232,19 +245,18 @@ async def get_recent_earthquake_predictions(
 ):
     """Get recent earthquake predictions"""
     try:
-        query = db.query(EarthquakePrediction).order_by(EarthquakePrediction.created_at.desc())
+        # Same statement with or without a location; only the bound values change
+        stmt = _recent_predictions_stmt(EarthquakePrediction, EarthquakePredictionResponse, db.get_bind().dialect.name)
+        params = radius_params(latitude, longitude, radius_km)
         
-        # Filter by location if provided
-        if latitude is not None and longitude is not None:
-            lat_range = radius_km / 111.0
-            lon_range = radius_km / (111.0 * abs(latitude))
-            
-            query = query.filter(
-                EarthquakePrediction.latitude.between(latitude - lat_range, latitude + lat_range),
-                EarthquakePrediction.longitude.between(longitude - lon_range, longitude + lon_range)
-            )
+        with time_query("recent_earthquake_predictions", "predictions"):
+            predictions = db.execute(stmt, {**params, "limit": limit}).mappings().all()
         
-        predictions = query.limit(limit).all()
+        # Dashboard polls get a 304 until a prediction is added or removed
+        etag = _rows_etag(predictions)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
         return predictions
         
     except Exception as e:
@@ -252,6 +264,99 @@ async def get_recent_earthquake_predictions(
         raise HTTPException(status_code=500, detail="Error retrieving earthquake predictions")
 
 
+def _rows_etag(rows) -> str:
+    """Weak ETag identifying a list of prediction rows"""
+    digest = hashlib.sha1(repr([(row["id"], row["created_at"]) for row in rows]).encode()).hexdigest()
+    return f'W/"{len(rows)}-{digest[:16]}"'
+
+
+# Sensor data only changes every few minutes; reuse query results for nearby,
+# near-simultaneous requests
+_INPUT_CACHE_TTL = 60
+
+
+def _input_cache_key(db: Session, latitude: float, longitude: float):
+    # Keyed by engine too: sessions bound to another database must not share results
+    return (db.get_bind(), round(latitude, 2), round(longitude, 2), int(time.time() // _INPUT_CACHE_TTL))
+
+
+def _no_flood_inputs(inputs) -> bool:
+    weather, river = inputs
+    return len(weather) == 0 and len(river) == 0
+
+
+def _no_seismic_inputs(columns) -> bool:
+    return len(columns['timestamp']) == 0
+
+
+# No readings are not cached, so rows inserted meanwhile are picked up by the next request
+@ttl_cache(ttl=_INPUT_CACHE_TTL, maxsize=4096, key=_input_cache_key, is_empty=_no_flood_inputs)
+def _load_flood_inputs(db: Session, latitude: float, longitude: float):
+    """Recent weather and river gauge readings near a location as structured arrays"""
+    recent_time = datetime.utcnow() - timedelta(hours=72)
+    
+    # Select plain columns so rows come back as tuples, not ORM objects
+    with time_query("predict_flood", "weather_data"):
+        weather_rows = db.execute(
+            select(
+                WeatherData.timestamp, WeatherData.temperature, WeatherData.humidity,
+                WeatherData.pressure, WeatherData.precipitation, WeatherData.wind_speed
+            ).where(
+                WeatherData.created_at >= recent_time,
+                *within_radius(db, WeatherData, latitude, longitude, 50)
+            )
+        ).all()
+    
+    with time_query("predict_flood", "river_data"):
+        river_rows = db.execute(
+            select(
+                RiverGaugeData.timestamp, RiverGaugeData.water_level, RiverGaugeData.flow_rate,
+                RiverGaugeData.gauge_height, RiverGaugeData.flood_stage
+            ).where(
+                RiverGaugeData.created_at >= recent_time,
+                *within_radius(db, RiverGaugeData, latitude, longitude, 50)
+            )
+        ).all()
+    
+    return records_to_array(weather_rows, WEATHER_DTYPE), records_to_array(river_rows, RIVER_DTYPE)
+
+
+@ttl_cache(ttl=_INPUT_CACHE_TTL, maxsize=4096, key=_input_cache_key, is_empty=_no_seismic_inputs)
+def _load_seismic_inputs(db: Session, latitude: float, longitude: float):
+    """Recent earthquakes within 500km of a location, as SeismicColumns"""
+    recent_time = datetime.utcnow() - timedelta(days=30)
+    
+    with time_query("predict_earthquake", "seismic_data"):
+        rows = db.execute(
+            select(
+                SeismicData.timestamp, SeismicData.latitude, SeismicData.longitude,
+                SeismicData.magnitude, SeismicData.depth
+            ).where(
+                SeismicData.created_at >= recent_time,
+                *within_radius(db, SeismicData, latitude, longitude, 500)
+            )
+        ).all()
+    
+    # Columns come back in SeismicBatch.NUMERIC order
+    return records_to_columns(rows)
+
+
+@lru_cache(maxsize=None)
+def _recent_predictions_stmt(model, schema, dialect_name: str):
+    """Build the fixed-shape recent predictions statement once per model and dialect.
+
+    Selects only the columns of the response schema, so rows come back as plain
+    mappings instead of hydrated ORM objects.
+    """
+    columns = [model.__table__.c[name] for name in schema.model_fields]
+    return (
+        select(*columns)
+        .where(*radius_clauses(model, dialect_name))
+        .order_by(model.created_at.desc())
+        .limit(bindparam("limit"))
+    )
+
+
 async def check_flood_alert(latitude: float, longitude: float, prediction: dict):
     """Background task to check if flood alert should be sent"""
     # This would integrate with the alert system
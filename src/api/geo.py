@@ -0,0 +1,90 @@
+"""
+Spatial filtering helpers for location-based queries
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, literal_column
+from sqlalchemy.orm import Session
+
+KM_PER_DEGREE = 111.0
+SRID = 4326
+
+# Larger than any great-circle distance; used when a query has no location filter
+WHOLE_EARTH_M = 2.1e7
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Get (min_lat, max_lat, min_lon, max_lon) of a box enclosing a radius around a point"""
+    lat_range = radius_km / KM_PER_DEGREE
+    # Degrees of longitude shrink with cos(latitude); clamp to stay finite at the poles
+    lon_range = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        latitude - lat_range,
+        latitude + lat_range,
+        longitude - lon_range,
+        longitude + lon_range
+    )
+
+
+def geography(model):
+    """Geography point built from a model's latitude/longitude columns.
+
+    Matches the GiST expression indexes created by scripts/setup_db.py.
+    """
+    return func.geography(
+        func.ST_SetSRID(func.ST_MakePoint(model.longitude, model.latitude), literal_column(str(SRID)))
+    )
+
+
+def within_radius(db: Session, model, latitude: float, longitude: float, radius_km: float) -> List:
+    """Filter clauses selecting rows within radius_km of a point"""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    clauses = [
+        model.latitude.between(min_lat, max_lat),
+        model.longitude.between(min_lon, max_lon)
+    ]
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Exact great-circle radius, served by the PostGIS expression index
+        point = func.geography(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), SRID))
+        clauses.append(func.ST_DWithin(geography(model), point, radius_km * 1000))
+
+    return clauses
+
+
+def radius_clauses(model, dialect_name: str) -> List:
+    """Radius filter written with named bind parameters.
+
+    The SQL is identical for every location (or none), so the compiled
+    statement can be reused. Supply values with radius_params().
+    """
+    clauses = [
+        model.latitude.between(bindparam("min_lat"), bindparam("max_lat")),
+        model.longitude.between(bindparam("min_lon"), bindparam("max_lon"))
+    ]
+
+    if dialect_name == "postgresql":
+        point = func.geography(func.ST_SetSRID(func.ST_MakePoint(bindparam("lon"), bindparam("lat")), SRID))
+        clauses.append(func.ST_DWithin(geography(model), point, bindparam("radius_m")))
+
+    return clauses
+
+
+def radius_params(latitude: Optional[float], longitude: Optional[float], radius_km: float) -> Dict[str, float]:
+    """Bind values for radius_clauses(); without a location the bounds cover the globe"""
+    if latitude is None or longitude is None:
+        return {
+            "min_lat": -90.0, "max_lat": 90.0,
+            "min_lon": -180.0, "max_lon": 180.0,
+            "lat": 0.0, "lon": 0.0,
+            "radius_m": WHOLE_EARTH_M
+        }
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    return {
+        "min_lat": min_lat, "max_lat": max_lat,
+        "min_lon": min_lon, "max_lon": max_lon,
+        "lat": latitude, "lon": longitude,
+        "radius_m": radius_km * 1000
+    }
@@ -0,0 +1,16 @@
+"""
+Prometheus metrics for the API
+"""
+from prometheus_client import Histogram
+
+# Database time per endpoint and query section
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "Time spent executing database queries",
+    ["endpoint", "section"]
+)
+
+
+def time_query(endpoint: str, section: str):
+    """Context manager that records the duration of a database query"""
+    return DB_QUERY_SECONDS.labels(endpoint, section).time()
@@ -0,0 +1,53 @@
+"""
+Standalone data collection process.
+
+Run with `python -m src.collector` alongside a multi-worker API server, where
+each worker would otherwise poll the same external APIs.
+"""
+import os
+import json
+import asyncio
+import logging
+
+from .api.database import init_database
+from .data.data_collector import DataCollectionManager
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_collection_locations():
+    """Locations to collect data for, from the COLLECTION_LOCATIONS JSON list"""
+    try:
+        return json.loads(os.getenv("COLLECTION_LOCATIONS", "[]"))
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid COLLECTION_LOCATIONS: {e}")
+        return []
+
+
+def collection_interval() -> int:
+    """Seconds between collection runs, from DATA_COLLECTION_INTERVAL"""
+    return int(os.getenv("DATA_COLLECTION_INTERVAL", 3600))
+
+
+async def run_collection():
+    """Collect data for the configured locations until cancelled"""
+    locations = load_collection_locations()
+    if not locations:
+        logger.error("COLLECTION_LOCATIONS is empty; nothing to collect")
+        return
+    await DataCollectionManager().start_scheduled_collection(locations, collection_interval())
+
+
+def main():
+    """Create the tables and run scheduled collection in this process"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    init_database()
+    asyncio.run(run_collection())
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,45 @@ Data collection from external APIs and sources
 import requests
 import asyncio
 import aiohttp
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
+import math
 import os
+import time
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 
+from ..models.earthquake_predictor import SeismicBatch
+from ..utils.cache import ttl_cache
+from ..utils.geo import haversine_km
+
 logger = logging.getLogger(__name__)
 
+# Upstream providers refresh roughly every 10 minutes
+COLLECTOR_CACHE_TTL = 600
+
+
+# In-flight requests allowed per collector (i.e. per upstream API)
+MAX_CONCURRENT_REQUESTS = 20
+
+
+def _time_bucket() -> int:
+    return int(time.time() // COLLECTOR_CACHE_TTL)
+
+
+def _cell_key(collector, lat: float, lon: float, *args, **kwargs):
+    """Cache key: collector, location rounded to 0.1 degrees and 10-minute window"""
+    return (type(collector).__name__, round(lat, 1), round(lon, 1), args,
+            tuple(sorted(kwargs.items())), _time_bucket())
+
+
+def _batch_key(collector, items, *args, **kwargs):
+    """Cache key for batched calls: the exact locations or site codes requested"""
+    return (type(collector).__name__, tuple(items), args,
+            tuple(sorted(kwargs.items())), _time_bucket())
+
 
 @dataclass
 class DataSource:
@@ -23,36 +54,148 @@ class DataSource:
     enabled: bool = True
 
 
-class WeatherDataCollector:
+def create_session() -> aiohttp.ClientSession:
+    """Create a pooled HTTP session for the collectors (keep-alive, cached DNS)"""
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector)
+
+
+class HTTPCollector:
+    """Base class for collectors sharing an HTTP session"""
+    
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        self.session = session
+        self._owns_session = False
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    def _client(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating a private one if none was supplied"""
+        if self.session is None or self.session.closed:
+            self.session = create_session()
+            self._owns_session = True
+        return self.session
+    
+    @asynccontextmanager
+    async def _get(self, url: str, **kwargs):
+        """GET through the shared session, bounded to MAX_CONCURRENT_REQUESTS in flight"""
+        async with self._semaphore:
+            async with self._client().get(url, **kwargs) as response:
+                yield response
+    
+    async def close(self):
+        """Close the session if this collector created it"""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+        self.session = None
+        self._owns_session = False
+
+
+class WeatherDataCollector(HTTPCollector):
     """Collect weather data from various APIs"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: Optional[aiohttp.ClientSession] = None):
+        super().__init__(session)
         self.api_key = api_key
         self.base_url = "http://api.openweathermap.org/data/2.5"
+        # OpenWeather city id per location, rounded to 0.01 degrees
+        self._station_ids: Dict[Tuple[float, float], int] = {}
     
+    @ttl_cache(ttl=COLLECTOR_CACHE_TTL, maxsize=4096, key=_cell_key)
     async def get_current_weather(self, lat: float, lon: float) -> Dict:
         """Get current weather data for a location"""
         try:
-            url = f"{self.base_url}/weather"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': 'metric'
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_weather_data(data, lat, lon)
-                    else:
-                        logger.error(f"Weather API error: {response.status}")
-                        return {}
+            data = await self._fetch_current_weather(lat, lon)
+            return self._parse_weather_data(data, lat, lon) if data else {}
         except Exception as e:
             logger.error(f"Error fetching weather data: {e}")
             return {}
     
+    @ttl_cache(ttl=COLLECTOR_CACHE_TTL, maxsize=256, key=_batch_key)
+    async def get_current_weather_batch(self, coords: List[Tuple[float, float]]) -> List[Dict]:
+        """Get current weather for many locations, 20 per request via the group endpoint"""
+        try:
+            raw: Dict[Tuple[float, float], Dict] = {}
+            
+            # Locations seen for the first time: the single call also yields their city id
+            unknown = [c for c in coords if self._station_key(*c) not in self._station_ids]
+            responses = await asyncio.gather(
+                *(self._fetch_current_weather(lat, lon) for lat, lon in unknown),
+                return_exceptions=True
+            )
+            for coord, data in zip(unknown, responses):
+                if isinstance(data, Exception) or not data:
+                    continue
+                raw[coord] = data
+                if data.get('id'):
+                    self._station_ids[self._station_key(*coord)] = data['id']
+            
+            # Known locations: one request per 20 city ids
+            by_station: Dict[int, List[Tuple[float, float]]] = {}
+            for coord in coords:
+                station_id = self._station_ids.get(self._station_key(*coord))
+                if station_id is not None and coord not in raw:
+                    by_station.setdefault(station_id, []).append(coord)
+            
+            station_ids = list(by_station)
+            groups = await asyncio.gather(
+                *(self._fetch_group(station_ids[i:i + 20]) for i in range(0, len(station_ids), 20)),
+                return_exceptions=True
+            )
+            for group in groups:
+                if isinstance(group, Exception):
+                    logger.error(f"Weather group request failed: {group}")
+                    continue
+                for item in group:
+                    for coord in by_station.get(item.get('id'), []):
+                        raw[coord] = item
+            
+            results = []
+            for lat, lon in coords:
+                if (lat, lon) in raw:
+                    parsed = self._parse_weather_data(raw[(lat, lon)], lat, lon)
+                    if parsed:
+                        results.append(parsed)
+            return results
+        except Exception as e:
+            logger.error(f"Error fetching batched weather data: {e}")
+            return []
+    
+    @staticmethod
+    def _station_key(lat: float, lon: float) -> Tuple[float, float]:
+        return (round(lat, 2), round(lon, 2))
+    
+    async def _fetch_current_weather(self, lat: float, lon: float) -> Dict:
+        """Fetch the raw current weather response for a location"""
+        url = f"{self.base_url}/weather"
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'appid': self.api_key,
+            'units': 'metric'
+        }
+        
+        async with self._get(url, params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            logger.error(f"Weather API error: {response.status}")
+            return {}
+    
+    async def _fetch_group(self, station_ids: List[int]) -> List[Dict]:
+        """Fetch current weather for up to 20 city ids in one request"""
+        url = f"{self.base_url}/group"
+        params = {
+            'id': ','.join(str(i) for i in station_ids),
+            'appid': self.api_key,
+            'units': 'metric'
+        }
+        
+        async with self._get(url, params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+                return data.get('list', [])
+            logger.error(f"Weather group API error: {response.status}")
+            return []
+    
     async def get_weather_forecast(self, lat: float, lon: float, hours: int = 48) -> List[Dict]:
         """Get weather forecast data"""
         try:
@@ -64,14 +207,13 @@ class WeatherDataCollector:
                 'units': 'metric'
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_forecast_data(data, lat, lon, hours)
-                    else:
-                        logger.error(f"Forecast API error: {response.status}")
-                        return []
+            async with self._get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._parse_forecast_data(data, lat, lon, hours)
+                else:
+                    logger.error(f"Forecast API error: {response.status}")
+                    return []
         except Exception as e:
             logger.error(f"Error fetching forecast data: {e}")
             return []
@@ -132,15 +274,17 @@ class WeatherDataCollector:
             return []
 
 
-class SeismicDataCollector:
+class SeismicDataCollector(HTTPCollector):
     """Collect seismic data from USGS and other sources"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        super().__init__(session)
         self.base_url = "https://earthquake.usgs.gov/fdsnws/event/1/query"
     
+    @ttl_cache(ttl=COLLECTOR_CACHE_TTL, maxsize=4096, key=_cell_key)
     async def get_recent_earthquakes(self, lat: float, lon: float, 
                                    radius_km: float = 500, 
-                                   days: int = 30) -> List[Dict]:
+                                   days: int = 30) -> SeismicBatch:
         """Get recent earthquakes near a location"""
         try:
             end_time = datetime.utcnow()
@@ -156,56 +300,112 @@ class SeismicDataCollector:
                 'minmagnitude': 2.0
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_seismic_data(data)
-                    else:
-                        logger.error(f"USGS API error: {response.status}")
-                        return []
+            async with self._get(self.base_url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._parse_seismic_data(data)
+                else:
+                    logger.error(f"USGS API error: {response.status}")
+                    return SeismicBatch.empty()
         except Exception as e:
             logger.error(f"Error fetching seismic data: {e}")
-            return []
+            return SeismicBatch.empty()
+    
+    @ttl_cache(ttl=COLLECTOR_CACHE_TTL, maxsize=256, key=_batch_key)
+    async def get_recent_earthquakes_batch(self, coords: List[Tuple[float, float]],
+                                           radius_km: float = 500,
+                                           days: int = 30) -> SeismicBatch:
+        """Get recent earthquakes near any of the locations with one bounding-box query"""
+        try:
+            if not coords:
+                return SeismicBatch.empty()
+            
+            lats = np.array([c[0] for c in coords], dtype=float)
+            lons = np.array([c[1] for c in coords], dtype=float)
+            
+            lat_range = radius_km / 111.0
+            max_abs_lat = min(float(np.abs(lats).max()) + lat_range, 89.0)
+            lon_range = radius_km / (111.0 * math.cos(math.radians(max_abs_lat)))
+            
+            min_lon = float(lons.min()) - lon_range
+            max_lon = float(lons.max()) + lon_range
+            if min_lon < -180.0 or max_lon > 180.0:
+                # The circles cross the antimeridian; query every longitude and let the distance filter trim
+                min_lon, max_lon = -180.0, 180.0
+            
+            end_time = datetime.utcnow()
+            start_time = end_time - timedelta(days=days)
+            
+            params = {
+                'format': 'geojson',
+                'minlatitude': max(float(lats.min()) - lat_range, -90.0),
+                'maxlatitude': min(float(lats.max()) + lat_range, 90.0),
+                'minlongitude': min_lon,
+                'maxlongitude': max_lon,
+                'starttime': start_time.isoformat(),
+                'endtime': end_time.isoformat(),
+                'minmagnitude': 2.0
+            }
+            
+            async with self._get(self.base_url, params=params) as response:
+                if response.status != 200:
+                    logger.error(f"USGS API error: {response.status}")
+                    return SeismicBatch.empty()
+                data = await response.json()
+            
+            earthquakes = self._parse_seismic_data(data)
+            if len(earthquakes) == 0:
+                return earthquakes
+            
+            # The box is larger than the union of circles; keep events within radius of a location
+            distances = haversine_km(
+                earthquakes.latitude[:, None], earthquakes.longitude[:, None], lats[None, :], lons[None, :]
+            )
+            keep = (distances <= radius_km).any(axis=1)
+            
+            return earthquakes.take(keep)
+        except Exception as e:
+            logger.error(f"Error fetching batched seismic data: {e}")
+            return SeismicBatch.empty()
     
-    def _parse_seismic_data(self, data: Dict) -> List[Dict]:
-        """Parse USGS earthquake data"""
+    def _parse_seismic_data(self, data: Dict) -> SeismicBatch:
+        """Parse USGS earthquake data into preallocated columns in one pass"""
         try:
-            earthquakes = []
             features = data.get('features', [])
+            batch = SeismicBatch.empty(len(features))
+            n = 0
             
             for feature in features:
                 properties = feature.get('properties', {})
-                geometry = feature.get('geometry', {})
-                coordinates = geometry.get('coordinates', [])
+                coordinates = feature.get('geometry', {}).get('coordinates', [])
                 
                 if len(coordinates) >= 3:
-                    earthquake = {
-                        'event_id': properties.get('ids', '').split(',')[0],
-                        'timestamp': datetime.fromtimestamp(properties.get('time', 0) / 1000),
-                        'latitude': coordinates[1],
-                        'longitude': coordinates[0],
-                        'magnitude': properties.get('mag'),
-                        'depth': coordinates[2],
-                        'magnitude_type': properties.get('magType'),
-                        'place': properties.get('place'),
-                        'source': 'usgs',
-                        'significance': properties.get('sig')
-                    }
-                    earthquakes.append(earthquake)
+                    magnitude = properties.get('mag')
+                    batch.timestamp[n] = properties.get('time', 0)
+                    batch.latitude[n] = coordinates[1]
+                    batch.longitude[n] = coordinates[0]
+                    batch.magnitude[n] = np.nan if magnitude is None else magnitude
+                    batch.depth[n] = coordinates[2]
+                    batch.event_id[n] = properties.get('ids', '').split(',')[0]
+                    batch.magnitude_type[n] = properties.get('magType')
+                    batch.place[n] = properties.get('place')
+                    batch.significance[n] = properties.get('sig')
+                    n += 1
             
-            return earthquakes
+            return batch.take(slice(0, n))
         except Exception as e:
             logger.error(f"Error parsing seismic data: {e}")
-            return []
+            return SeismicBatch.empty()
 
 
-class RiverGaugeCollector:
+class RiverGaugeCollector(HTTPCollector):
     """Collect river gauge data from USGS Water Services"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        super().__init__(session)
         self.base_url = "https://waterservices.usgs.gov/nwis/iv"
     
+    @ttl_cache(ttl=COLLECTOR_CACHE_TTL, maxsize=1024, key=_batch_key)
     async def get_gauge_data(self, site_codes: List[str]) -> List[Dict]:
         """Get current river gauge readings"""
         try:
@@ -216,14 +416,13 @@ class RiverGaugeCollector:
                 'period': 'P1D'  # Last 1 day
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_gauge_data(data)
-                    else:
-                        logger.error(f"USGS Water API error: {response.status}")
-                        return []
+            async with self._get(self.base_url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._parse_gauge_data(data)
+                else:
+                    logger.error(f"USGS Water API error: {response.status}")
+                    return []
         except Exception as e:
             logger.error(f"Error fetching gauge data: {e}")
             return []
@@ -232,26 +431,40 @@ class RiverGaugeCollector:
         """Parse USGS water data"""
         try:
             gauge_readings = []
+            skipped = 0
             time_series = data.get('value', {}).get('timeSeries', [])
             
             for series in time_series:
                 site_info = series.get('sourceInfo', {})
                 values = series.get('values', [{}])[0].get('value', [])
+                no_data = series.get('variable', {}).get('noDataValue')
                 
                 if values:
                     latest_value = values[-1]
+                    # Screen out readings USGS marks as missing up front, so one gap
+                    # is skipped instead of raising and discarding the whole batch
+                    reading = latest_value.get('value')
+                    if not latest_value.get('dateTime') or reading in (None, ''):
+                        skipped += 1
+                        continue
+                    water_level = float(reading)
+                    if no_data is not None and water_level == no_data:
+                        skipped += 1
+                        continue
                     
                     gauge_reading = {
                         'gauge_id': site_info.get('siteCode', [{}])[0].get('value'),
-                        'timestamp': datetime.fromisoformat(latest_value.get('dateTime', '').replace('Z', '+00:00')),
+                        'timestamp': datetime.fromisoformat(latest_value.get('dateTime', '')),
                         'latitude': float(site_info.get('geoLocation', {}).get('geogLocation', {}).get('latitude', 0)),
                         'longitude': float(site_info.get('geoLocation', {}).get('geogLocation', {}).get('longitude', 0)),
-                        'water_level': float(latest_value.get('value', 0)),
+                        'water_level': water_level,
                         'station_name': site_info.get('siteName'),
                         'river_name': site_info.get('siteName', '').split(' ')[0]  # Simplified
                     }
                     gauge_readings.append(gauge_reading)
             
+            if skipped:
+                logger.warning(f"Skipping {skipped} gauge readings without data")
             return gauge_readings
         except Exception as e:
             logger.error(f"Error parsing gauge data: {e}")
@@ -266,76 +479,75 @@ class DataCollectionManager:
         self.seismic_collector = SeismicDataCollector()
         self.river_collector = RiverGaugeCollector()
         self.collection_tasks = []
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    @property
+    def collectors(self) -> List[HTTPCollector]:
+        """All collectors managed here"""
+        return [self.weather_collector, self.seismic_collector, self.river_collector]
+    
+    async def __aenter__(self):
+        """Open one pooled session shared by all collectors"""
+        self._session = create_session()
+        for collector in self.collectors:
+            collector.session = self._session
+            collector._owns_session = False
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        for collector in self.collectors:
+            await collector.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
     
     async def collect_all_data(self, locations: List[Dict]) -> Dict:
         """Collect data from all sources for given locations"""
         try:
             all_data = {
                 'weather': [],
-                'seismic': [],
+                'seismic': SeismicBatch.empty(),
                 'river_gauge': []
             }
             
-            tasks = []
+            coords = [(loc['latitude'], loc['longitude']) for loc in locations]
+            gauge_sites = sorted({site for loc in locations for site in loc.get('gauge_sites', [])})
             
-            for location in locations:
-                lat, lon = location['latitude'], location['longitude']
-                
-                # Weather data
-                tasks.append(self.weather_collector.get_current_weather(lat, lon))
-                
-                # Seismic data
-                tasks.append(self.seismic_collector.get_recent_earthquakes(lat, lon))
-                
-                # River gauge data (if site codes provided)
-                if 'gauge_sites' in location:
-                    tasks.append(self.river_collector.get_gauge_data(location['gauge_sites']))
+            # One batched call per source instead of one call per location and source
+            tasks = {
+                'weather': self.weather_collector.get_current_weather_batch(coords),
+                'seismic': self.seismic_collector.get_recent_earthquakes_batch(coords)
+            }
+            if gauge_sites:
+                tasks['river_gauge'] = self.river_collector.get_gauge_data(gauge_sites)
             
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
             
-            # Process results
-            for i, result in enumerate(results):
+            for source, result in zip(tasks, results):
                 if isinstance(result, Exception):
-                    logger.error(f"Data collection task {i} failed: {result}")
+                    logger.error(f"{source} data collection failed: {result}")
                     continue
-                
-                # Categorize results based on task type
-                if i % 3 == 0:  # Weather data
-                    if result:
-                        all_data['weather'].append(result)
-                elif i % 3 == 1:  # Seismic data
-                    all_data['seismic'].extend(result)
-                else:  # River gauge data
-                    all_data['river_gauge'].extend(result)
+                all_data[source] = result
             
             return all_data
 
         except Exception as e:
             logger.error(f"Error in data collection: {e}")
-            return {'weather': [], 'seismic': [], 'river_gauge': []}
-
-    def start_scheduled_collection(self, locations: List[Dict], interval: int = 3600):
-        """Start scheduled data collection"""
-        import schedule
-        import time
-        import threading
-
-        def collect_data():
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                data = loop.run_until_complete(self.collect_all_data(locations))
-                logger.info(f"Collected data: {len(data['weather'])} weather, {len(data['seismic'])} seismic, {len(data['river_gauge'])} gauge records")
-            except Exception as e:
-                logger.error(f"Scheduled collection error: {e}")
-
-        schedule.every(interval).seconds.do(collect_data)
+            return {'weather': [], 'seismic': SeismicBatch.empty(), 'river_gauge': []}
 
-        def run_scheduler():
+    async def _periodic(self, locations: List[Dict], interval: int):
+        """Collect data every interval seconds until cancelled"""
+        async with self:
             while True:
-                schedule.run_pending()
-                time.sleep(60)
+                try:
+                    data = await self.collect_all_data(locations)
+                    logger.info(f"Collected data: {len(data['weather'])} weather, {len(data['seismic'])} seismic, {len(data['river_gauge'])} gauge records")
+                except Exception as e:
+                    logger.error(f"Scheduled collection error: {e}")
+                await asyncio.sleep(interval)
 
-        scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
+    def start_scheduled_collection(self, locations: List[Dict], interval: int = 3600) -> asyncio.Task:
+        """Start scheduled data collection on the running event loop; cancel the task to stop"""
+        task = asyncio.create_task(self._periodic(locations, interval))
         logger.info(f"Started scheduled data collection every {interval} seconds")
+        return task
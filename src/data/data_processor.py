@@ -3,163 +3,608 @@ Data processing and ETL pipeline
 """
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import postgresql, sqlite
 import logging
 import json
 import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from scipy.spatial import cKDTree
 # from geopy.distance import geodesic  # Simplified for Windows compatibility
 
 from ..models.database import (
     WeatherData, RiverGaugeData, SeismicData, 
     FloodPrediction, EarthquakePrediction, HistoricalDisaster
 )
+from ..utils.cache import TTLCache
+from ..utils.geo import EARTH_RADIUS_KM, bbox_mask, haversine_km
+from ..utils.jit import jit
 
 logger = logging.getLogger(__name__)
 
+# Below this many records a process pool costs more than it saves
+PARALLEL_MIN_RECORDS = 50000
+
+# Pool workers come from a fork server that imports this module once; forking
+# this process would copy the Numba/OpenMP thread pools, which are not fork-safe
+_POOL_CONTEXT = multiprocessing.get_context("forkserver")
+_POOL_CONTEXT.set_forkserver_preload([__name__])
+
+# Aggregates are reused until the data they were computed from is refreshed
+AGGREGATE_CACHE_TTL = 600
+
+# Weather fields summarised by aggregate_weather_data
+AGGREGATE_FIELDS = ('temperature', 'humidity', 'pressure', 'precipitation', 'wind_speed', 'visibility')
+
+# process_* method per data type (same names as detect_anomalies)
+PROCESS_METHODS = {
+    'weather': 'process_weather_data',
+    'seismic': 'process_seismic_data',
+    'river_gauge': 'process_river_gauge_data'
+}
+
+# Table receiving each data type's processed records
+INSERT_MODELS = {
+    'weather': WeatherData,
+    'seismic': SeismicData,
+    'river_gauge': RiverGaugeData
+}
+
+
+def _unit_vectors(lats, lons) -> np.ndarray:
+    """Points on the unit sphere for latitude/longitude in degrees"""
+    lat = np.radians(lats)
+    lon = np.radians(lons)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    """The non-NaN values of a float32 scan array, widened to float64"""
+    return values[~np.isnan(values)].astype(np.float64)
+
+
+def _mean_std(values: np.ndarray) -> Tuple[float, float]:
+    """Mean and sample std of a scan array, NaN when there are too few values.
+
+    Taken from the float32 values the masks compare, so a reading sits exactly
+    at the mean when all readings are equal.
+    """
+    values = _present(values)
+    mean = values.mean() if values.size else np.nan
+    std = values.std(ddof=1) if values.size > 1 else np.nan
+    return float(mean), float(std)
+
+
+def _quantile(values: np.ndarray, q: float) -> float:
+    """Linear-interpolated quantile of a scan array; NaN when it is all missing"""
+    values = _present(values)
+    return float(np.quantile(values, q)) if values.size else np.nan
+
+
+@jit(cache=True)
+def _outlier_mask(values, center, threshold):
+    """Mask of values further than threshold from center; NaN never counts"""
+    return np.abs(values - center) > threshold
+
+
+def _in_range(values: np.ndarray, lo: Optional[float], hi: Optional[float]) -> np.ndarray:
+    """values with anything outside [lo, hi] (None = open) set to NaN, in one pass.
+
+    Plain NumPy ufuncs, which drop the GIL on large arrays, so threads
+    cleaning separate shards run concurrently.
+    """
+    lo = -np.inf if lo is None else lo
+    hi = np.inf if hi is None else hi
+    return np.where((values >= lo) & (values <= hi), values, np.nan)
+
+
+def _process_chunk(method: str, records: List[Dict]) -> List[Dict]:
+    """Run a DataProcessor.process_* method in a worker process"""
+    return getattr(DataProcessor(), method)(records)
+
+
+def _chord_length(radius_km: float) -> float:
+    """Straight-line distance on the unit sphere matching a great-circle distance"""
+    return 2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+@dataclass
+class RunningStats:
+    """Running mean and variance (Welford), updated one value at a time"""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    @property
+    def std(self) -> float:
+        """Sample standard deviation, as pandas computes it; NaN below two values"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+
+@dataclass
+class RunningQuantile:
+    """Running estimate of one quantile in constant memory (the P-squared algorithm).
+
+    Five markers track the minimum, the quantile, the maximum and the points
+    halfway between; each update nudges the middle ones towards their ideal
+    positions along a parabola through their neighbours.
+    """
+    q: float
+    heights: List[float] = field(default_factory=list)
+    positions: List[float] = field(default_factory=lambda: [0.0, 1.0, 2.0, 3.0, 4.0])
+    
+    def update(self, value: float) -> None:
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        
+        if value < heights[0]:
+            heights[0] = value
+        elif value > heights[4]:
+            heights[4] = value
+        # Markers above the new value move one place up
+        k = next(i for i in range(1, 5) if value < heights[i] or i == 4)
+        for i in range(k, 5):
+            self.positions[i] += 1
+        
+        count = self.positions[4]
+        q = self.q
+        desired = (0.0, count * q / 2, count * q, count * (1 + q) / 2, count)
+        for i in (1, 2, 3):
+            d = desired[i] - self.positions[i]
+            below = self.positions[i] - self.positions[i - 1]
+            above = self.positions[i + 1] - self.positions[i]
+            if (d >= 1 and above > 1) or (d <= -1 and below > 1):
+                step = 1 if d > 0 else -1
+                height = heights[i] + step / (above + below) * (
+                    (below + step) * (heights[i + 1] - heights[i]) / above
+                    + (above - step) * (heights[i] - heights[i - 1]) / below
+                )
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        self.positions[i + step] - self.positions[i])
+                heights[i] = height
+                self.positions[i] += step
+    
+    @property
+    def value(self) -> float:
+        """Current estimate; exact (interpolated as pandas does) below five values, NaN with none"""
+        heights = self.heights
+        if not heights:
+            return math.nan
+        if len(heights) < 5 or self.positions[4] == 4:
+            position = self.q * (len(heights) - 1)
+            lo = math.floor(position)
+            hi = min(lo + 1, len(heights) - 1)
+            return heights[lo] + (heights[hi] - heights[lo]) * (position - lo)
+        return heights[2]
+
 
 class DataProcessor:
     """Process and clean collected data"""
     
-    def __init__(self, database_url: str):
-        self.engine = create_engine(database_url)
+    # Valid range per numeric field (inclusive); None leaves that side open
+    _RANGES: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+        'latitude': (-90, 90),
+        'longitude': (-180, 180),
+        'temperature': (-100, 60),  # Reasonable range in Celsius
+        'humidity': (0, 100),
+        'pressure': (800, 1200),  # Reasonable range in hPa
+        'precipitation': (0, None),
+        'wind_speed': (0, None),
+        'wind_direction': (0, 360),
+        'visibility': (0, None),
+        'magnitude': (0, None),
+        'depth': (0, None),
+        'water_level': (0, None),
+        'flow_rate': (0, None),
+        'gauge_height': (0, None),
+        'flood_stage': (0, None)
+    }
+    
+    def __init__(self, database_url: Optional[str] = None):
+        # Validation alone needs no database; worker processes run without one
+        self.engine = create_engine(database_url) if database_url else None
+        # (data batch, record count, KD-tree) for the last batch passed to build_index
+        self._index: Optional[Tuple[List[Dict], int, cKDTree]] = None
+        # (data batch, record count, column arrays) for the last batch aggregated
+        self._columns: Optional[Tuple[List[Dict], int, Dict[str, np.ndarray]]] = None
+        self._aggregate_cache = TTLCache(maxsize=1024, ttl=AGGREGATE_CACHE_TTL)
         
     def process_weather_data(self, raw_data: List[Dict]) -> List[Dict]:
         """Clean and validate weather data"""
-        processed_data = []
+        df = self._complete_records(raw_data, ['latitude', 'longitude', 'timestamp'], 'weather')
+        if df.empty:
+            return []
         
-        for record in raw_data:
-            try:
-                # Validate required fields
-                if not all(key in record for key in ['latitude', 'longitude', 'timestamp']):
-                    logger.warning(f"Skipping incomplete weather record: {record}")
-                    continue
-                
-                # Clean and validate values
-                processed_record = {
-                    'timestamp': self._parse_timestamp(record['timestamp']),
-                    'latitude': self._validate_latitude(record['latitude']),
-                    'longitude': self._validate_longitude(record['longitude']),
-                    'temperature': self._validate_temperature(record.get('temperature')),
-                    'humidity': self._validate_humidity(record.get('humidity')),
-                    'pressure': self._validate_pressure(record.get('pressure')),
-                    'precipitation': self._validate_precipitation(record.get('precipitation')),
-                    'wind_speed': self._validate_wind_speed(record.get('wind_speed')),
-                    'wind_direction': self._validate_wind_direction(record.get('wind_direction')),
-                    'visibility': self._validate_visibility(record.get('visibility')),
-                    'source': record.get('source', 'unknown')
-                }
-                
-                processed_data.append(processed_record)
-                
-            except Exception as e:
-                logger.error(f"Error processing weather record: {e}")
-                continue
+        processed = pd.DataFrame({
+            'timestamp': self._parse_timestamps(df['timestamp']),
+            'latitude': self._numeric(df, 'latitude'),
+            'longitude': self._numeric(df, 'longitude'),
+            'temperature': self._numeric(df, 'temperature'),
+            'humidity': self._numeric(df, 'humidity'),
+            'pressure': self._numeric(df, 'pressure'),
+            'precipitation': self._numeric(df, 'precipitation'),
+            'wind_speed': self._numeric(df, 'wind_speed'),
+            'wind_direction': self._numeric(df, 'wind_direction'),
+            'visibility': self._numeric(df, 'visibility'),
+            'source': self._text(df, 'source', 'unknown')
+        })
         
-        return processed_data
+        return self._valid_records(processed, ['timestamp', 'latitude', 'longitude'], 'weather')
     
     def process_seismic_data(self, raw_data: List[Dict]) -> List[Dict]:
         """Clean and validate seismic data"""
-        processed_data = []
+        df = self._complete_records(raw_data, ['event_id', 'timestamp', 'latitude', 'longitude', 'magnitude'], 'seismic')
+        if df.empty:
+            return []
         
-        for record in raw_data:
-            try:
-                # Validate required fields
-                if not all(key in record for key in ['event_id', 'latitude', 'longitude', 'magnitude']):
-                    logger.warning(f"Skipping incomplete seismic record: {record}")
-                    continue
-                
-                processed_record = {
-                    'event_id': str(record['event_id']),
-                    'timestamp': self._parse_timestamp(record['timestamp']),
-                    'latitude': self._validate_latitude(record['latitude']),
-                    'longitude': self._validate_longitude(record['longitude']),
-                    'magnitude': self._validate_magnitude(record['magnitude']),
-                    'depth': self._validate_depth(record.get('depth')),
-                    'magnitude_type': record.get('magnitude_type', 'unknown'),
-                    'place': record.get('place', ''),
-                    'source': record.get('source', 'unknown'),
-                    'significance': record.get('significance')
-                }
-                
-                processed_data.append(processed_record)
-                
-            except Exception as e:
-                logger.error(f"Error processing seismic record: {e}")
-                continue
+        processed = pd.DataFrame({
+            'event_id': self._ids(raw_data, df, 'event_id'),
+            'timestamp': self._parse_timestamps(df['timestamp']),
+            'latitude': self._numeric(df, 'latitude'),
+            'longitude': self._numeric(df, 'longitude'),
+            'magnitude': self._numeric(df, 'magnitude'),
+            'depth': self._numeric(df, 'depth'),
+            'magnitude_type': self._text(df, 'magnitude_type', 'unknown'),
+            'place': self._text(df, 'place', ''),
+            'source': self._text(df, 'source', 'unknown'),
+            'significance': self._integer(df, 'significance')
+        })
         
-        return processed_data
+        return self._valid_records(processed, ['timestamp', 'latitude', 'longitude', 'magnitude'], 'seismic')
     
     def process_river_gauge_data(self, raw_data: List[Dict]) -> List[Dict]:
         """Clean and validate river gauge data"""
-        processed_data = []
+        df = self._complete_records(raw_data, ['gauge_id', 'latitude', 'longitude'], 'gauge')
+        if df.empty:
+            return []
         
-        for record in raw_data:
-            try:
-                # Validate required fields
-                if not all(key in record for key in ['gauge_id', 'latitude', 'longitude']):
-                    logger.warning(f"Skipping incomplete gauge record: {record}")
-                    continue
-                
-                processed_record = {
-                    'gauge_id': str(record['gauge_id']),
-                    'timestamp': self._parse_timestamp(record.get('timestamp', datetime.utcnow())),
-                    'latitude': self._validate_latitude(record['latitude']),
-                    'longitude': self._validate_longitude(record['longitude']),
-                    'water_level': self._validate_water_level(record.get('water_level')),
-                    'flow_rate': self._validate_flow_rate(record.get('flow_rate')),
-                    'gauge_height': self._validate_gauge_height(record.get('gauge_height')),
-                    'flood_stage': self._validate_flood_stage(record.get('flood_stage')),
-                    'river_name': record.get('river_name', ''),
-                    'station_name': record.get('station_name', '')
-                }
-                
-                processed_data.append(processed_record)
-                
-            except Exception as e:
-                logger.error(f"Error processing gauge record: {e}")
+        processed = pd.DataFrame({
+            'gauge_id': self._ids(raw_data, df, 'gauge_id'),
+            # Readings without a timestamp are taken as current
+            'timestamp': self._parse_timestamps(df['timestamp'] if 'timestamp' in df else pd.Series(None, index=df.index)),
+            'latitude': self._numeric(df, 'latitude'),
+            'longitude': self._numeric(df, 'longitude'),
+            'water_level': self._numeric(df, 'water_level'),
+            'flow_rate': self._numeric(df, 'flow_rate'),
+            'gauge_height': self._numeric(df, 'gauge_height'),
+            'flood_stage': self._numeric(df, 'flood_stage'),
+            'river_name': self._text(df, 'river_name', ''),
+            'station_name': self._text(df, 'station_name', '')
+        })
+        
+        return self._valid_records(processed, ['timestamp', 'latitude', 'longitude'], 'gauge')
+    
+    def stream_process(self, raw_iter: Iterable[Dict], location: Tuple[float, float],
+                       radius_km: float = 50) -> Iterator[Tuple[Dict, bool]]:
+        """Validate weather records one at a time, yielding (record, is_anomaly).
+
+        The online counterpart of process_weather_data + detect_anomalies for
+        monitoring feeds: only records within radius_km of location are
+        yielded, and nothing is held but running statistics. Temperatures are
+        checked against the mean/std of earlier records and precipitation
+        against a running estimate of their 95th percentile (RunningQuantile),
+        so the first records are judged on little history. Use the batch
+        methods for backfills.
+        """
+        temperature = RunningStats()
+        precipitation_95th = RunningQuantile(0.95)
+        
+        for raw in raw_iter:
+            record = self._stream_record(raw)
+            if record is None:
                 continue
+            if self._calculate_distance(location, (record['latitude'], record['longitude'])) > radius_km:
+                continue
+            
+            is_anomaly = False
+            if record['temperature'] is not None:
+                is_anomaly = abs(record['temperature'] - temperature.mean) > 3 * temperature.std
+                temperature.update(record['temperature'])
+            
+            precipitation = record['precipitation']
+            if precipitation is not None:
+                is_anomaly |= precipitation > precipitation_95th.value
+                precipitation_95th.update(precipitation)
+            
+            yield record, is_anomaly
+    
+    def _stream_record(self, raw: Dict) -> Optional[Dict]:
+        """One raw weather record validated like process_weather_data; None if unusable"""
+        latitude = self._validate_range('latitude', raw.get('latitude'))
+        longitude = self._validate_range('longitude', raw.get('longitude'))
+        if latitude is None or longitude is None or raw.get('timestamp') is None:
+            return None
+        try:
+            timestamp = self._parse_timestamp(raw['timestamp'])
+        except (TypeError, ValueError):
+            return None
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        record = {'timestamp': timestamp, 'latitude': latitude, 'longitude': longitude}
+        for field in ('temperature', 'humidity', 'pressure', 'precipitation',
+                      'wind_speed', 'wind_direction', 'visibility'):
+            record[field] = self._validate_range(field, raw.get(field))
+        record['source'] = raw['source'] if raw.get('source') is not None else 'unknown'
+        return record
+    
+    def process_data_parallel(self, data_type: str, raw_data: List[Dict],
+                              workers: Optional[int] = None) -> List[Dict]:
+        """Clean and validate a large batch across CPU cores.
+
+        Splits raw_data into one contiguous chunk per worker, runs the matching
+        process_* method on each in a process pool and concatenates the results
+        in order. Small batches are processed in this process.
+        """
+        method = PROCESS_METHODS[data_type]
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(raw_data) < PARALLEL_MIN_RECORDS:
+            return getattr(self, method)(raw_data)
+        
+        size = math.ceil(len(raw_data) / workers)
+        chunks = [raw_data[i:i + size] for i in range(0, len(raw_data), size)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as pool:
+            results = pool.map(_process_chunk, [method] * len(chunks), chunks)
+            return list(chain.from_iterable(results))
+    
+    # Batch validation helpers
+    def _complete_records(self, raw_data: List[Dict], required: List[str], kind: str) -> pd.DataFrame:
+        """DataFrame of the records that have every required field; None counts as missing"""
+        df = pd.DataFrame(raw_data)
+        if df.empty:
+            return df
+        
+        missing = [key for key in required if key not in df.columns]
+        if missing:
+            logger.warning(f"Skipping {len(df)} incomplete {kind} records: missing {missing}")
+            return df.iloc[0:0]
+        
+        complete = df[required].notna().all(axis=1)
+        if not complete.all():
+            logger.warning(f"Skipping {int((~complete).sum())} incomplete {kind} records")
+        return df[complete]
+    
+    @classmethod
+    def _numeric(cls, df: pd.DataFrame, column: str) -> pd.Series:
+        """Column as floats; missing, non-numeric and out-of-range values become NaN"""
+        lo, hi = cls._RANGES[column]
+        if column not in df:
+            return pd.Series(np.nan, index=df.index)
+        values = df[column]
+        if values.dtype == object:
+            try:
+                values = values.astype(float)
+            except (TypeError, ValueError):
+                values = pd.to_numeric(values, errors='coerce')
+        return pd.Series(_in_range(values.to_numpy(dtype=np.float64, na_value=np.nan), lo, hi), index=df.index)
+    
+    @staticmethod
+    def _ids(raw_data: List[Dict], df: pd.DataFrame, column: str) -> pd.Series:
+        """Identifier column as strings, read from the raw records.
+
+        pandas stores integer ids in a column with gaps as floats, which
+        would turn 7 into '7.0'.
+        """
+        return pd.Series([str(raw_data[i][column]) for i in df.index], index=df.index, dtype=object)
+    
+    @staticmethod
+    def _integer(df: pd.DataFrame, column: str) -> pd.Series:
+        """Column as nullable integers"""
+        if column not in df:
+            return pd.Series(pd.NA, index=df.index, dtype='Int64')
+        return pd.to_numeric(df[column], errors='coerce').round().astype('Int64')
+    
+    @staticmethod
+    def _text(df: pd.DataFrame, column: str, default: str) -> pd.Series:
+        """Text column with missing values replaced by a default"""
+        if column not in df:
+            return pd.Series(default, index=df.index, dtype=object)
+        return df[column].where(df[column].notna(), default)
+    
+    def _parse_timestamps(self, values: pd.Series) -> pd.Series:
+        """Parse a timestamp column in bulk to naive UTC datetimes.
+
+        As in _parse_timestamp, missing values and anything that is neither a
+        string nor a datetime (e.g. epoch numbers) fall back to now;
+        unparseable strings become None.
+        """
+        current = ~values.map(lambda value: isinstance(value, (str, datetime)) and not pd.isna(value)).astype(bool)
+        parsed = pd.to_datetime(values.mask(current), utc=True, errors='coerce', format='ISO8601', cache=True)
+        parsed = parsed.dt.tz_convert(None).mask(current, pd.Timestamp(datetime.utcnow()))
+        return pd.Series(pd.DatetimeIndex(parsed).to_pydatetime(), index=values.index, dtype=object).where(parsed.notna(), None)
+    
+    @staticmethod
+    def _valid_records(processed: pd.DataFrame, required: List[str], kind: str) -> List[Dict]:
+        """Drop rows whose required fields failed validation and return plain records"""
+        valid = processed[required].notna().all(axis=1)
+        if not valid.all():
+            logger.error(f"Dropping {int((~valid).sum())} invalid {kind} records")
+        processed = processed[valid]
+        
+        # Column-wise conversion to Python values (NaN -> None) is much cheaper than to_dict('records')
+        columns = [values.astype(object).where(values.notna(), None).tolist() for _, values in processed.items()]
+        return [dict(zip(processed.columns, row)) for row in zip(*columns)]
+    
+    def bulk_insert(self, data_type: str, records: List[Dict]) -> int:
+        """Insert processed records in a single executemany round-trip.
+
+        The tables' CHECK constraints reject out-of-range values the database
+        sees; rows that already exist (e.g. a repeated event_id) are skipped.
+        Returns the number of records sent, or 0 if the insert failed.
+        """
+        if not records:
+            return 0
+        if self.engine is None:
+            raise ValueError("bulk_insert requires a database_url")
+        
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(self._insert_statement(INSERT_MODELS[data_type]), records)
+            return len(records)
+        except Exception as e:
+            logger.error(f"Error inserting {data_type} records: {e}")
+            return 0
+    
+    def _insert_statement(self, model):
+        """INSERT for model that ignores conflicts where the dialect supports it"""
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            return postgresql.insert(model).on_conflict_do_nothing()
+        if dialect == 'sqlite':
+            return sqlite.insert(model).on_conflict_do_nothing()
+        return insert(model)
+    
+    def build_index(self, data: List[Dict]) -> cKDTree:
+        """Build a spatial index over a batch of records.
+
+        aggregate_weather_data() uses it for later calls with the same batch,
+        turning each radius lookup from a full scan into a tree query.
+        """
+        tree = cKDTree(_unit_vectors(
+            np.fromiter((r['latitude'] for r in data), dtype=np.float64, count=len(data)),
+            np.fromiter((r['longitude'] for r in data), dtype=np.float64, count=len(data))
+        ))
+        self._index = (data, len(data), tree)
+        return tree
+    
+    def _indexed_tree(self, data: List[Dict]) -> Optional[cKDTree]:
+        """The KD-tree for this exact, unmodified batch, if one was built"""
+        if self._index is not None and self._index[0] is data and self._index[1] == len(data):
+            return self._index[2]
+        return None
+    
+    def _weather_columns(self, data: List[Dict]) -> Dict[str, np.ndarray]:
+        """Float arrays (NaN where missing) of a batch's coordinates and AGGREGATE_FIELDS.
+
+        Built once per batch and reused by later aggregations of it; has_<field>
+        marks the records that carry each field at all.
+        """
+        if self._columns is not None and self._columns[0] is data and self._columns[1] == len(data):
+            return self._columns[2]
         
-        return processed_data
+        columns = {
+            'latitude': np.fromiter((r['latitude'] for r in data), dtype=np.float64, count=len(data)),
+            'longitude': np.fromiter((r['longitude'] for r in data), dtype=np.float64, count=len(data))
+        }
+        for field in AGGREGATE_FIELDS:
+            columns[field] = np.array([r.get(field) for r in data], dtype=np.float64)
+            columns['has_' + field] = np.fromiter((field in r for r in data), dtype=bool, count=len(data))
+        self._columns = (data, len(data), columns)
+        return columns
+    
+    def _time_order(self, data: List[Dict], columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorted timestamps, each record's position in that order) for a batch.
+
+        Computed on the first windowed aggregation and kept with the batch's
+        columns, so every later window is two binary searches.
+        """
+        if 'timestamp_sorted' not in columns:
+            timestamps = self._utc_datetimes([r.get('timestamp') for r in data])
+            order = np.argsort(timestamps, kind='stable')
+            rank = np.empty_like(order)
+            rank[order] = np.arange(order.size)
+            columns['timestamp_sorted'] = timestamps[order]
+            columns['timestamp_rank'] = rank
+        return columns['timestamp_sorted'], columns['timestamp_rank']
+    
+    @staticmethod
+    def _utc_datetimes(values) -> np.ndarray:
+        """datetime64 array in naive UTC; missing or unparseable values are NaT (sorted last)"""
+        parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors='coerce', format='ISO8601')
+        return parsed.dt.tz_convert(None).to_numpy(dtype='datetime64[ns]')
     
     def aggregate_weather_data(self, data: List[Dict], 
                              location: Tuple[float, float], 
-                             radius_km: float = 50) -> Dict:
-        """Aggregate weather data for a location"""
+                             radius_km: float = 50,
+                             time_window: Optional[Tuple[datetime, datetime]] = None) -> Dict:
+        """Aggregate weather data for a location.
+
+        time_window=(start, end) restricts the aggregate to records with
+        start <= timestamp < end; naive datetimes are taken as UTC.
+        
+        Results are cached per (batch, location, radius, window) for
+        AGGREGATE_CACHE_TTL seconds; a batch is identified by the list object
+        and its length, so build a new list rather than editing records in place.
+        """
         try:
-            # Filter data within radius (simplified distance calculation)
-            nearby_data = []
-            for record in data:
-                distance = self._calculate_distance(location, (record['latitude'], record['longitude']))
-                if distance <= radius_km:
-                    nearby_data.append(record)
+            key = (id(data), len(data), tuple(location), radius_km, time_window)
+            cached = self._aggregate_cache.get(key)
+            # The cache holds a reference to the batch, so its id cannot be reused meanwhile
+            if cached is not None and cached[0] is data:
+                return dict(cached[1])
             
-            if not nearby_data:
-                return {}
+            columns = self._weather_columns(data)
+            tree = self._indexed_tree(data)
+            if tree is not None:
+                # Indexed batch: chord distance on the unit sphere is monotonic in great-circle distance
+                center = _unit_vectors(location[0], location[1])[0]
+                nearby = np.array(sorted(tree.query_ball_point(center, _chord_length(radius_km))), dtype=np.intp)
+            else:
+                # Filter data within radius: a bounding box discards most points, haversine checks the rest
+                lats, lons = columns['latitude'], columns['longitude']
+                candidates = np.flatnonzero(bbox_mask(lats, lons, location[0], location[1], radius_km))
+                distances = haversine_km(lats[candidates], lons[candidates], location[0], location[1])
+                nearby = candidates[distances <= radius_km]
+            
+            if time_window is not None:
+                # The window is a contiguous run of the time-sorted batch
+                timestamps, rank = self._time_order(data, columns)
+                start, end = np.searchsorted(timestamps, self._utc_datetimes(time_window))
+                nearby = nearby[(rank[nearby] >= start) & (rank[nearby] < end)]
             
-            # Calculate aggregates
-            df = pd.DataFrame(nearby_data)
+            if not nearby.size:
+                return {}
             
+            # Calculate aggregates on the selected slices
             aggregated = {
                 'location': location,
-                'count': len(nearby_data),
-                'avg_temperature': df['temperature'].mean() if 'temperature' in df else None,
-                'avg_humidity': df['humidity'].mean() if 'humidity' in df else None,
-                'avg_pressure': df['pressure'].mean() if 'pressure' in df else None,
-                'total_precipitation': df['precipitation'].sum() if 'precipitation' in df else None,
-                'max_wind_speed': df['wind_speed'].max() if 'wind_speed' in df else None,
-                'avg_visibility': df['visibility'].mean() if 'visibility' in df else None,
+                'count': int(nearby.size),
+                'avg_temperature': self._summary(columns, 'temperature', nearby, np.mean),
+                'avg_humidity': self._summary(columns, 'humidity', nearby, np.mean),
+                'avg_pressure': self._summary(columns, 'pressure', nearby, np.mean),
+                'total_precipitation': self._summary(columns, 'precipitation', nearby, np.sum, empty=0.0),
+                'max_wind_speed': self._summary(columns, 'wind_speed', nearby, np.max),
+                'avg_visibility': self._summary(columns, 'visibility', nearby, np.mean),
                 'timestamp': datetime.utcnow()
             }
             
-            return aggregated
+            self._aggregate_cache.set(key, (data, aggregated))
+            return dict(aggregated)
             
         except Exception as e:
             logger.error(f"Error aggregating weather data: {e}")
             return {}
     
+    @staticmethod
+    def _summary(columns: Dict[str, np.ndarray], field: str, rows: np.ndarray,
+                 reduce, empty: float = np.nan) -> Optional[float]:
+        """reduce() over a field's non-missing values in rows.
+
+        None when no row carries the field, empty when all its values are missing.
+        """
+        if not columns['has_' + field][rows].any():
+            return None
+        values = columns[field][rows]
+        values = values[~np.isnan(values)]
+        return float(reduce(values)) if values.size else empty
+    
     def detect_anomalies(self, data: List[Dict], data_type: str) -> List[Dict]:
         """Detect anomalies in the data"""
         try:
@@ -170,69 +615,74 @@ class DataProcessor:
             anomalies = []
             
             if data_type == 'weather':
-                # Temperature anomalies
-                if 'temperature' in df.columns:
-                    temp_mean = df['temperature'].mean()
-                    temp_std = df['temperature'].std()
-                    temp_threshold = 3 * temp_std
-                    
-                    temp_anomalies = df[abs(df['temperature'] - temp_mean) > temp_threshold]
-                    for _, row in temp_anomalies.iterrows():
-                        anomalies.append({
-                            'type': 'temperature_anomaly',
-                            'value': row['temperature'],
-                            'threshold': temp_threshold,
-                            'location': (row['latitude'], row['longitude']),
-                            'timestamp': row['timestamp']
-                        })
+                # Both checks read their columns once; flagged rows are gathered in one pass
+                temperature = self._column(df, 'temperature')
+                precipitation = self._column(df, 'precipitation')
+                temp_mean, temp_std = _mean_std(temperature)
+                temp_threshold = 3 * temp_std
+                precip_95th = _quantile(precipitation, 0.95)
                 
+                is_temp = _outlier_mask(temperature, np.float32(temp_mean), np.float32(temp_threshold))
+                is_heavy_rain = precipitation > np.float32(precip_95th)
+                hits = np.flatnonzero(is_temp | is_heavy_rain)
+                
+                # Temperature anomalies
+                anomalies.extend(self._anomalies(
+                    'temperature_anomaly', data, hits[is_temp[hits]], 'temperature', temp_threshold
+                ))
                 # Precipitation anomalies
-                if 'precipitation' in df.columns:
-                    precip_95th = df['precipitation'].quantile(0.95)
-                    heavy_rain = df[df['precipitation'] > precip_95th]
-                    
-                    for _, row in heavy_rain.iterrows():
-                        anomalies.append({
-                            'type': 'heavy_precipitation',
-                            'value': row['precipitation'],
-                            'threshold': precip_95th,
-                            'location': (row['latitude'], row['longitude']),
-                            'timestamp': row['timestamp']
-                        })
+                anomalies.extend(self._anomalies(
+                    'heavy_precipitation', data, hits[is_heavy_rain[hits]], 'precipitation', precip_95th
+                ))
             
             elif data_type == 'seismic':
                 # Magnitude anomalies
                 if 'magnitude' in df.columns:
-                    significant_earthquakes = df[df['magnitude'] >= 5.0]
+                    magnitude = self._column(df, 'magnitude')
                     
-                    for _, row in significant_earthquakes.iterrows():
-                        anomalies.append({
-                            'type': 'significant_earthquake',
-                            'value': row['magnitude'],
-                            'threshold': 5.0,
-                            'location': (row['latitude'], row['longitude']),
-                            'timestamp': row['timestamp']
-                        })
+                    hits = np.flatnonzero(magnitude >= 5.0)
+                    anomalies.extend(self._anomalies('significant_earthquake', data, hits, 'magnitude', 5.0))
             
             elif data_type == 'river_gauge':
                 # Water level anomalies
                 if 'water_level' in df.columns and 'flood_stage' in df.columns:
-                    flood_conditions = df[df['water_level'] > df['flood_stage']]
+                    water_level = self._column(df, 'water_level')
+                    flood_stage = self._column(df, 'flood_stage')
                     
-                    for _, row in flood_conditions.iterrows():
-                        anomalies.append({
-                            'type': 'flood_stage_exceeded',
-                            'value': row['water_level'],
-                            'threshold': row['flood_stage'],
-                            'location': (row['latitude'], row['longitude']),
-                            'timestamp': row['timestamp']
-                        })
+                    hits = np.flatnonzero(water_level > flood_stage)
+                    anomalies.extend(self._anomalies('flood_stage_exceeded', data, hits, 'water_level', 'flood_stage'))
             
             return anomalies
             
         except Exception as e:
             logger.error(f"Error detecting anomalies: {e}")
             return []
+    
+    @staticmethod
+    def _column(df: pd.DataFrame, column: str) -> np.ndarray:
+        """Numeric column as a float32 array for scanning, NaN where missing"""
+        if column not in df:
+            return np.full(len(df), np.nan, dtype=np.float32)
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float32)
+    
+    @staticmethod
+    def _anomalies(kind: str, data: List[Dict], indices: np.ndarray,
+                   field: str, threshold) -> List[Dict]:
+        """Anomaly records for the flagged rows.
+
+        Values are read back from the records, not the float32 scan arrays;
+        threshold is a number or the field holding each row's threshold.
+        """
+        return [
+            {
+                'type': kind,
+                'value': float(data[i][field]),
+                'threshold': float(data[i][threshold] if isinstance(threshold, str) else threshold),
+                'location': (data[i]['latitude'], data[i]['longitude']),
+                'timestamp': data[i].get('timestamp')
+            }
+            for i in indices
+        ]
 
     def _calculate_distance(self, loc1: Tuple[float, float], loc2: Tuple[float, float]) -> float:
         """Calculate distance between two locations in kilometers using Haversine formula"""
@@ -253,135 +703,20 @@ class DataProcessor:
         if isinstance(timestamp, datetime):
             return timestamp
         elif isinstance(timestamp, str):
-            return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            # Python 3.11's C parser takes any ISO 8601 form, including a 'Z' suffix
+            return datetime.fromisoformat(timestamp)
         else:
             return datetime.utcnow()
     
-    def _validate_latitude(self, lat) -> float:
-        """Validate latitude value"""
-        lat = float(lat)
-        if -90 <= lat <= 90:
-            return lat
-        raise ValueError(f"Invalid latitude: {lat}")
-    
-    def _validate_longitude(self, lon) -> float:
-        """Validate longitude value"""
-        lon = float(lon)
-        if -180 <= lon <= 180:
-            return lon
-        raise ValueError(f"Invalid longitude: {lon}")
-    
-    def _validate_temperature(self, temp) -> Optional[float]:
-        """Validate temperature value"""
-        if temp is None:
-            return None
-        temp = float(temp)
-        if -100 <= temp <= 60:  # Reasonable range in Celsius
-            return temp
-        return None
-    
-    def _validate_humidity(self, humidity) -> Optional[float]:
-        """Validate humidity value"""
-        if humidity is None:
+    def _validate_range(self, field: str, value) -> Optional[float]:
+        """Validate a single value against _RANGES; None if missing or invalid"""
+        if value is None:
             return None
-        humidity = float(humidity)
-        if 0 <= humidity <= 100:
-            return humidity
-        return None
-    
-    def _validate_pressure(self, pressure) -> Optional[float]:
-        """Validate pressure value"""
-        if pressure is None:
-            return None
-        pressure = float(pressure)
-        if 800 <= pressure <= 1200:  # Reasonable range in hPa
-            return pressure
-        return None
-    
-    def _validate_precipitation(self, precip) -> Optional[float]:
-        """Validate precipitation value"""
-        if precip is None:
-            return None
-        precip = float(precip)
-        if precip >= 0:
-            return precip
-        return None
-    
-    def _validate_wind_speed(self, speed) -> Optional[float]:
-        """Validate wind speed value"""
-        if speed is None:
-            return None
-        speed = float(speed)
-        if speed >= 0:
-            return speed
-        return None
-    
-    def _validate_wind_direction(self, direction) -> Optional[float]:
-        """Validate wind direction value"""
-        if direction is None:
-            return None
-        direction = float(direction)
-        if 0 <= direction <= 360:
-            return direction
-        return None
-    
-    def _validate_visibility(self, visibility) -> Optional[float]:
-        """Validate visibility value"""
-        if visibility is None:
-            return None
-        visibility = float(visibility)
-        if visibility >= 0:
-            return visibility
-        return None
-    
-    def _validate_magnitude(self, magnitude) -> float:
-        """Validate earthquake magnitude"""
-        magnitude = float(magnitude)
-        if magnitude >= 0:
-            return magnitude
-        raise ValueError(f"Invalid magnitude: {magnitude}")
-    
-    def _validate_depth(self, depth) -> Optional[float]:
-        """Validate earthquake depth"""
-        if depth is None:
-            return None
-        depth = float(depth)
-        if depth >= 0:
-            return depth
-        return None
-    
-    def _validate_water_level(self, level) -> Optional[float]:
-        """Validate water level value"""
-        if level is None:
-            return None
-        level = float(level)
-        if level >= 0:
-            return level
-        return None
-    
-    def _validate_flow_rate(self, rate) -> Optional[float]:
-        """Validate flow rate value"""
-        if rate is None:
-            return None
-        rate = float(rate)
-        if rate >= 0:
-            return rate
-        return None
-    
-    def _validate_gauge_height(self, height) -> Optional[float]:
-        """Validate gauge height value"""
-        if height is None:
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
             return None
-        height = float(height)
-        if height >= 0:
-            return height
-        return None
-    
-    def _validate_flood_stage(self, stage) -> Optional[float]:
-        """Validate flood stage value"""
-        if stage is None:
+        lo, hi = self._RANGES[field]
+        if math.isnan(value) or (lo is not None and value < lo) or (hi is not None and value > hi):
             return None
-        stage = float(stage)
-        if stage >= 0:
-            return stage
-        return None
+        return value
@@ -11,8 +11,10 @@ import uvicorn
 from fastapi import FastAPI
 
 # Import only what we need for basic functionality
-from .api.main import app
+from .api.main import app, db_pinger, load_dashboard_html
 from .api.database import init_database
+from .collector import collection_interval, load_collection_locations
+from .data.data_collector import DataCollectionManager
 
 
 # Configure logging
@@ -33,18 +35,50 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     logger.info("Starting Disaster Management System...")
     
+    # Every worker runs this lifespan; with several, main() creates the tables
+    # once and collection belongs in its own process (python -m src.collector)
+    single_worker = int(os.getenv("WEB_CONCURRENCY", 1)) <= 1
+    
     # Initialize database
+    if single_worker:
+        try:
+            init_database()
+            logger.info("Database initialized successfully")
+        except Exception as e:
+            logger.error(f"Database initialization failed: {e}")
+            raise
+    
+    # Compile the feature kernels and exercise both predictors before serving traffic
     try:
-        init_database()
-        logger.info("Database initialized successfully")
+        from .api.endpoints.predictions import warm_up_predictors
+        warm_up_predictors()
+        logger.info("Predictors warmed up")
     except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
-        raise
+        logger.warning(f"Predictor warm-up failed: {e}")
+    
+    # Keep the dashboard page in memory
+    load_dashboard_html()
+    
+    # Health checks read the result of this background ping
+    pinger = asyncio.create_task(db_pinger())
+    
+    # Periodic data collection runs on this event loop
+    collector_task = None
+    locations = load_collection_locations()
+    if os.getenv("ENABLE_DATA_COLLECTION", "false").lower() == "true" and locations:
+        if single_worker:
+            collector_task = DataCollectionManager().start_scheduled_collection(locations, collection_interval())
+        else:
+            logger.warning("ENABLE_DATA_COLLECTION needs WEB_CONCURRENCY=1; run python -m src.collector instead")
+    app.state.collector_task = collector_task
     
     logger.info("Basic services started successfully")
 
     yield
 
+    pinger.cancel()
+    if collector_task is not None:
+        collector_task.cancel()
     logger.info("Disaster Management System shutdown complete")
 
 
@@ -63,15 +97,36 @@ def main():
     logger.info(f"Debug mode: {debug}")
     logger.info(f"Environment: {os.getenv('ENVIRONMENT', 'development')}")
     
+    # Workers read this back in lifespan(); the reloader runs a single one
+    workers = 1 if debug else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    if workers > 1:
+        # Once here, rather than concurrently in every worker
+        init_database()
+    
     # Run the application
-    uvicorn.run(
-        "src.main:app",
-        host=host,
-        port=port,
-        reload=debug,
-        log_level="info" if not debug else "debug",
-        access_log=True
-    )
+    if debug:
+        uvicorn.run(
+            "src.main:app",
+            host=host,
+            port=port,
+            reload=True,
+            log_level="debug",
+            access_log=True
+        )
+    else:
+        # loop/http "auto" pick uvloop and httptools when installed (not on Windows)
+        logger.info(f"Workers: {workers}")
+        uvicorn.run(
+            "src.main:app",
+            host=host,
+            port=port,
+            workers=workers,
+            loop="auto",
+            http="auto",
+            log_level="info",
+            access_log=True
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,255 @@
+"""
+Random forest + gradient boosting ensemble shared by the predictors
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple, Union
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+import joblib
+import sklearn
+import logging
+import os
+import threading
+
+from ..utils.trees import compile_forest, fit_concurrently, forest_predict
+
+logger = logging.getLogger(__name__)
+
+# Predictors loaded by get_shared(), keyed by (class, model path, modification time)
+_MODEL_CACHE: Dict[Tuple[type, str, float], 'EnsemblePredictor'] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+
+class EnsemblePredictor:
+    """Averages a random forest and a histogram gradient boosting model.
+
+    Subclasses set the member classes and hyperparameters, the training
+    target, default_prediction and name, and turn the ensemble score into
+    result dicts in _results(). Classifiers set proba to score the positive
+    class probability.
+    """
+    
+    rf_class = None
+    gb_class = None
+    # Ensemble hyperparameters used by train(); instances may override them
+    rf_params: Dict = {}
+    gb_params: Dict = {}
+    proba = False
+    target_column: str = ''
+    # Result fields reported when there is no model to score with
+    default_prediction: Dict = {}
+    # Model name for log messages
+    name = 'ensemble'
+    
+    def __init__(self, feature_columns: List[str]):
+        self.model = None
+        self.scaler = StandardScaler()
+        self.feature_columns = feature_columns
+        self._index_columns()
+        self.is_trained = False
+        # Treelite copies of the ensemble members, rebuilt on train/load (not saved)
+        self._compiled = {}
+        # (scaler, mean, scale) of the fitted scaler, so predict() can skip transform()
+        self._scaling = None
+    
+    def train(self, training_data: pd.DataFrame, target_column: Optional[str] = None) -> Dict:
+        """Train the ensemble; returns _evaluate()'s metrics and the feature importances"""
+        target_column = target_column or self.target_column
+        try:
+            logger.info(f"Starting {self.name} prediction model training")
+            
+            # Prepare features and target
+            X = training_data[self.feature_columns]
+            y = training_data[target_column]
+            
+            # Split data
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=0.2, random_state=42, stratify=y
+            )
+            
+            # Scale features
+            X_train_scaled = self.scaler.fit_transform(X_train.to_numpy())
+            X_test_scaled = self.scaler.transform(X_test.to_numpy())
+            
+            # Train ensemble model
+            rf_model = self.rf_class(**self.rf_params)
+            
+            # Histogram-binned boosting: features are bucketed into uint8 bins,
+            # so it trains faster and stores smaller trees than exact splits
+            gb_model = self.gb_class(**self.gb_params)
+            
+            # Train models (in parallel)
+            fit_concurrently([rf_model, gb_model], X_train_scaled, y_train)
+            
+            # Ensemble predictions
+            rf_pred = forest_predict(rf_model, None, X_test_scaled, proba=self.proba)
+            gb_pred = forest_predict(gb_model, None, X_test_scaled, proba=self.proba)
+            metrics = self._evaluate(y_test, (rf_pred + gb_pred) / 2)
+            
+            # Store the ensemble model
+            self.model = {
+                'rf': rf_model,
+                'gb': gb_model,
+                'type': 'ensemble'
+            }
+            self.is_trained = True
+            self._compile_models()
+            
+            return {
+                **metrics,
+                'feature_importance': dict(zip(
+                    self.feature_columns,
+                    rf_model.feature_importances_
+                ))
+            }
+        
+        except Exception as e:
+            logger.error(f"Error training {self.name} prediction model: {e}")
+            raise
+    
+    def _evaluate(self, y_test, ensemble_pred: np.ndarray) -> Dict:
+        """Metrics of the ensemble on the held-out rows"""
+        raise NotImplementedError
+    
+    def predict(self, features: Union[pd.DataFrame, np.ndarray]) -> Dict:
+        """Prediction for the first row of features"""
+        results = self.predict_batch(features[:1])
+        return results[0] if results else self._failed_prediction()
+    
+    def predict_batch(self, features: Union[pd.DataFrame, np.ndarray]) -> List[Dict]:
+        """Predictions for every row, scored in one scaler and forest call"""
+        try:
+            if not self.is_trained or self.model is None:
+                logger.warning("Model not trained, using default prediction")
+                return [{
+                    **self.default_prediction,
+                    'confidence': 0.5,
+                    'features_used': self._columns_of(features)
+                } for _ in range(len(features))]
+            
+            X = self._feature_matrix(features)
+            
+            with sklearn.config_context(assume_finite=True):
+                # Scale features
+                features_scaled = self._scale(X)
+                
+                # Ensemble prediction
+                rf_pred = forest_predict(self.model['rf'], self._compiled.get('rf'), features_scaled, proba=self.proba)
+                gb_pred = forest_predict(self.model['gb'], self._compiled.get('gb'), features_scaled, proba=self.proba)
+            
+            return self._results(X, (rf_pred + gb_pred) / 2, self._columns_of(features))
+        
+        except Exception as e:
+            logger.error(f"Error making {self.name} prediction: {e}")
+            return [self._failed_prediction() for _ in range(len(features))]
+    
+    def _results(self, X: np.ndarray, score: np.ndarray, features_used: List[str]) -> List[Dict]:
+        """Result dict per row from its features and ensemble score"""
+        raise NotImplementedError
+    
+    @staticmethod
+    def _confidence(probability: np.ndarray) -> np.ndarray:
+        """Confidence of each probability (simplified)"""
+        return np.minimum(0.9, 0.5 + np.abs(probability - 0.5))
+    
+    def _columns_of(self, features) -> List[str]:
+        """Feature names of a DataFrame, or feature_columns for an array"""
+        if isinstance(features, pd.DataFrame):
+            return list(features.columns)
+        return list(self.feature_columns)
+    
+    def _failed_prediction(self) -> Dict:
+        """Fallback prediction when scoring fails"""
+        return {**self.default_prediction, 'confidence': 0.3, 'features_used': []}
+    
+    def _index_columns(self):
+        """Position of each feature in a feature row"""
+        self._col_index = {name: i for i, name in enumerate(self.feature_columns)}
+    
+    def _feature_matrix(self, features: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Feature rows as a float array in feature_columns order"""
+        if isinstance(features, pd.DataFrame):
+            features = features[self.feature_columns]
+        X = np.asarray(features, dtype=np.float64)
+        # Checked here because scoring runs with scikit-learn's own check disabled
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        return X
+    
+    def _compile_models(self):
+        """Build Treelite copies of the ensemble members when Treelite is installed"""
+        if isinstance(self.model, dict):
+            self._compiled = {name: compile_forest(self.model[name]) for name in ('rf', 'gb')}
+        
+        # The scaler is frozen after fitting; keep its parameters as plain arrays
+        mean = getattr(self.scaler, 'mean_', None)
+        scale = getattr(self.scaler, 'scale_', None)
+        if (isinstance(mean, np.ndarray) and isinstance(scale, np.ndarray)
+                and self.scaler.with_mean and self.scaler.with_std):
+            self._scaling = (self.scaler, mean, scale)
+        else:
+            self._scaling = None
+    
+    def _scale(self, X: np.ndarray) -> np.ndarray:
+        """Standardize feature rows with the fitted scaler's parameters"""
+        scaling = self._scaling
+        if scaling is not None and scaling[0] is self.scaler:
+            # Same arithmetic as StandardScaler.transform, without its input validation
+            return (X - scaling[1]) / scaling[2]
+        return self.scaler.transform(X)
+    
+    def save_model(self, filepath: str):
+        """Save trained model to file"""
+        try:
+            model_data = {
+                'model': self.model,
+                'scaler': self.scaler,
+                'feature_columns': self.feature_columns,
+                'is_trained': self.is_trained
+            }
+            # Uncompressed, so load_model() can memory-map the arrays
+            joblib.dump(model_data, filepath, compress=0, protocol=4)
+            logger.info(f"{self.name.capitalize()} model saved to {filepath}")
+        except Exception as e:
+            logger.error(f"Error saving {self.name} model: {e}")
+            raise
+    
+    @classmethod
+    def get_shared(cls, filepath: str) -> 'EnsemblePredictor':
+        """Predictor loaded from filepath, shared by every caller in the process.
+
+        The model file is unpickled once and loaded again only after it
+        changes on disk, so its memory-mapped arrays are shared as well.
+        """
+        path = os.path.abspath(filepath)
+        key = (cls, path, os.path.getmtime(path))
+        with _MODEL_CACHE_LOCK:
+            predictor = _MODEL_CACHE.get(key)
+            if predictor is None:
+                predictor = cls()
+                predictor.load_model(path)
+                # Forget instances loaded from earlier versions of the file
+                for stale in [k for k in _MODEL_CACHE if k[:2] == (cls, path)]:
+                    del _MODEL_CACHE[stale]
+                _MODEL_CACHE[key] = predictor
+            return predictor
+    
+    def load_model(self, filepath: str):
+        """Load trained model from file"""
+        try:
+            # Arrays stay read-only maps of the file, shared between worker processes
+            model_data = joblib.load(filepath, mmap_mode='r')
+            self.model = model_data['model']
+            self.scaler = model_data['scaler']
+            self.feature_columns = model_data['feature_columns']
+            self.is_trained = model_data['is_trained']
+            self._index_columns()
+            # Rows are scored as plain arrays; older scalers were fitted on a DataFrame
+            if hasattr(self.scaler, 'feature_names_in_'):
+                del self.scaler.feature_names_in_
+            self._compile_models()
+            logger.info(f"{self.name.capitalize()} model loaded from {filepath}")
+        except Exception as e:
+            logger.error(f"Error loading {self.name} model: {e}")
+            raise
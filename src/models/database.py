@@ -3,7 +3,7 @@ Database models for disaster management system
 """
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, Text, ForeignKey, CheckConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 # from geoalchemy2 import Geometry  # Commented out for Windows compatibility
@@ -14,19 +14,33 @@ Base = declarative_base()
 class WeatherData(Base):
     """Weather data for flood prediction"""
     __tablename__ = "weather_data"
+    __table_args__ = (
+        CheckConstraint("latitude BETWEEN -90 AND 90", name="ck_weather_latitude_range"),
+        CheckConstraint("longitude BETWEEN -180 AND 180", name="ck_weather_longitude_range"),
+        CheckConstraint("temperature BETWEEN -100 AND 60", name="ck_weather_temperature_range"),
+        CheckConstraint("humidity BETWEEN 0 AND 100", name="ck_weather_humidity_range"),
+        CheckConstraint("pressure BETWEEN 800 AND 1200", name="ck_weather_pressure_range"),
+        CheckConstraint("precipitation >= 0", name="ck_weather_precipitation_range"),
+        CheckConstraint("wind_speed >= 0", name="ck_weather_wind_speed_range"),
+        CheckConstraint("wind_direction BETWEEN 0 AND 360", name="ck_weather_wind_direction_range"),
+        CheckConstraint("visibility >= 0", name="ck_weather_visibility_range"),
+        # Bounding box + time window lookups
+        Index("ix_weather_data_geo_time", "latitude", "longitude", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     # location = Column(Geometry('POINT'), nullable=False)  # Simplified for Windows
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
-    temperature = Column(Float)  # Celsius
-    humidity = Column(Float)  # Percentage
-    pressure = Column(Float)  # hPa
-    precipitation = Column(Float)  # mm
-    wind_speed = Column(Float)  # m/s
-    wind_direction = Column(Float)  # degrees
-    visibility = Column(Float)  # km
+    # Measurements are stored single precision (REAL), ample for sensor readings
+    temperature = Column(Float(precision=24))  # Celsius
+    humidity = Column(Float(precision=24))  # Percentage
+    pressure = Column(Float(precision=24))  # hPa
+    precipitation = Column(Float(precision=24))  # mm
+    wind_speed = Column(Float(precision=24))  # m/s
+    wind_direction = Column(Float(precision=24))  # degrees
+    visibility = Column(Float(precision=24))  # km
     source = Column(String(50))  # API source
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -34,6 +48,16 @@ class WeatherData(Base):
 class RiverGaugeData(Base):
     """River gauge data for flood monitoring"""
     __tablename__ = "river_gauge_data"
+    __table_args__ = (
+        CheckConstraint("latitude BETWEEN -90 AND 90", name="ck_gauge_latitude_range"),
+        CheckConstraint("longitude BETWEEN -180 AND 180", name="ck_gauge_longitude_range"),
+        CheckConstraint("water_level >= 0", name="ck_gauge_water_level_range"),
+        CheckConstraint("flow_rate >= 0", name="ck_gauge_flow_rate_range"),
+        CheckConstraint("gauge_height >= 0", name="ck_gauge_gauge_height_range"),
+        CheckConstraint("flood_stage >= 0", name="ck_gauge_flood_stage_range"),
+        # Bounding box + time window lookups
+        Index("ix_river_gauge_data_geo_time", "latitude", "longitude", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     gauge_id = Column(String(50), nullable=False, index=True)
@@ -53,6 +77,14 @@ class RiverGaugeData(Base):
 class SeismicData(Base):
     """Seismic data for earthquake monitoring"""
     __tablename__ = "seismic_data"
+    __table_args__ = (
+        CheckConstraint("latitude BETWEEN -90 AND 90", name="ck_seismic_latitude_range"),
+        CheckConstraint("longitude BETWEEN -180 AND 180", name="ck_seismic_longitude_range"),
+        CheckConstraint("magnitude >= 0", name="ck_seismic_magnitude_range"),
+        CheckConstraint("depth >= 0", name="ck_seismic_depth_range"),
+        # Bounding box + time window lookups
+        Index("ix_seismic_data_geo_time", "latitude", "longitude", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(String(50), unique=True, index=True)
@@ -60,8 +92,9 @@ class SeismicData(Base):
     # location = Column(Geometry('POINT'), nullable=False)  # Simplified for Windows
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
-    magnitude = Column(Float, nullable=False)
-    depth = Column(Float)  # kilometers
+    # Measurements are stored single precision (REAL), like the weather readings
+    magnitude = Column(Float(precision=24), nullable=False)
+    depth = Column(Float(precision=24))  # kilometers
     magnitude_type = Column(String(10))  # Mw, ML, etc.
     place = Column(String(200))
     source = Column(String(50))  # USGS, etc.
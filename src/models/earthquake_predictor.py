@@ -4,76 +4,301 @@ Earthquake risk assessment and prediction models
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
+from typing import Dict, List, Tuple, Optional, TypedDict, Union
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, roc_auc_score
-import joblib
 import logging
 import math
+import threading
+from dataclasses import dataclass, fields
 # from scipy.spatial.distance import haversine  # Simplified for Windows compatibility
 
+from .base_predictor import EnsemblePredictor
+from .risk import risk_levels
+from ..utils.cache import TTLCache
+from ..utils.geo import haversine_km
+from ..utils.jit import jit
+
 logger = logging.getLogger(__name__)
 
+# Seismic features are reused while the catalog and location are unchanged;
+# kept short because the 7/30-day windows are measured from now
+FEATURE_CACHE_TTL = 60
+
+
+@jit(cache=True)
+def _window_stats(magnitude, depth, start_7d):
+    """Magnitude and depth statistics of the 30-day window in one pass.
+
+    The 7-day window is the tail from start_7d. Returns (mean magnitude 7d,
+    foreshock count 7d, max magnitude, magnitude std, depth std) following
+    pandas: NaN values are skipped, and a statistic with too few values is
+    NaN. Standard deviations use Welford's update (ddof=1).
+    """
+    count_7d = 0
+    sum_7d = 0.0
+    foreshocks = 0
+    max_mag = np.nan
+    n_mag = 0
+    mean_mag = 0.0
+    m2_mag = 0.0
+    n_depth = 0
+    mean_depth = 0.0
+    m2_depth = 0.0
+    
+    for i in range(magnitude.size):
+        m = magnitude[i]
+        if not np.isnan(m):
+            n_mag += 1
+            delta = m - mean_mag
+            mean_mag += delta / n_mag
+            m2_mag += delta * (m - mean_mag)
+            if np.isnan(max_mag) or m > max_mag:
+                max_mag = m
+            if i >= start_7d:
+                count_7d += 1
+                sum_7d += m
+                if m < 4.0:
+                    foreshocks += 1
+        d = depth[i]
+        if not np.isnan(d):
+            n_depth += 1
+            delta = d - mean_depth
+            mean_depth += delta / n_depth
+            m2_depth += delta * (d - mean_depth)
+    
+    mean_7d = sum_7d / count_7d if count_7d > 0 else np.nan
+    std_mag = np.sqrt(m2_mag / (n_mag - 1)) if n_mag > 1 else np.nan
+    std_depth = np.sqrt(m2_depth / (n_depth - 1)) if n_depth > 1 else np.nan
+    return mean_7d, foreshocks, max_mag, std_mag, std_depth
+
+
+@jit(cache=True)
+def _even_bin_counts(values, edges):
+    """Histogram counts over evenly spaced edges in one counting pass.
+
+    Each value's bin is computed directly from the spacing, then moved by
+    one where rounding put it across an edge, so the counts equal
+    np.histogram's (values outside the edges or NaN are skipped).
+    """
+    nbins = edges.size - 1
+    counts = np.zeros(nbins, dtype=np.int64)
+    lo = edges[0]
+    hi = edges[nbins]
+    step = edges[1] - edges[0]
+    for i in range(values.size):
+        v = values[i]
+        if not (v >= lo and v <= hi):
+            continue
+        k = min(int((v - lo) / step), nbins - 1)
+        if k > 0 and v < edges[k]:
+            k -= 1
+        if k < nbins - 1 and v >= edges[k + 1]:
+            k += 1
+        counts[k] += 1
+    return counts
+
+
+@dataclass
+class SeismicBatch:
+    """Earthquake events stored column-wise, one array per field"""
+    timestamp: np.ndarray       # datetime64[ms], UTC
+    latitude: np.ndarray
+    longitude: np.ndarray
+    magnitude: np.ndarray
+    depth: np.ndarray
+    event_id: np.ndarray        # object columns below
+    magnitude_type: np.ndarray
+    place: np.ndarray
+    significance: np.ndarray
+    
+    NUMERIC = ('timestamp', 'latitude', 'longitude', 'magnitude', 'depth')
+    
+    @classmethod
+    def empty(cls, n: int = 0) -> 'SeismicBatch':
+        """Preallocate a batch of n events"""
+        return cls(
+            timestamp=np.empty(n, dtype='datetime64[ms]'),
+            latitude=np.empty(n), longitude=np.empty(n),
+            magnitude=np.empty(n), depth=np.empty(n),
+            event_id=np.empty(n, dtype=object), magnitude_type=np.empty(n, dtype=object),
+            place=np.empty(n, dtype=object), significance=np.empty(n, dtype=object)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.timestamp)
+    
+    def take(self, index) -> 'SeismicBatch':
+        """Select events by slice, index array or boolean mask"""
+        return SeismicBatch(**{f.name: getattr(self, f.name)[index] for f in fields(self)})
+    
+    def numeric_columns(self) -> Dict[str, np.ndarray]:
+        """The columns used for feature calculation"""
+        return {name: getattr(self, name) for name in self.NUMERIC}
+    
+    def to_records(self) -> List[Dict]:
+        """One dict per event, laid out like SeismicData rows"""
+        timestamps = self.timestamp.astype('datetime64[us]').astype(object)
+        return [
+            {
+                'event_id': self.event_id[i],
+                'timestamp': timestamps[i],
+                'latitude': float(self.latitude[i]),
+                'longitude': float(self.longitude[i]),
+                'magnitude': None if np.isnan(self.magnitude[i]) else float(self.magnitude[i]),
+                'depth': float(self.depth[i]),
+                'magnitude_type': self.magnitude_type[i],
+                'place': self.place[i],
+                'source': 'usgs',
+                'significance': self.significance[i]
+            }
+            for i in range(len(self))
+        ]
+
+
+class SeismicColumns(TypedDict):
+    """Earthquake events as one array per numeric field (SeismicBatch.NUMERIC).
+
+    timestamp is datetime64 (naive UTC), the rest float64 with NaN for
+    missing values. depth may be left out when no event has one.
+    """
+    timestamp: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    magnitude: np.ndarray
+    depth: np.ndarray
 
-class EarthquakePredictor:
+
+def records_to_columns(records) -> SeismicColumns:
+    """Build SeismicColumns from dicts, or from tuples in SeismicBatch.NUMERIC order"""
+    if len(records) == 0:
+        return {name: np.empty(0, dtype='datetime64[us]' if name == 'timestamp' else np.float64)
+                for name in SeismicBatch.NUMERIC}
+    if isinstance(records[0], dict):
+        # Only fields some event has, like a DataFrame built from the records
+        present = set().union(*records)
+        values = {name: [r.get(name) for r in records] for name in SeismicBatch.NUMERIC if name in present}
+    else:
+        values = dict(zip(SeismicBatch.NUMERIC, zip(*records)))
+    
+    return {
+        name: _datetimes(column) if name == 'timestamp' else np.array(column, dtype=np.float64)
+        for name, column in values.items()
+    }
+
+
+def _datetimes(values) -> np.ndarray:
+    """datetime64 array from datetimes, strings or a datetime64 array; aware times become naive UTC"""
+    if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+        return values
+    parsed = pd.to_datetime(values)
+    if parsed.tz is not None:
+        parsed = parsed.tz_convert(None)
+    return parsed.to_numpy()
+
+
+class EarthquakePredictor(EnsemblePredictor):
     """Machine learning model for earthquake risk assessment"""
     
+    rf_class = RandomForestClassifier
+    gb_class = HistGradientBoostingClassifier
+    rf_params = {
+        'n_estimators': 100,
+        'max_depth': 10,
+        'random_state': 42,
+        'n_jobs': -1,
+        'class_weight': 'balanced'
+    }
+    gb_params = {
+        'max_iter': 200,
+        'max_depth': 6,
+        'learning_rate': 0.1,
+        'early_stopping': True,
+        'random_state': 42
+    }
+    proba = True
+    target_column = 'earthquake_risk'
+    default_prediction = {'risk_probability': 0.1, 'estimated_magnitude': 4.0, 'risk_level': 'LOW'}
+    name = 'earthquake'
+    
+    # Current time the 7- and 30-day activity windows end at
+    clock = staticmethod(datetime.now)
+    
     def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
-        self.feature_columns = [
+        super().__init__([
             'seismic_activity_7d', 'seismic_activity_30d', 'avg_magnitude_7d',
             'max_magnitude_30d', 'earthquake_count_100km', 'fault_distance',
             'tectonic_stress', 'geological_stability', 'depth_variance',
             'magnitude_trend', 'foreshock_count', 'b_value', 'time_since_last',
             'population_density', 'elevation', 'slope'
-        ]
-        self.is_trained = False
+        ])
+        # (catalog, event count, time-sorted columns) for the last catalog seen
+        self._catalog: Optional[Tuple[object, int, SeismicColumns]] = None
+        self._catalog_lock = threading.Lock()
+        self._feature_cache = TTLCache(maxsize=1024, ttl=FEATURE_CACHE_TTL)
     
-    def calculate_seismic_features(self, seismic_data: List[Dict], 
+    def calculate_seismic_features(self, seismic_data: Union[List[Dict], SeismicBatch, SeismicColumns], 
                                  location: Tuple[float, float]) -> Dict:
-        """Calculate seismic activity features for a location"""
+        """Calculate seismic activity features for a location.
+
+        Results are cached per (catalog, location) for FEATURE_CACHE_TTL
+        seconds; like _catalog_columns, a catalog is identified by object and
+        length, so repeated polls with the same catalog skip the recomputation.
+        The cache has its own lock; two threads missing it at once both compute
+        the same features, and either result is kept.
+        """
         try:
-            if not seismic_data:
+            n_events = self._event_count(seismic_data)
+            if n_events == 0:
                 return self._default_seismic_features()
             
-            df = pd.DataFrame(seismic_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.sort_values('timestamp')
+            key = (id(seismic_data), n_events, float(location[0]), float(location[1]))
+            cached = self._feature_cache.get(key)
+            # The cache holds a reference to the catalog, so its id cannot be reused meanwhile
+            if cached is not None and cached[0] is seismic_data:
+                return dict(cached[1])
+            
+            columns = self._catalog_columns(seismic_data)
+            now = self.clock()
+            cutoff_7d = now - timedelta(days=7)
+            cutoff_30d = now - timedelta(days=30)
             
             lat, lon = location
             features = {}
             
-            # Calculate distances to earthquakes
-            distances = []
-            for _, row in df.iterrows():
-                dist = self._calculate_distance((lat, lon), (row['latitude'], row['longitude']))
-                distances.append(dist)
-            df['distance_km'] = distances
+            # Calculate distances to earthquakes, all in one vectorized pass
+            distances = haversine_km(columns['latitude'], columns['longitude'], lat, lon)
             
-            # Recent seismic activity
-            now = datetime.now()
-            last_7d = df[df['timestamp'] >= now - timedelta(days=7)]
-            last_30d = df[df['timestamp'] >= now - timedelta(days=30)]
+            # Recent seismic activity: the columns are time-sorted (missing times last),
+            # so each window is a positional slice found by binary search
+            timestamps = columns['timestamp']
+            end = len(timestamps) - int(np.isnat(timestamps).sum())
+            start_7d, start_30d = np.searchsorted(timestamps[:end], np.array([cutoff_7d, cutoff_30d], dtype=timestamps.dtype))
+            count_7d = int(end - start_7d)
+            count_30d = int(end - start_30d)
             
-            features['seismic_activity_7d'] = len(last_7d)
-            features['seismic_activity_30d'] = len(last_30d)
-            features['avg_magnitude_7d'] = last_7d['magnitude'].mean() if len(last_7d) > 0 else 0
-            features['max_magnitude_30d'] = last_30d['magnitude'].max() if len(last_30d) > 0 else 0
+            # Magnitude/depth reductions over both windows in a single pass
+            magnitudes = columns['magnitude'][start_30d:end]
+            has_depth = 'depth' in columns
+            depths = columns['depth'][start_30d:end] if has_depth else np.full(count_30d, np.nan)
+            mean_7d, foreshocks, max_30d, std_30d, depth_std_30d = _window_stats(magnitudes, depths, start_7d - start_30d)
+            
+            features['seismic_activity_7d'] = count_7d
+            features['seismic_activity_30d'] = count_30d
+            features['avg_magnitude_7d'] = mean_7d if count_7d > 0 else 0
+            features['max_magnitude_30d'] = max_30d if count_30d > 0 else 0
             
             # Nearby earthquake activity (within 100km)
-            nearby = df[df['distance_km'] <= 100]
-            features['earthquake_count_100km'] = len(nearby)
+            features['earthquake_count_100km'] = int(np.count_nonzero(distances <= 100))
             
             # Distance to nearest fault (simplified - would use real geological data)
-            features['fault_distance'] = min(distances) if distances else 100
+            features['fault_distance'] = float(distances.min()) if distances.size else 100
             
             # Tectonic stress indicators (simplified)
-            if len(last_30d) > 0:
-                features['tectonic_stress'] = last_30d['magnitude'].std()
-                features['depth_variance'] = last_30d['depth'].std() if 'depth' in last_30d.columns else 0
+            if count_30d > 0:
+                features['tectonic_stress'] = std_30d
+                features['depth_variance'] = depth_std_30d if has_depth else 0
             else:
                 features['tectonic_stress'] = 0
                 features['depth_variance'] = 0
@@ -82,55 +307,124 @@ class EarthquakePredictor:
             features['geological_stability'] = max(0, 1 - features['seismic_activity_30d'] / 100)
             
             # Magnitude trend (increasing/decreasing)
-            if len(last_30d) >= 2:
-                magnitudes = last_30d['magnitude'].values
-                features['magnitude_trend'] = np.polyfit(range(len(magnitudes)), magnitudes, 1)[0]
+            if count_30d >= 2:
+                features['magnitude_trend'] = self._slope(np.arange(len(magnitudes), dtype=np.float64), magnitudes)
             else:
                 features['magnitude_trend'] = 0
             
             # Foreshock analysis
-            features['foreshock_count'] = len(last_7d[last_7d['magnitude'] < 4.0])
+            features['foreshock_count'] = foreshocks
             
             # Gutenberg-Richter b-value (simplified)
-            if len(last_30d) > 10:
-                mags = last_30d['magnitude'].values
-                mag_bins = np.arange(mags.min(), mags.max() + 0.1, 0.1)
-                counts = np.histogram(mags, bins=mag_bins)[0]
+            if count_30d > 10:
+                mag_bins = np.arange(magnitudes.min(), magnitudes.max() + 0.1, 0.1)
+                counts = self._bin_counts(magnitudes, mag_bins)
                 if len(counts) > 1:
                     log_counts = np.log10(counts + 1)
-                    features['b_value'] = -np.polyfit(mag_bins[:-1], log_counts, 1)[0]
+                    features['b_value'] = -self._slope(mag_bins[:-1], log_counts)
                 else:
                     features['b_value'] = 1.0
             else:
                 features['b_value'] = 1.0
             
             # Time since last significant earthquake
-            significant = df[df['magnitude'] >= 5.0]
+            significant = np.flatnonzero(columns['magnitude'] >= 5.0)
             if len(significant) > 0:
-                last_significant = significant.iloc[-1]['timestamp']
-                features['time_since_last'] = (now - last_significant).days
+                last_significant = timestamps[significant[-1]]
+                # Whole days, rounded down like timedelta.days; NaN if the time is missing
+                features['time_since_last'] = (
+                    np.nan if np.isnat(last_significant)
+                    else int((np.datetime64(now, 'ns') - last_significant) // np.timedelta64(1, 'D'))
+                )
             else:
                 features['time_since_last'] = 365  # Default to 1 year
             
-            return features
-            
+            self._feature_cache.set(key, (seismic_data, features))
+            return dict(features)
+        
         except Exception as e:
             logger.error(f"Error calculating seismic features: {e}")
             return self._default_seismic_features()
+    
+    @staticmethod
+    def _event_count(seismic_data: Union[List[Dict], SeismicBatch, SeismicColumns]) -> int:
+        """Number of events in a catalog of any accepted layout"""
+        if isinstance(seismic_data, dict):
+            return len(seismic_data['timestamp'])
+        return len(seismic_data)
+    
+    def _catalog_columns(self, seismic_data: Union[List[Dict], SeismicBatch, SeismicColumns]) -> SeismicColumns:
+        """Catalog as SeismicColumns sorted by time, missing times last.
 
+        The columns for the most recent catalog are kept, so predicting many
+        locations against one catalog converts it once; a catalog is identified
+        by object and length, so pass a new list rather than editing one.
+        Callers must not modify the returned arrays. The lock makes threads
+        sharing one predictor convert a catalog once and never see a half
+        updated entry.
+        """
+        n_events = self._event_count(seismic_data)
+        with self._catalog_lock:
+            cached = self._catalog
+            if cached is not None and cached[0] is seismic_data and cached[1] == n_events:
+                return cached[2]
+            
+            columns = self._sorted_columns(seismic_data)
+            self._catalog = (seismic_data, n_events, columns)
+            return columns
+    
+    @staticmethod
+    def _sorted_columns(seismic_data: Union[List[Dict], SeismicBatch, SeismicColumns]) -> SeismicColumns:
+        """Numeric catalog columns as float/datetime64 arrays sorted by time"""
+        if isinstance(seismic_data, SeismicBatch):
+            columns = seismic_data.numeric_columns()
+        elif isinstance(seismic_data, dict):
+            columns = seismic_data
+        else:
+            columns = records_to_columns(seismic_data)
+        columns = {
+            name: _datetimes(values) if name == 'timestamp' else np.asarray(values, dtype=np.float64)
+            for name, values in columns.items()
+        }
+        
+        # Same order as DataFrame.sort_values: quicksort on the int64 view, NaT appended
+        timestamps = columns['timestamp']
+        missing = np.isnat(timestamps)
+        present = np.flatnonzero(~missing)
+        order = np.concatenate([
+            present[timestamps[present].view('i8').argsort(kind='quicksort')],
+            np.flatnonzero(missing)
+        ])
+        return {name: values[order] for name, values in columns.items()}
+    
+    @staticmethod
+    def _slope(x: np.ndarray, y: np.ndarray) -> float:
+        """Least-squares slope of y against x, in closed form"""
+        n = len(x)
+        sx = x.sum()
+        sy = y.sum()
+        return float((n * (x * y).sum() - sx * sy) / (n * (x * x).sum() - sx * sx))
+    
+    @staticmethod
+    def _bin_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+        """Counts per bin like np.histogram(values, bins=edges)[0] (last bin closed)"""
+        if len(edges) < 2:
+            return np.zeros(0, dtype=np.int64)
+        return _even_bin_counts(values, edges)
+    
     def _calculate_distance(self, loc1: Tuple[float, float], loc2: Tuple[float, float]) -> float:
         """Calculate distance between two locations in kilometers using Haversine formula"""
         lat1, lon1 = math.radians(loc1[0]), math.radians(loc1[1])
         lat2, lon2 = math.radians(loc2[0]), math.radians(loc2[1])
-
+        
         dlat = lat2 - lat1
         dlon = lon2 - lon1
-
+        
         a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-
+        
         return 6371 * c  # Earth's radius in km
-
+    
     def _default_seismic_features(self) -> Dict:
         """Return default seismic features when no data available"""
         return {
@@ -149,185 +443,67 @@ class EarthquakePredictor:
             'time_since_last': 365
         }
     
-    def prepare_features(self, seismic_data: List[Dict], 
+    def prepare_features(self, seismic_data: Union[List[Dict], SeismicBatch, SeismicColumns], 
                         location_data: Dict) -> pd.DataFrame:
         """Prepare features for earthquake prediction"""
+        return pd.DataFrame(self.feature_vector(seismic_data, location_data), columns=self.feature_columns)
+    
+    def feature_vector(self, seismic_data: Union[List[Dict], SeismicBatch, SeismicColumns],
+                       location_data: Dict) -> np.ndarray:
+        """Features as a (1, n_features) array in feature_columns order, ready for predict()"""
+        row = np.zeros((1, len(self.feature_columns)))
         try:
             location = (location_data['latitude'], location_data['longitude'])
             
             # Calculate seismic features
-            seismic_features = self.calculate_seismic_features(seismic_data, location)
+            features = self.calculate_seismic_features(seismic_data, location)
             
             # Add location-based features
-            features = seismic_features.copy()
             features['population_density'] = location_data.get('population_density', 100)
             features['elevation'] = location_data.get('elevation', 100)
             features['slope'] = location_data.get('slope', 0.1)
             
-            # Convert to DataFrame
-            feature_df = pd.DataFrame([features])
-            
-            # Ensure all required columns exist
-            for col in self.feature_columns:
-                if col not in feature_df.columns:
-                    feature_df[col] = 0
-            
-            return feature_df[self.feature_columns]
-            
+            # Missing features stay 0
+            for name, value in features.items():
+                if name in self._col_index:
+                    row[0, self._col_index[name]] = value
+        
         except Exception as e:
             logger.error(f"Error preparing earthquake features: {e}")
-            # Return default features
-            default_features = {col: 0 for col in self.feature_columns}
-            return pd.DataFrame([default_features])
+            # Default features
+            row[:] = 0
+        
+        return row
     
-    def train(self, training_data: pd.DataFrame, target_column: str = 'earthquake_risk'):
-        """Train the earthquake prediction model"""
-        try:
-            logger.info("Starting earthquake prediction model training")
-            
-            # Prepare features and target
-            X = training_data[self.feature_columns]
-            y = training_data[target_column]
-            
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
-            )
-            
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-            
-            # Train ensemble model
-            rf_model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42,
-                n_jobs=-1,
-                class_weight='balanced'
-            )
-            
-            gb_model = GradientBoostingClassifier(
-                n_estimators=100,
-                max_depth=6,
-                learning_rate=0.1,
-                random_state=42
-            )
-            
-            # Train models
-            rf_model.fit(X_train_scaled, y_train)
-            gb_model.fit(X_train_scaled, y_train)
-            
-            # Evaluate
-            rf_pred = rf_model.predict_proba(X_test_scaled)[:, 1]
-            gb_pred = gb_model.predict_proba(X_test_scaled)[:, 1]
-            ensemble_pred = (rf_pred + gb_pred) / 2
-            
-            auc_score = roc_auc_score(y_test, ensemble_pred)
-            
-            logger.info(f"Earthquake model training completed - AUC: {auc_score:.4f}")
-            
-            # Store the ensemble model
-            self.model = {
-                'rf': rf_model,
-                'gb': gb_model,
-                'type': 'ensemble'
-            }
-            self.is_trained = True
-            
-            return {
-                'auc_score': auc_score,
-                'feature_importance': dict(zip(
-                    self.feature_columns,
-                    rf_model.feature_importances_
-                ))
-            }
-            
-        except Exception as e:
-            logger.error(f"Error training earthquake prediction model: {e}")
-            raise
+    def _evaluate(self, y_test, ensemble_pred: np.ndarray) -> Dict:
+        """ROC AUC of the ensemble on the held-out rows"""
+        auc_score = roc_auc_score(y_test, ensemble_pred)
+        
+        logger.info(f"Earthquake model training completed - AUC: {auc_score:.4f}")
+        return {'auc_score': auc_score}
     
-    def predict(self, features: pd.DataFrame) -> Dict:
-        """Make earthquake risk prediction"""
-        try:
-            if not self.is_trained or self.model is None:
-                logger.warning("Model not trained, using default prediction")
-                return {
-                    'risk_probability': 0.1,
-                    'estimated_magnitude': 4.0,
-                    'risk_level': 'LOW',
-                    'confidence': 0.5,
-                    'features_used': list(features.columns)
-                }
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Ensemble prediction
-            rf_pred = self.model['rf'].predict_proba(features_scaled)[0, 1]
-            gb_pred = self.model['gb'].predict_proba(features_scaled)[0, 1]
-            risk_probability = (rf_pred + gb_pred) / 2
-            
-            # Estimate magnitude based on features
-            seismic_activity = features.iloc[0]['seismic_activity_30d']
-            max_mag_30d = features.iloc[0]['max_magnitude_30d']
-            estimated_magnitude = min(8.0, max(3.0, 4.0 + seismic_activity * 0.01 + max_mag_30d * 0.1))
-            
-            # Determine risk level
-            if risk_probability < 0.3:
-                risk_level = 'LOW'
-            elif risk_probability < 0.6:
-                risk_level = 'MEDIUM'
-            elif risk_probability < 0.8:
-                risk_level = 'HIGH'
-            else:
-                risk_level = 'CRITICAL'
-            
-            # Calculate confidence
-            confidence = min(0.9, 0.5 + abs(risk_probability - 0.5))
-            
-            return {
-                'risk_probability': float(risk_probability),
-                'estimated_magnitude': float(estimated_magnitude),
-                'risk_level': risk_level,
-                'confidence': float(confidence),
-                'features_used': list(features.columns)
+    def _results(self, X: np.ndarray, score: np.ndarray, features_used: List[str]) -> List[Dict]:
+        """Risk probability, estimated magnitude, risk level and confidence per row"""
+        risk_probability = score
+        
+        # Estimate magnitude based on features
+        seismic_activity = X[:, self._col_index['seismic_activity_30d']]
+        max_mag_30d = X[:, self._col_index['max_magnitude_30d']]
+        estimated_magnitude = np.clip(4.0 + seismic_activity * 0.01 + max_mag_30d * 0.1, 3.0, 8.0)
+        
+        # Determine risk level
+        risk_level = risk_levels(risk_probability)
+        
+        # Calculate confidence
+        confidence = self._confidence(risk_probability)
+        
+        return [
+            {
+                'risk_probability': float(risk_probability[i]),
+                'estimated_magnitude': float(estimated_magnitude[i]),
+                'risk_level': str(risk_level[i]),
+                'confidence': float(confidence[i]),
+                'features_used': features_used
             }
-            
-        except Exception as e:
-            logger.error(f"Error making earthquake prediction: {e}")
-            return {
-                'risk_probability': 0.1,
-                'estimated_magnitude': 4.0,
-                'risk_level': 'LOW',
-                'confidence': 0.3,
-                'features_used': []
-            }
-    
-    def save_model(self, filepath: str):
-        """Save trained model to file"""
-        try:
-            model_data = {
-                'model': self.model,
-                'scaler': self.scaler,
-                'feature_columns': self.feature_columns,
-                'is_trained': self.is_trained
-            }
-            joblib.dump(model_data, filepath)
-            logger.info(f"Earthquake model saved to {filepath}")
-        except Exception as e:
-            logger.error(f"Error saving earthquake model: {e}")
-            raise
-    
-    def load_model(self, filepath: str):
-        """Load trained model from file"""
-        try:
-            model_data = joblib.load(filepath)
-            self.model = model_data['model']
-            self.scaler = model_data['scaler']
-            self.feature_columns = model_data['feature_columns']
-            self.is_trained = model_data['is_trained']
-            logger.info(f"Earthquake model loaded from {filepath}")
-        except Exception as e:
-            logger.error(f"Error loading earthquake model: {e}")
-            raise
+            for i in range(len(risk_probability))
+        ]
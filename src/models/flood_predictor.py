@@ -4,249 +4,229 @@ Flood prediction machine learning models
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
+from typing import Dict, List, Tuple, Optional, Union
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_squared_error, r2_score
-import joblib
 import logging
 
+from .base_predictor import EnsemblePredictor
+from .risk import risk_levels
+from ..utils.cache import TTLCache
+from ..utils.jit import jit
+
 logger = logging.getLogger(__name__)
 
+# Weather/river features are reused while the same input arrays are passed in
+FEATURE_CACHE_TTL = 60
+
+# Column layouts accepted by FloodPredictor.prepare_features_from_arrays
+WEATHER_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[us]'),
+    ('temperature', 'f8'),
+    ('humidity', 'f8'),
+    ('pressure', 'f8'),
+    ('precipitation', 'f8'),
+    ('wind_speed', 'f8')
+])
+
+RIVER_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[us]'),
+    ('water_level', 'f8'),
+    ('flow_rate', 'f8'),
+    ('gauge_height', 'f8'),
+    ('flood_stage', 'f8')
+])
+
+
+def records_to_array(records, dtype: np.dtype) -> np.ndarray:
+    """Build a structured array from dicts or tuples; missing values become NaN/NaT"""
+    if not records:
+        return np.empty(0, dtype=dtype)
+    if isinstance(records[0], dict):
+        return np.array([tuple(r.get(name) for name in dtype.names) for r in records], dtype=dtype)
+    return np.array([tuple(r) for r in records], dtype=dtype)
+
+
+# Order of the values returned by _compute_flood_features
+SERIES_FEATURES = [
+    'precipitation_24h', 'precipitation_48h', 'precipitation_72h',
+    'temperature', 'humidity', 'pressure', 'wind_speed',
+    'water_level', 'flow_rate', 'gauge_height', 'flood_stage_ratio'
+]
+
+
+@jit(cache=True)
+def _last_or(values, default):
+    """Last value of a column, or default if it is missing"""
+    if values.size == 0 or np.isnan(values[-1]):
+        return default
+    return values[-1]
 
-class FloodPredictor:
+
+@jit(cache=True)
+def _compute_flood_features(weather_ts, precipitation, temperature, humidity, pressure, wind_speed,
+                            river_ts, water_level, flow_rate, gauge_height, flood_stage):
+    """Weather and river gauge features (SERIES_FEATURES) from raw columns"""
+    out = np.zeros(11)
+    
+    if weather_ts.size > 0:
+        # Only the 72 newest readings are used; gather just those
+        order = np.argsort(weather_ts, kind='mergesort')
+        rain = precipitation[order[-72:]][::-1]
+        # Running total from the newest reading back; the three windows are points on it
+        totals = np.cumsum(np.where(np.isnan(rain), 0.0, rain))
+        out[0] = totals[min(23, totals.size - 1)]
+        out[1] = totals[min(47, totals.size - 1)]
+        out[2] = totals[-1]
+        latest = order[-1:]
+        out[3] = _last_or(temperature[latest], 20.0)
+        out[4] = _last_or(humidity[latest], 50.0)
+        out[5] = _last_or(pressure[latest], 1013.0)
+        out[6] = _last_or(wind_speed[latest], 0.0)
+    else:
+        out[3] = 20.0
+        out[4] = 50.0
+        out[5] = 1013.0
+    
+    if river_ts.size > 0:
+        latest = np.argsort(river_ts, kind='mergesort')[-1:]
+        out[7] = _last_or(water_level[latest], 0.0)
+        out[8] = _last_or(flow_rate[latest], 0.0)
+        out[9] = _last_or(gauge_height[latest], 0.0)
+        out[10] = out[7] / max(_last_or(flood_stage[latest], 1.0), 0.1)
+    
+    return out
+
+
+class FloodPredictor(EnsemblePredictor):
     """Machine learning model for flood prediction"""
     
+    rf_class = RandomForestRegressor
+    gb_class = HistGradientBoostingRegressor
+    rf_params = {
+        'n_estimators': 100,
+        'max_depth': 10,
+        'random_state': 42,
+        'n_jobs': -1
+    }
+    gb_params = {
+        'max_iter': 200,
+        'max_depth': 6,
+        'learning_rate': 0.1,
+        'early_stopping': True,
+        'random_state': 42
+    }
+    target_column = 'flood_occurred'
+    default_prediction = {'flood_probability': 0.1, 'risk_level': 'LOW'}
+    name = 'flood'
+    
     def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
-        self.label_encoder = LabelEncoder()
-        self.feature_columns = [
+        super().__init__([
             'precipitation_24h', 'precipitation_48h', 'precipitation_72h',
             'temperature', 'humidity', 'pressure', 'wind_speed',
             'water_level', 'flow_rate', 'gauge_height', 'flood_stage_ratio',
             'elevation', 'slope', 'soil_type_encoded', 'land_use_encoded',
             'season', 'hour_of_day', 'day_of_year'
-        ]
-        self.is_trained = False
+        ])
+        self.label_encoder = LabelEncoder()
+        self._feature_cache = TTLCache(maxsize=1024, ttl=FEATURE_CACHE_TTL)
     
     def prepare_features(self, weather_data: List[Dict], 
                         river_data: List[Dict], 
                         location_data: Dict) -> pd.DataFrame:
         """Prepare features for prediction"""
         try:
-            # Convert to DataFrames
-            weather_df = pd.DataFrame(weather_data)
-            river_df = pd.DataFrame(river_data)
-            
-            # Calculate precipitation aggregates
-            weather_df['timestamp'] = pd.to_datetime(weather_df['timestamp'])
-            weather_df = weather_df.sort_values('timestamp')
-            
-            features = {}
-            
-            # Weather features
-            if not weather_df.empty:
-                features['precipitation_24h'] = weather_df['precipitation'].tail(24).sum()
-                features['precipitation_48h'] = weather_df['precipitation'].tail(48).sum()
-                features['precipitation_72h'] = weather_df['precipitation'].tail(72).sum()
-                features['temperature'] = weather_df['temperature'].iloc[-1] if len(weather_df) > 0 else 0
-                features['humidity'] = weather_df['humidity'].iloc[-1] if len(weather_df) > 0 else 0
-                features['pressure'] = weather_df['pressure'].iloc[-1] if len(weather_df) > 0 else 0
-                features['wind_speed'] = weather_df['wind_speed'].iloc[-1] if len(weather_df) > 0 else 0
-            else:
-                features.update({
-                    'precipitation_24h': 0, 'precipitation_48h': 0, 'precipitation_72h': 0,
-                    'temperature': 20, 'humidity': 50, 'pressure': 1013, 'wind_speed': 0
-                })
-            
-            # River gauge features
-            if not river_df.empty:
-                latest_river = river_df.iloc[-1]
-                features['water_level'] = latest_river.get('water_level', 0)
-                features['flow_rate'] = latest_river.get('flow_rate', 0)
-                features['gauge_height'] = latest_river.get('gauge_height', 0)
-                flood_stage = latest_river.get('flood_stage', 1)
-                features['flood_stage_ratio'] = features['water_level'] / max(flood_stage, 0.1)
-            else:
-                features.update({
-                    'water_level': 0, 'flow_rate': 0, 'gauge_height': 0, 'flood_stage_ratio': 0
-                })
-            
-            # Location features (would be enhanced with real GIS data)
-            features['elevation'] = location_data.get('elevation', 100)  # meters
-            features['slope'] = location_data.get('slope', 0.1)  # percentage
-            features['soil_type_encoded'] = location_data.get('soil_type', 1)  # encoded
-            features['land_use_encoded'] = location_data.get('land_use', 1)  # encoded
-            
-            # Temporal features
-            now = datetime.now()
-            features['season'] = (now.month - 1) // 3  # 0-3 for seasons
-            features['hour_of_day'] = now.hour
-            features['day_of_year'] = now.timetuple().tm_yday
-            
-            # Convert to DataFrame
-            feature_df = pd.DataFrame([features])
-            
-            # Ensure all required columns exist
-            for col in self.feature_columns:
-                if col not in feature_df.columns:
-                    feature_df[col] = 0
-            
-            return feature_df[self.feature_columns]
-            
+            weather = records_to_array(weather_data, WEATHER_DTYPE)
+            river = records_to_array(river_data, RIVER_DTYPE)
+            return self.prepare_features_from_arrays(weather, river, location_data)
+        
         except Exception as e:
             logger.error(f"Error preparing features: {e}")
             # Return default features
             default_features = {col: 0 for col in self.feature_columns}
             return pd.DataFrame([default_features])
     
-    def train(self, training_data: pd.DataFrame, target_column: str = 'flood_occurred'):
-        """Train the flood prediction model"""
-        try:
-            logger.info("Starting flood prediction model training")
-            
-            # Prepare features and target
-            X = training_data[self.feature_columns]
-            y = training_data[target_column]
-            
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
-            )
-            
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-            
-            # Train ensemble model
-            rf_model = RandomForestRegressor(
-                n_estimators=100, 
-                max_depth=10, 
-                random_state=42,
-                n_jobs=-1
-            )
-            
-            gb_model = GradientBoostingRegressor(
-                n_estimators=100,
-                max_depth=6,
-                learning_rate=0.1,
-                random_state=42
-            )
-            
-            # Train models
-            rf_model.fit(X_train_scaled, y_train)
-            gb_model.fit(X_train_scaled, y_train)
-            
-            # Ensemble predictions
-            rf_pred = rf_model.predict(X_test_scaled)
-            gb_pred = gb_model.predict(X_test_scaled)
-            ensemble_pred = (rf_pred + gb_pred) / 2
-            
-            # Evaluate
-            mse = mean_squared_error(y_test, ensemble_pred)
-            r2 = r2_score(y_test, ensemble_pred)
-            
-            logger.info(f"Model training completed - MSE: {mse:.4f}, R2: {r2:.4f}")
-            
-            # Store the best performing model (ensemble)
-            self.model = {
-                'rf': rf_model,
-                'gb': gb_model,
-                'type': 'ensemble'
-            }
-            self.is_trained = True
-            
-            return {
-                'mse': mse,
-                'r2_score': r2,
-                'feature_importance': dict(zip(
-                    self.feature_columns, 
-                    rf_model.feature_importances_
-                ))
-            }
-            
-        except Exception as e:
-            logger.error(f"Error training flood prediction model: {e}")
-            raise
+    def prepare_features_from_arrays(self, weather: np.ndarray,
+                                     river: np.ndarray,
+                                     location_data: Dict) -> pd.DataFrame:
+        """Prepare features from structured arrays (WEATHER_DTYPE / RIVER_DTYPE)"""
+        return pd.DataFrame(self.feature_vector(weather, river, location_data), columns=self.feature_columns)
     
-    def predict(self, features: pd.DataFrame) -> Dict:
-        """Make flood prediction"""
+    def feature_vector(self, weather: np.ndarray, river: np.ndarray, location_data: Dict) -> np.ndarray:
+        """Features as a (1, n_features) array in feature_columns order, ready for predict()"""
+        row = np.zeros((1, len(self.feature_columns)))
         try:
-            if not self.is_trained or self.model is None:
-                logger.warning("Model not trained, using default prediction")
-                return {
-                    'flood_probability': 0.1,
-                    'risk_level': 'LOW',
-                    'confidence': 0.5,
-                    'features_used': list(features.columns)
-                }
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Ensemble prediction
-            rf_pred = self.model['rf'].predict(features_scaled)[0]
-            gb_pred = self.model['gb'].predict(features_scaled)[0]
-            flood_probability = (rf_pred + gb_pred) / 2
-            
-            # Ensure probability is between 0 and 1
-            flood_probability = max(0, min(1, flood_probability))
+            # Weather and river gauge features (compiled kernel)
+            values = self._series_features(weather, river)
+            row[0, [self._col_index[name] for name in SERIES_FEATURES]] = values
             
-            # Determine risk level
-            if flood_probability < 0.3:
-                risk_level = 'LOW'
-            elif flood_probability < 0.6:
-                risk_level = 'MEDIUM'
-            elif flood_probability < 0.8:
-                risk_level = 'HIGH'
-            else:
-                risk_level = 'CRITICAL'
-            
-            # Calculate confidence (simplified)
-            confidence = min(0.9, 0.5 + abs(flood_probability - 0.5))
-            
-            return {
-                'flood_probability': float(flood_probability),
-                'risk_level': risk_level,
-                'confidence': float(confidence),
-                'features_used': list(features.columns)
-            }
+            # Location features (would be enhanced with real GIS data)
+            col = self._col_index
+            row[0, col['elevation']] = location_data.get('elevation', 100)  # meters
+            row[0, col['slope']] = location_data.get('slope', 0.1)  # percentage
+            row[0, col['soil_type_encoded']] = location_data.get('soil_type', 1)  # encoded
+            row[0, col['land_use_encoded']] = location_data.get('land_use', 1)  # encoded
             
+            # Temporal features
+            now = datetime.now()
+            row[0, col['season']] = (now.month - 1) // 3  # 0-3 for seasons
+            row[0, col['hour_of_day']] = now.hour
+            row[0, col['day_of_year']] = now.timetuple().tm_yday
+        
         except Exception as e:
-            logger.error(f"Error making flood prediction: {e}")
-            return {
-                'flood_probability': 0.1,
-                'risk_level': 'LOW',
-                'confidence': 0.3,
-                'features_used': []
-            }
+            logger.error(f"Error preparing features: {e}")
+            # Default features
+            row[:] = 0
+        
+        return row
     
-    def save_model(self, filepath: str):
-        """Save trained model to file"""
-        try:
-            model_data = {
-                'model': self.model,
-                'scaler': self.scaler,
-                'feature_columns': self.feature_columns,
-                'is_trained': self.is_trained
-            }
-            joblib.dump(model_data, filepath)
-            logger.info(f"Model saved to {filepath}")
-        except Exception as e:
-            logger.error(f"Error saving model: {e}")
-            raise
+    def _series_features(self, weather: np.ndarray, river: np.ndarray) -> np.ndarray:
+        """SERIES_FEATURES values for the weather and river arrays.
+
+        Cached for FEATURE_CACHE_TTL seconds per pair of arrays, identified by
+        object and length, so repeated polls with the same inputs skip the kernel.
+        """
+        key = (id(weather), len(weather), id(river), len(river))
+        cached = self._feature_cache.get(key)
+        # The cache holds references to the arrays, so their ids cannot be reused meanwhile
+        if cached is not None and cached[0] is weather and cached[1] is river:
+            return cached[2]
+        
+        values = _compute_flood_features(
+            weather['timestamp'].astype(np.int64), weather['precipitation'],
+            weather['temperature'], weather['humidity'], weather['pressure'], weather['wind_speed'],
+            river['timestamp'].astype(np.int64), river['water_level'],
+            river['flow_rate'], river['gauge_height'], river['flood_stage']
+        )
+        self._feature_cache.set(key, (weather, river, values))
+        return values
     
-    def load_model(self, filepath: str):
-        """Load trained model from file"""
-        try:
-            model_data = joblib.load(filepath)
-            self.model = model_data['model']
-            self.scaler = model_data['scaler']
-            self.feature_columns = model_data['feature_columns']
-            self.is_trained = model_data['is_trained']
-            logger.info(f"Model loaded from {filepath}")
-        except Exception as e:
-            logger.error(f"Error loading model: {e}")
-            raise
+    def _evaluate(self, y_test, ensemble_pred: np.ndarray) -> Dict:
+        """MSE and R2 of the ensemble on the held-out rows"""
+        mse = mean_squared_error(y_test, ensemble_pred)
+        r2 = r2_score(y_test, ensemble_pred)
+        
+        logger.info(f"Model training completed - MSE: {mse:.4f}, R2: {r2:.4f}")
+        return {'mse': mse, 'r2_score': r2}
+    
+    def _results(self, X: np.ndarray, score: np.ndarray, features_used: List[str]) -> List[Dict]:
+        """Flood probability, risk level and confidence per row"""
+        # Ensure probability is between 0 and 1
+        flood_probability = np.clip(score, 0, 1)
+        
+        # Determine risk level
+        risk_level = risk_levels(flood_probability)
+        
+        # Calculate confidence (simplified)
+        confidence = self._confidence(flood_probability)
+        
+        return [
+            {
+                'flood_probability': float(flood_probability[i]),
+                'risk_level': str(risk_level[i]),
+                'confidence': float(confidence[i]),
+                'features_used': features_used
+            }
+            for i in range(len(flood_probability))
+        ]
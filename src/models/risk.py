@@ -0,0 +1,13 @@
+"""
+Risk level banding shared by the predictors
+"""
+import numpy as np
+
+# Risk level for probabilities below each threshold, and CRITICAL above the last
+RISK_THRESHOLDS = [0.3, 0.6, 0.8]
+RISK_LEVELS = np.array(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])
+
+
+def risk_levels(probabilities) -> np.ndarray:
+    """Risk level name for each probability"""
+    return RISK_LEVELS[np.digitize(probabilities, RISK_THRESHOLDS)]
@@ -3,7 +3,7 @@ Pydantic schemas for API requests and responses
 """
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class LocationBase(BaseModel):
@@ -27,8 +27,7 @@ class WeatherDataResponse(WeatherDataCreate):
     timestamp: datetime
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RiverGaugeDataCreate(LocationBase):
@@ -46,8 +45,7 @@ class RiverGaugeDataResponse(RiverGaugeDataCreate):
     timestamp: datetime
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SeismicDataCreate(LocationBase):
@@ -65,13 +63,15 @@ class SeismicDataResponse(SeismicDataCreate):
     id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PredictionBase(LocationBase):
+    # model_version is a field, not part of pydantic's model_ namespace
+    model_config = ConfigDict(protected_namespaces=())
+
     prediction_time: datetime
-    risk_level: str = Field(..., regex="^(LOW|MEDIUM|HIGH|CRITICAL)$")
+    risk_level: str = Field(..., pattern="^(LOW|MEDIUM|HIGH|CRITICAL)$")
     confidence_score: Optional[float] = Field(None, ge=0, le=1)
     model_version: Optional[str] = None
 
@@ -86,8 +86,7 @@ class FloodPredictionResponse(FloodPredictionCreate):
     features_used: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class EarthquakePredictionCreate(PredictionBase):
@@ -101,13 +100,12 @@ class EarthquakePredictionResponse(EarthquakePredictionCreate):
     features_used: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AlertCreate(LocationBase):
-    alert_type: str = Field(..., regex="^(FLOOD|EARTHQUAKE)$")
-    severity: str = Field(..., regex="^(LOW|MEDIUM|HIGH|CRITICAL)$")
+    alert_type: str = Field(..., pattern="^(FLOOD|EARTHQUAKE)$")
+    severity: str = Field(..., pattern="^(LOW|MEDIUM|HIGH|CRITICAL)$")
     title: str = Field(..., max_length=200)
     message: str
     expires_at: Optional[datetime] = None
@@ -119,15 +117,14 @@ class AlertResponse(AlertCreate):
     sent_at: Optional[datetime] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class HistoricalDisasterCreate(LocationBase):
-    disaster_type: str = Field(..., regex="^(FLOOD|EARTHQUAKE)$")
+    disaster_type: str = Field(..., pattern="^(FLOOD|EARTHQUAKE)$")
     event_date: datetime
     magnitude: Optional[float] = None
-    severity: Optional[str] = Field(None, regex="^(LOW|MEDIUM|HIGH|CRITICAL)$")
+    severity: Optional[str] = Field(None, pattern="^(LOW|MEDIUM|HIGH|CRITICAL)$")
     affected_area: Optional[float] = Field(None, ge=0)
     casualties: Optional[int] = Field(None, ge=0)
     economic_damage: Optional[float] = Field(None, ge=0)
@@ -139,8 +136,7 @@ class HistoricalDisasterResponse(HistoricalDisasterCreate):
     id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PredictionRequest(LocationBase):
@@ -0,0 +1,21 @@
+"""
+Shared utilities package
+"""
+from .cache import TTLCache, ttl_cache
+from .geo import EARTH_RADIUS_KM, bbox_mask, haversine_km
+from .jit import get_num_threads, jit, prange
+from .trees import compile_forest, fit_concurrently, forest_predict
+
+__all__ = [
+    "TTLCache",
+    "ttl_cache",
+    "EARTH_RADIUS_KM",
+    "bbox_mask",
+    "haversine_km",
+    "get_num_threads",
+    "jit",
+    "prange",
+    "compile_forest",
+    "fit_concurrently",
+    "forest_predict"
+]
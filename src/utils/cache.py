@@ -0,0 +1,92 @@
+"""
+In-process caching with time-based expiry
+"""
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after ttl seconds"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def ttl_cache(ttl: float, maxsize: int = 1024, key: Optional[Callable[..., Hashable]] = None,
+              cache_empty: bool = False, is_empty: Optional[Callable[[Any], bool]] = None):
+    """Cache results of a sync or async function for ttl seconds.
+
+    key builds the cache key from the call arguments (default: the arguments
+    themselves). Empty results are not cached unless cache_empty is set, since
+    the collectors return {} or [] on failure; is_empty tells them apart for
+    results that are never falsy (default: not value).
+    """
+    def decorator(func):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        make_key = key or (lambda *args, **kwargs: (args, tuple(sorted(kwargs.items()))))
+        empty = is_empty or (lambda value: not value)
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = make_key(*args, **kwargs)
+                value = cache.get(cache_key, _MISSING)
+                if value is _MISSING:
+                    value = await func(*args, **kwargs)
+                    if cache_empty or not empty(value):
+                        cache.set(cache_key, value)
+                return value
+            async_wrapper.cache = cache
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = make_key(*args, **kwargs)
+            value = cache.get(cache_key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                if cache_empty or not empty(value):
+                    cache.set(cache_key, value)
+            return value
+        wrapper.cache = cache
+        return wrapper
+    
+    return decorator
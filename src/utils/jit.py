@@ -0,0 +1,25 @@
+"""
+Optional Numba JIT compilation for numeric kernels
+"""
+try:
+    from numba import get_num_threads, njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+    def get_num_threads() -> int:
+        """Without Numba, parallel kernels run on a single thread"""
+        return 1
+
+
+def jit(**options):
+    """Compile a function with numba.njit when Numba is installed.
+
+    Without Numba the function is returned unchanged, so kernels must stay
+    valid NumPy code.
+    """
+    def decorator(func):
+        if njit is None:
+            return func
+        return njit(**options)(func)
+    return decorator
@@ -2,15 +2,24 @@
 Pytest configuration and shared fixtures
 """
 import pytest
+import pytest_asyncio
+import hashlib
+import inspect
 import os
 import tempfile
 import shutil
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import datetime, timedelta
 
 from src.models.database import Base
 
+pytest_plugins = ("pytest_asyncio",)
+
+# Fixed reference time for the sample data; nothing here depends on the wall clock
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
 
 @pytest.fixture(scope="session")
 def temp_dir():
@@ -20,24 +29,57 @@ def temp_dir():
     shutil.rmtree(temp_dir)
 
 
+@pytest.fixture(scope="session")
+def model_cache(pytestconfig):
+    """load_or_train(predictor, key_parts, train) backed by .pytest_cache.
+
+    A predictor trained with the same key_parts in an earlier run is loaded
+    from disk instead of retrained. Falls back to training when the cache
+    plugin is disabled (-p no:cacheprovider).
+    """
+    cache = getattr(pytestconfig, "cache", None)
+    cache_dir = cache.mkdir("models") if cache is not None else None
+    
+    def load_or_train(predictor, key_parts, train):
+        if cache_dir is None:
+            train(predictor)
+            return predictor
+        
+        key = hashlib.blake2b(repr(key_parts).encode(), digest_size=8).hexdigest()
+        path = cache_dir / f"{type(predictor).__name__}_{key}.pkl"
+        if path.exists():
+            predictor.load_model(str(path))
+            return predictor
+        
+        train(predictor)
+        # Write then rename, so a concurrent xdist worker never loads a partial file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        predictor.save_model(str(tmp_path))
+        os.replace(tmp_path, path)
+        return predictor
+    
+    return load_or_train
+
+
 @pytest.fixture(scope="session")
 def test_database_url():
     """Create test database URL"""
-    return "sqlite:///./test_disaster_analytics.db"
+    return "sqlite+pysqlite:///:memory:"
 
 
 @pytest.fixture(scope="function")
 def test_db_engine(test_database_url):
     """Create test database engine"""
-    engine = create_engine(test_database_url, connect_args={"check_same_thread": False})
+    # StaticPool keeps one connection, so every session sees the same in-memory database
+    engine = create_engine(
+        test_database_url,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
-    
-    # Clean up database file
-    db_file = test_database_url.replace("sqlite:///./", "")
-    if os.path.exists(db_file):
-        os.remove(db_file)
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
@@ -51,13 +93,26 @@ def test_db_session(test_db_engine):
         session.close()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
+async def http_client():
+    """Async HTTP client wired to the API app in-process.
+
+    Lets async tests issue independent requests concurrently with asyncio.gather.
+    """
+    import httpx
+    from src.api.main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+# The sample data below is only read by tests, so it is built once per session
+@pytest.fixture(scope="session")
 def sample_weather_data():
     """Sample weather data for testing"""
-    base_time = datetime.utcnow()
     return [
         {
-            'timestamp': base_time - timedelta(hours=i),
+            'timestamp': BASE_TIME - timedelta(hours=i),
             'latitude': 37.7749,
             'longitude': -122.4194,
             'temperature': 20.0 + i * 0.5,
@@ -73,14 +128,13 @@ def sample_weather_data():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_seismic_data():
     """Sample seismic data for testing"""
-    base_time = datetime.utcnow()
     return [
         {
             'event_id': f'test_eq_{i:03d}',
-            'timestamp': base_time - timedelta(days=i),
+            'timestamp': BASE_TIME - timedelta(days=i),
             'latitude': 37.7749 + i * 0.01,
             'longitude': -122.4194 + i * 0.01,
             'magnitude': 3.0 + i * 0.1,
@@ -94,14 +148,13 @@ def sample_seismic_data():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_river_data():
     """Sample river gauge data for testing"""
-    base_time = datetime.utcnow()
     return [
         {
             'gauge_id': f'test_gauge_{i:02d}',
-            'timestamp': base_time - timedelta(hours=i),
+            'timestamp': BASE_TIME - timedelta(hours=i),
             'latitude': 37.7749 + i * 0.001,
             'longitude': -122.4194 + i * 0.001,
             'water_level': 2.0 + i * 0.1,
@@ -115,7 +168,7 @@ def sample_river_data():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_location_data():
     """Sample location data for testing"""
     return {
@@ -129,7 +182,7 @@ def sample_location_data():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_api_responses():
     """Mock API responses for external services"""
     return {
@@ -153,7 +206,7 @@ def mock_api_responses():
                     'properties': {
                         'mag': 4.5,
                         'place': 'Test Location',
-                        'time': int(datetime.utcnow().timestamp() * 1000),
+                        'time': int(BASE_TIME.timestamp() * 1000),
                         'ids': 'test_eq_001',
                         'magType': 'Mw',
                         'sig': 300
@@ -167,7 +220,7 @@ def mock_api_responses():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_config():
     """Test configuration settings"""
     return {
@@ -195,6 +248,12 @@ def pytest_configure(config):
         "markers", "unit: marks tests as unit tests"
     )
 
+    # test_api.py keeps its DB-writing classes on one worker with xdist_group
+    # marks, which other distribution modes ignore
+    dist = getattr(config.option, "dist", "no")
+    if dist not in ("no", "loadgroup"):
+        raise pytest.UsageError(f"--dist={dist} splits the db_writes group; use --dist=loadgroup")
+
 
 def pytest_collection_modifyitems(config, items):
     """Modify test collection"""
@@ -205,6 +264,10 @@ def pytest_collection_modifyitems(config, items):
         elif "test_" in item.nodeid and "integration" not in item.nodeid:
             item.add_marker(pytest.mark.unit)
         
+        # Run coroutine tests on the pytest-asyncio event loop
+        if inspect.iscoroutinefunction(getattr(item, "function", None)):
+            item.add_marker(pytest.mark.asyncio)
+        
         # Mark slow tests
         if "test_model_training" in item.nodeid or "test_large_dataset" in item.nodeid:
             item.add_marker(pytest.mark.slow)
@@ -0,0 +1,223 @@
+"""
+Tests shared by the flood and earthquake predictor test classes
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sklearn
+from unittest.mock import patch
+
+# Seed for every random draw; each draw builds its own Generator, so no test
+# touches numpy's global RNG state
+SEED = 42
+# Rows used by the training smoke tests; test_train_model_full_size uses them all
+SMOKE_ROWS = 64
+# Ensemble overrides for the smoke tests: a few shallow trees
+SMOKE_RF_PARAMS = {'n_estimators': 5, 'max_depth': 3}
+SMOKE_GB_PARAMS = {'max_iter': 5, 'max_depth': 3}
+
+# (probability, expected risk level) on either side of each threshold
+RISK_CASES = [
+    (0.1, 'LOW'),
+    (0.4, 'MEDIUM'),
+    (0.7, 'HIGH'),
+    (0.9, 'CRITICAL')
+]
+
+
+class FakeScaler:
+    """Fitted-scaler stand-in that maps every row to zeros"""
+    
+    def transform(self, X):
+        return np.zeros(np.shape(X))
+
+
+class FakeEstimator:
+    """Ensemble member stand-in that scores p for every row, as a regressor
+    prediction or a positive-class probability"""
+    
+    def __init__(self, p):
+        self._p = p
+    
+    def predict(self, X):
+        return np.full(len(X), self._p)
+    
+    def predict_proba(self, X):
+        return np.broadcast_to([1 - self._p, self._p], (len(X), 2))
+
+
+def mock_trained(predictor, prob):
+    """Make predictor look trained, with both ensemble members scoring prob"""
+    predictor.is_trained = True
+    predictor.model = {
+        'rf': FakeEstimator(prob),
+        'gb': FakeEstimator(prob),
+        'type': 'ensemble'
+    }
+    predictor.scaler = FakeScaler()
+    return predictor
+
+
+def tiny_fit(predictor):
+    """Give predictor a real but minimal fitted ensemble, for tests that only
+    serialize it: one depth-1 tree and one boosting round on two rows"""
+    X = np.array([[0.0] * len(predictor.feature_columns), [1.0] * len(predictor.feature_columns)])
+    y = [0, 1]
+    predictor.scaler.fit(X)
+    predictor.model = {
+        'rf': predictor.rf_class(n_estimators=1, max_depth=1, random_state=0).fit(X, y),
+        'gb': predictor.gb_class(max_iter=1, max_depth=2).fit(X, y),
+        'type': 'ensemble'
+    }
+    predictor.is_trained = True
+    return predictor
+
+
+class PredictorContract:
+    """Behaviour every predictor shares; mixed into each Test*Predictor class.
+    
+    Subclasses must set predictor_cls, expected_features, target_weights (the
+    feature weights of the synthetic training target), empty_inputs and
+    invalid_inputs (prepare_features() arguments with no readings and with
+    malformed ones), and feature_step, the predictor method that computes the
+    features from the readings.
+    """
+    
+    REQUIRED = ('predictor_cls', 'expected_features', 'target_weights',
+                'empty_inputs', 'invalid_inputs', 'feature_step')
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        missing = [name for name in cls.REQUIRED if not hasattr(cls, name)]
+        if missing:
+            raise TypeError(f"{cls.__name__} must set {', '.join(missing)}")
+    
+    def training_data(self, features):
+        """features plus a synthetic target the ensemble can learn"""
+        training_data = features.copy()
+        noise = np.random.default_rng(SEED + 1).standard_normal(len(training_data))
+        
+        # Weighted sum of a few features plus noise, split at the median
+        score = sum([training_data[name] * weight for name, weight in self.target_weights.items()]
+                    + [noise * 0.1])
+        training_data[self.predictor_cls.target_column] = (score > score.median()).astype(int)
+        
+        return training_data
+    
+    def smoke_train(self, predictor, features):
+        """Fit the smoke-sized ensemble on SMOKE_ROWS rows; returns the training metrics.
+
+        The smoke tests only check the training and prediction contract, not model
+        quality.
+        """
+        predictor.rf_params = {**predictor.rf_params, **SMOKE_RF_PARAMS}
+        predictor.gb_params = {**predictor.gb_params, **SMOKE_GB_PARAMS}
+        return predictor.train(self.training_data(features.head(SMOKE_ROWS)))
+    
+    @pytest.fixture(scope="session")
+    def synthetic_features(self):
+        """1000 standard-normal feature rows shared by the session; copy() before modifying"""
+        columns = self.predictor_cls().feature_columns
+        rng = np.random.default_rng(SEED)
+        return pd.DataFrame(rng.standard_normal((1000, len(columns))), columns=columns)
+    
+    @pytest.fixture(scope="session")
+    def trained_predictor(self, synthetic_features, model_cache):
+        """Smoke-trained predictor shared by the session and cached across runs.
+
+        The cache key covers everything that shapes the fit, so changing the
+        features, target, sizes or scikit-learn version retrains. predict()
+        only reads the model, so tests share it as-is.
+        """
+        predictor = self.predictor_cls()
+        key_parts = (
+            tuple(predictor.feature_columns), SEED, SMOKE_ROWS,
+            sorted(self.target_weights.items()),
+            sorted({**predictor.rf_params, **SMOKE_RF_PARAMS}.items()),
+            sorted({**predictor.gb_params, **SMOKE_GB_PARAMS}.items()),
+            sklearn.__version__
+        )
+        return model_cache(predictor, key_parts, lambda p: self.smoke_train(p, synthetic_features))
+    
+    @pytest.fixture(scope="session")
+    def saved_model(self, tmp_path_factory):
+        """Path of a minimally fitted model, pickled once; the round trip needs
+        real estimators but not a useful fit"""
+        predictor = tiny_fit(self.predictor_cls())
+        model_path = tmp_path_factory.mktemp("models") / f"test_{predictor.name}_model.pkl"
+        predictor.save_model(str(model_path))
+        return model_path
+    
+    @pytest.fixture(scope="session")
+    def predictor(self):
+        """Shared untrained predictor; tests that mutate one use fresh_predictor"""
+        return self.predictor_cls()
+    
+    @pytest.fixture
+    def fresh_predictor(self):
+        """Create a predictor a test may modify"""
+        return self.predictor_cls()
+    
+    @pytest.fixture(scope="session")
+    def single_row(self, predictor):
+        """One feature row of 0.5s, shared; copy() before modifying"""
+        return pd.DataFrame(np.full((1, len(predictor.feature_columns)), 0.5),
+                            columns=predictor.feature_columns)
+    
+    @pytest.fixture
+    def mocked_ensemble(self, fresh_predictor, prob):
+        """fresh_predictor with a stubbed ensemble scoring the parametrized prob"""
+        return mock_trained(fresh_predictor, prob)
+    
+    def test_predictor_initialization(self, predictor):
+        """Test that predictor initializes correctly"""
+        assert predictor.model is None
+        assert predictor.scaler is not None
+        assert predictor.feature_columns is not None
+        assert len(predictor.feature_columns) > 0
+        assert not predictor.is_trained
+    
+    def test_feature_validation(self, predictor):
+        """Test that all required features are present"""
+        assert all(feature in predictor.feature_columns for feature in self.expected_features)
+    
+    @pytest.mark.parametrize("prob,expected_level", RISK_CASES)
+    def test_risk_level_calculation(self, mocked_ensemble, single_row, prob, expected_level):
+        """Test risk level calculation based on probability"""
+        result = mocked_ensemble.predict(single_row)
+        assert result['risk_level'] == expected_level
+    
+    def test_save_and_load_model(self, predictor, saved_model, single_row):
+        """Test model saving and loading"""
+        assert saved_model.exists()
+    
+        # Create new predictor and load model
+        new_predictor = self.predictor_cls()
+        assert not new_predictor.is_trained
+    
+        new_predictor.load_model(str(saved_model))
+    
+        assert new_predictor.is_trained
+        assert new_predictor.model is not None
+        assert new_predictor.feature_columns == predictor.feature_columns
+        # The fallback for a model that fails to score reports confidence 0.3
+        assert new_predictor.predict(single_row)['confidence'] >= 0.5
+    
+    def test_error_handling_invalid_data(self, predictor):
+        """Test error handling with invalid data"""
+        features = predictor.prepare_features(*self.invalid_inputs)
+        
+        # Should return default features without crashing
+        assert isinstance(features, pd.DataFrame)
+        assert len(features) == 1
+    
+    def test_logging_on_errors(self, predictor):
+        """Test that a failing feature step is logged and leaves default features"""
+        with patch(f'{self.predictor_cls.__module__}.logger') as mock_logger, \
+                patch.object(predictor, self.feature_step, side_effect=Exception("Test error")):
+            features = predictor.prepare_features(*self.empty_inputs)
+        
+        mock_logger.error.assert_called_once()
+        assert "Test error" in mock_logger.error.call_args[0][0]
+        assert list(features.columns) == predictor.feature_columns
+        assert (features.to_numpy() == 0).all()
@@ -0,0 +1,47 @@
+"""
+Tests for the simplified app's prediction endpoints
+"""
+import pytest
+import pytest_asyncio
+import httpx
+
+from app import app
+from scripts.check_predictions import LOW_FLOOD_DATA, SCENARIOS
+
+
+@pytest_asyncio.fixture
+async def app_client():
+    """Async client served in-process by the simplified app"""
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.parametrize("kind,payload,expected", SCENARIOS)
+async def test_predict(app_client, kind, payload, expected):
+    """Test each sample scenario gets its expected risk level"""
+    response = await app_client.post(f"/api/v1/predict/{kind}", json=payload)
+    assert response.status_code == 200
+    assert response.json()["risk_level"] == expected
+
+
+async def test_predict_batch(app_client):
+    """Test the batch endpoint answers every scenario in order"""
+    response = await app_client.post("/api/v1/predict/batch", json={
+        "requests": [{"kind": kind, "data": payload} for kind, payload, _ in SCENARIOS]
+    })
+    assert response.status_code == 200
+    
+    responses = response.json()["responses"]
+    assert [r["risk_level"] for r in responses] == [expected for _, _, expected in SCENARIOS]
+
+
+async def test_predict_batch_unknown_kind(app_client):
+    """Test an unknown kind fails only its own batch item"""
+    response = await app_client.post("/api/v1/predict/batch", json={
+        "requests": [{"kind": "tsunami", "data": {}}, {"kind": "flood", "data": LOW_FLOOD_DATA}]
+    })
+    assert response.status_code == 200
+    
+    unknown, flood = response.json()["responses"]
+    assert unknown["status_code"] == 400
+    assert flood["risk_level"] == "LOW"
@@ -0,0 +1,150 @@
+"""
+Tests for the in-process TTL cache
+"""
+import pytest
+from types import SimpleNamespace
+
+from src.utils import cache as cache_module
+from src.utils.cache import TTLCache, ttl_cache
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock for the cache module only; the event loop keeps the real one"""
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+class TestTTLCache:
+    """Test expiry and LRU eviction"""
+    
+    def test_expires_after_ttl(self, clock):
+        """Test an entry is served until ttl seconds pass, then dropped"""
+        cache = TTLCache(ttl=10)
+        cache.set('key', 'value')
+        
+        clock.advance(10)
+        assert cache.get('key') == 'value'
+        clock.advance(0.001)
+        assert cache.get('key', 'missing') == 'missing'
+        assert len(cache) == 0
+    
+    def test_set_restarts_ttl(self, clock):
+        """Test storing a key again gives it a fresh ttl"""
+        cache = TTLCache(ttl=10)
+        cache.set('key', 1)
+        clock.advance(8)
+        cache.set('key', 2)
+        clock.advance(8)
+        
+        assert cache.get('key') == 2
+    
+    def test_evicts_least_recently_used(self, clock):
+        """Test a full cache drops the entry read or written longest ago"""
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+    
+    def test_falsy_values_are_hits(self, clock):
+        """Test cached falsy values are told apart from misses by the default"""
+        cache = TTLCache()
+        cache.set('empty', [])
+        
+        assert cache.get('empty', 'missing') == []
+        assert cache.get('other', 'missing') == 'missing'
+
+
+class TestTTLCacheDecorator:
+    """Test ttl_cache on sync and async functions"""
+    
+    def test_sync_hit_until_expiry(self, clock):
+        """Test repeated calls are served from the cache until the ttl passes"""
+        calls = []
+        
+        @ttl_cache(ttl=5)
+        def lookup(x, scale=1):
+            calls.append(x)
+            return x * scale
+        
+        assert [lookup(2), lookup(2), lookup(2, scale=3)] == [2, 2, 6]
+        assert calls == [2, 2]
+        
+        clock.advance(6)
+        assert lookup(2) == 2
+        assert calls == [2, 2, 2]
+    
+    async def test_async_hit_until_expiry(self, clock):
+        """Test coroutine results are cached, not the coroutines"""
+        calls = []
+        
+        @ttl_cache(ttl=5)
+        async def fetch(x):
+            calls.append(x)
+            return {'x': x}
+        
+        assert await fetch(1) == await fetch(1) == {'x': 1}
+        assert calls == [1]
+        
+        clock.advance(6)
+        await fetch(1)
+        assert calls == [1, 1]
+    
+    @pytest.mark.parametrize("cache_empty,expected_calls", [(False, 2), (True, 1)])
+    async def test_empty_results(self, clock, cache_empty, expected_calls):
+        """Test failed (empty) results are retried unless cache_empty is set"""
+        calls = []
+        
+        @ttl_cache(ttl=5, cache_empty=cache_empty)
+        async def fetch(x):
+            calls.append(x)
+            return []
+        
+        await fetch(1)
+        await fetch(1)
+        assert len(calls) == expected_calls
+    
+    def test_is_empty(self, clock):
+        """Test is_empty keeps results that are never falsy out of the cache"""
+        calls = []
+        
+        @ttl_cache(ttl=5, is_empty=lambda rows: len(rows[0]) == 0)
+        def fetch(x):
+            calls.append(x)
+            return ([], x)
+        
+        fetch(1)
+        fetch(1)
+        assert len(calls) == 2
+    
+    def test_custom_key(self, clock):
+        """Test calls that map to the same key share one entry"""
+        calls = []
+        
+        @ttl_cache(ttl=5, key=lambda lat, lon: (round(lat, 1), round(lon, 1)))
+        def lookup(lat, lon):
+            calls.append((lat, lon))
+            return len(calls)
+        
+        assert lookup(37.771, -122.419) == lookup(37.774, -122.421) == 1
+        assert lookup(37.9, -122.4) == 2
+        assert lookup.cache is not None and len(lookup.cache) == 2
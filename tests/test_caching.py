@@ -0,0 +1,100 @@
+"""
+Tests for the endpoint response cache
+"""
+import pytest
+import asyncio
+import httpx
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.api.caching import cached_response
+
+
+def _app(ttl=30):
+    """Throwaway app with cached endpoints returning a dict, a Response and a stream"""
+    app = FastAPI()
+    app.state.calls = []
+    app.state.responses = []
+
+    @app.get("/data")
+    @cached_response(ttl=ttl)
+    async def data(n: int = 0):
+        app.state.calls.append("data")
+        return {"n": n}
+
+    @app.get("/raw")
+    @cached_response(ttl=ttl)
+    async def raw():
+        app.state.calls.append("raw")
+        response = Response(content='{"raw": true}', media_type="application/json",
+                            headers={"X-Source": "endpoint"})
+        app.state.responses.append(response)
+        return response
+
+    @app.get("/stream")
+    @cached_response(ttl=ttl)
+    async def stream():
+        app.state.calls.append("stream")
+        return StreamingResponse(iter([b"chunk"]))
+
+    return app
+
+
+class TestCachedResponse:
+    """Test hits, misses and what each request gets back"""
+
+    def test_keyed_by_query(self):
+        """Test repeated queries hit and a different query misses"""
+        app = _app()
+        client = TestClient(app)
+
+        statuses = [client.get("/data", params={"n": n}).headers["X-Cache"] for n in (1, 1, 2)]
+
+        assert statuses == ["MISS", "HIT", "MISS"]
+        assert app.state.calls == ["data", "data"]
+
+    def test_response_rebuilt_per_request(self):
+        """Test a hit copies the endpoint's Response instead of sharing and mutating it"""
+        app = _app()
+        client = TestClient(app)
+
+        miss, hit = client.get("/raw"), client.get("/raw")
+
+        assert (miss.headers["X-Cache"], hit.headers["X-Cache"]) == ("MISS", "HIT")
+        assert hit.content == miss.content == b'{"raw": true}'
+        assert hit.headers["X-Source"] == "endpoint"
+        assert hit.headers["content-type"] == "application/json"
+        assert len(app.state.responses) == 1
+        assert "X-Cache" not in app.state.responses[0].headers
+
+    async def test_concurrent_hits_get_own_headers(self):
+        """Test concurrent requests each get a separate Response with its own X-Cache"""
+        app = _app()
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/raw")
+            responses = await asyncio.gather(*(client.get("/raw") for _ in range(10)))
+
+        assert [r.headers["X-Cache"] for r in responses] == ["HIT"] * 10
+        assert all(r.headers.get_list("X-Cache") == ["HIT"] for r in responses)
+        assert app.state.calls == ["raw"]
+
+    def test_streaming_not_cached(self):
+        """Test a streaming response, which has no body to keep, runs every time"""
+        app = _app()
+        client = TestClient(app)
+
+        assert client.get("/stream").content == client.get("/stream").content == b"chunk"
+        assert app.state.calls == ["stream", "stream"]
+
+    @pytest.mark.parametrize("path", ["/data", "/raw"])
+    def test_zero_ttl_disables(self, path):
+        """Test a ttl of 0 calls the endpoint on every request"""
+        app = _app(ttl=0)
+        client = TestClient(app)
+
+        first, second = client.get(path), client.get(path)
+
+        assert first.content == second.content
+        assert "X-Cache" not in second.headers
+        assert len(app.state.calls) == 2
@@ -0,0 +1,173 @@
+"""
+Tests for the batched data collectors, against mocked aiohttp responses
+"""
+import pytest
+import numpy as np
+from contextlib import asynccontextmanager
+
+from src.data.data_collector import SeismicDataCollector, WeatherDataCollector
+from src.utils.geo import haversine_km
+
+
+class FakeResponse:
+    """aiohttp response stand-in with a status and a JSON body"""
+    
+    def __init__(self, status, payload):
+        self.status = status
+        self._payload = payload
+    
+    async def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """aiohttp session stand-in answering each GET from handler(url, params)"""
+    
+    closed = False
+    
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+    
+    @asynccontextmanager
+    async def get(self, url, params=None, **kwargs):
+        self.calls.append((url, dict(params or {})))
+        yield FakeResponse(*self.handler(url, params or {}))
+
+
+def _weather_item(station_id, temp):
+    """OpenWeather current-weather body for one city"""
+    return {
+        'id': station_id,
+        'main': {'temp': temp, 'humidity': 50, 'pressure': 1010},
+        'wind': {'speed': 3.0, 'deg': 90},
+        'visibility': 10000
+    }
+
+
+def _without_timestamp(records):
+    return [{key: value for key, value in record.items() if key != 'timestamp'} for record in records]
+
+
+@pytest.fixture(autouse=True)
+def clear_collector_caches():
+    """The ttl_cache decorators are shared by every collector instance"""
+    for method in (WeatherDataCollector.get_current_weather, WeatherDataCollector.get_current_weather_batch,
+                   SeismicDataCollector.get_recent_earthquakes, SeismicDataCollector.get_recent_earthquakes_batch):
+        method.cache.clear()
+    yield
+
+
+class TestWeatherBatch:
+    """Test get_current_weather_batch against per-location requests"""
+    
+    # 45 locations, so known stations span three group requests
+    COORDS = [(30.0 + i * 0.5, -100.0 + i * 0.25) for i in range(45)]
+    
+    @staticmethod
+    def _station(lat, lon):
+        return 1000 + int(round((lat - 30.0) / 0.5))
+    
+    def _handler(self, failing_groups=()):
+        def handler(url, params):
+            if url.endswith('/weather'):
+                station = self._station(params['lat'], params['lon'])
+                return 200, _weather_item(station, float(station % 40))
+            ids = [int(i) for i in params['id'].split(',')]
+            if ids[0] in failing_groups:
+                return 500, {}
+            return 200, {'list': [_weather_item(i, float(i % 40)) for i in ids]}
+        return handler
+    
+    async def test_first_call_learns_stations(self):
+        """Test unknown locations are fetched one by one and match get_current_weather"""
+        collector = WeatherDataCollector('key', session=FakeSession(self._handler()))
+        batch = await collector.get_current_weather_batch(self.COORDS)
+        
+        single = [await collector.get_current_weather(lat, lon) for lat, lon in self.COORDS]
+        assert _without_timestamp(batch) == _without_timestamp(single)
+        assert all(url.endswith('/weather') for url, _ in collector.session.calls)
+    
+    async def test_known_stations_grouped_by_20(self):
+        """Test known stations are fetched 20 ids per group request, in the caller's order"""
+        session = FakeSession(self._handler())
+        collector = WeatherDataCollector('key', session=session)
+        first = await collector.get_current_weather_batch(self.COORDS)
+        session.calls.clear()
+        
+        second = await collector.get_current_weather_batch(list(self.COORDS))
+        second_again = await collector.get_current_weather_batch(list(reversed(self.COORDS)))
+        
+        groups = [params['id'].split(',') for url, params in session.calls]
+        assert all(url.endswith('/group') for url, _ in session.calls)
+        assert [len(ids) for ids in groups[:3]] == [20, 20, 5]
+        assert _without_timestamp(second) == _without_timestamp(first)
+        assert _without_timestamp(second_again) == _without_timestamp(first)[::-1]
+    
+    async def test_failed_group_drops_only_its_locations(self):
+        """Test a failing group request loses its own locations and keeps the rest"""
+        collector = WeatherDataCollector('key', session=FakeSession(self._handler(failing_groups=(1020,))))
+        await collector.get_current_weather_batch(self.COORDS)
+        collector.get_current_weather_batch.cache.clear()
+        
+        results = await collector.get_current_weather_batch(self.COORDS)
+        
+        assert [(r['latitude'], r['longitude']) for r in results] == self.COORDS[:20] + self.COORDS[40:]
+
+
+def _usgs_events(events):
+    """USGS GeoJSON body for (event_id, lat, lon, magnitude) tuples"""
+    return {'features': [
+        {
+            'properties': {'mag': mag, 'time': 1700000000000, 'ids': event_id, 'magType': 'ml',
+                           'place': 'somewhere', 'sig': 100},
+            'geometry': {'coordinates': [lon, lat, 10.0]}
+        }
+        for event_id, lat, lon, mag in events
+    ]}
+
+
+def _box_handler(events):
+    """USGS stand-in returning the events inside the requested bounding box"""
+    def handler(url, params):
+        inside = [
+            event for event in events
+            if params['minlatitude'] <= event[1] <= params['maxlatitude']
+            and params['minlongitude'] <= event[2] <= params['maxlongitude']
+        ]
+        return 200, _usgs_events(inside)
+    return handler
+
+
+class TestSeismicBatch:
+    """Test get_recent_earthquakes_batch keeps exactly the events within radius of a location"""
+    
+    @pytest.fixture(scope="class")
+    def events(self):
+        rng = np.random.default_rng(42)
+        lats = rng.uniform(-60, 60, 3000)
+        lons = rng.uniform(-180, 180, 3000)
+        return [(f'ev{i}', float(lat), float(lon), 3.0) for i, (lat, lon) in enumerate(zip(lats, lons))]
+    
+    @pytest.mark.parametrize("coords", [
+        [(37.77, -122.42), (34.05, -118.24), (47.61, -122.33)],
+        [(0.0, 179.9)],
+        [(-15.0, -178.0), (10.0, -175.0)],
+        [(55.0, 10.0)]
+    ])
+    async def test_matches_haversine_filter(self, events, coords):
+        """Test one box query returns what per-location radius searches would, across ±180 too"""
+        collector = SeismicDataCollector(session=FakeSession(_box_handler(events)))
+        batch = await collector.get_recent_earthquakes_batch(coords, radius_km=500)
+        
+        expected = {
+            event_id for event_id, lat, lon, _ in events
+            if any(haversine_km(lat, lon, lat0, lon0) <= 500 for lat0, lon0 in coords)
+        }
+        assert set(batch.event_id) == expected
+        assert len(collector.session.calls) == 1
+    
+    async def test_error_status_gives_empty_batch(self):
+        """Test a USGS error returns an empty batch"""
+        collector = SeismicDataCollector(session=FakeSession(lambda url, params: (503, {})))
+        assert len(await collector.get_recent_earthquakes_batch([(0.0, 0.0)])) == 0
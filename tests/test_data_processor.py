@@ -0,0 +1,444 @@
+"""
+Tests for the data processing pipeline
+"""
+import math
+import pytest
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.data import data_processor
+from src.data.data_processor import DataProcessor
+from src.models.database import Base, SeismicData, WeatherData
+
+
+LOCATION = {'latitude': 37.7749, 'longitude': -122.4194}
+
+
+@pytest.fixture
+def processor():
+    """Processor without a database; validation needs none"""
+    return DataProcessor()
+
+
+class TestTimestampParsing:
+    """Test the timestamp forms accepted by the process_* methods"""
+    
+    @pytest.mark.parametrize("timestamp,expected", [
+        ('2024-01-01T12:00:00', datetime(2024, 1, 1, 12)),
+        ('2024-01-01T12:00:00Z', datetime(2024, 1, 1, 12)),
+        ('2024-01-01T14:00:00+02:00', datetime(2024, 1, 1, 12)),
+        ('2024-01-01', datetime(2024, 1, 1)),
+        (datetime(2024, 1, 1, 12), datetime(2024, 1, 1, 12)),
+        (datetime(2024, 1, 1, 12, tzinfo=timezone.utc), datetime(2024, 1, 1, 12))
+    ])
+    def test_parsed_to_naive_utc(self, processor, timestamp, expected):
+        """Test strings and datetimes come back as naive UTC datetimes"""
+        [record] = processor.process_weather_data([{**LOCATION, 'timestamp': timestamp}])
+        assert record['timestamp'] == expected
+    
+    @pytest.mark.parametrize("timestamp", [1700000000, 1700000000.5])
+    def test_epoch_numbers_fall_back_to_now(self, processor, timestamp):
+        """Test numeric timestamps keep the record, stamped with the current time"""
+        before = datetime.utcnow()
+        [record] = processor.process_weather_data([{**LOCATION, 'timestamp': timestamp}])
+        assert before <= record['timestamp'] <= datetime.utcnow()
+    
+    def test_mixed_column(self, processor):
+        """Test each value in a mixed batch is parsed on its own"""
+        records = processor.process_weather_data([
+            {**LOCATION, 'timestamp': 1700000000},
+            {**LOCATION, 'timestamp': '2024-01-01T00:00:00Z'},
+            {**LOCATION, 'timestamp': 'not a timestamp'}
+        ])
+        
+        assert len(records) == 2
+        assert datetime.utcnow() - records[0]['timestamp'] < timedelta(minutes=1)
+        assert records[1]['timestamp'] == datetime(2024, 1, 1)
+    
+    def test_unparseable_string_dropped(self, processor):
+        """Test a record whose timestamp string cannot be parsed is dropped"""
+        assert processor.process_weather_data([{**LOCATION, 'timestamp': '31/12/2024'}]) == []
+    
+    def test_missing_gauge_timestamp_is_now(self, processor):
+        """Test gauge readings without a timestamp are taken as current"""
+        before = datetime.utcnow()
+        [record] = processor.process_river_gauge_data([{**LOCATION, 'gauge_id': 'g1'}])
+        assert before <= record['timestamp'] <= datetime.utcnow()
+
+
+class TestWeatherProcessing:
+    """Test validation of weather records"""
+    
+    def test_clean_record(self, processor, sample_weather_data):
+        """Test valid records pass through with every field kept"""
+        records = processor.process_weather_data(sample_weather_data)
+        
+        assert len(records) == len(sample_weather_data)
+        assert records[0]['temperature'] == sample_weather_data[0]['temperature']
+        assert records[0]['source'] == 'test'
+    
+    @pytest.mark.parametrize("field,value", [
+        ('temperature', 75.0),
+        ('humidity', 150),
+        ('pressure', 500),
+        ('precipitation', -1),
+        ('wind_direction', 361)
+    ])
+    def test_out_of_range_optional_field_nulled(self, processor, field, value):
+        """Test an out-of-range optional value is nulled and the record kept"""
+        [record] = processor.process_weather_data([{**LOCATION, 'timestamp': '2024-01-01', field: value}])
+        assert record[field] is None
+    
+    @pytest.mark.parametrize("field,value", [('latitude', 95), ('longitude', -181), ('latitude', 'north')])
+    def test_invalid_coordinates_dropped(self, processor, field, value):
+        """Test records with unusable coordinates are dropped"""
+        assert processor.process_weather_data([{**LOCATION, 'timestamp': '2024-01-01', field: value}]) == []
+    
+    def test_dirty_values(self, processor):
+        """Test numeric strings are parsed and other junk becomes None"""
+        [record] = processor.process_weather_data([{
+            **LOCATION, 'timestamp': '2024-01-01',
+            'temperature': '21.5', 'pressure': 'n/a', 'humidity': None, 'source': None
+        }])
+        
+        assert record['temperature'] == 21.5
+        assert record['pressure'] is None
+        assert record['humidity'] is None
+        assert record['visibility'] is None
+        assert record['source'] == 'unknown'
+    
+    def test_missing_or_null_required_field(self, processor):
+        """Test records missing a required field, or holding None in it, are skipped"""
+        records = processor.process_weather_data([
+            {**LOCATION, 'timestamp': '2024-01-01'},
+            {'latitude': 37.0, 'timestamp': '2024-01-01'},
+            {**LOCATION, 'timestamp': None}
+        ])
+        assert len(records) == 1
+    
+    def test_empty_batch(self, processor):
+        """Test an empty batch gives no records"""
+        assert processor.process_weather_data([]) == []
+
+
+class TestSeismicProcessing:
+    """Test validation of seismic records"""
+    
+    def test_clean_records(self, processor, sample_seismic_data):
+        """Test valid events pass through"""
+        records = processor.process_seismic_data(sample_seismic_data)
+        
+        assert [r['event_id'] for r in records] == [r['event_id'] for r in sample_seismic_data]
+        assert records[0]['magnitude'] == sample_seismic_data[0]['magnitude']
+    
+    def test_invalid_magnitude_dropped(self, processor):
+        """Test events with a negative or missing magnitude are dropped"""
+        base = {**LOCATION, 'timestamp': '2024-01-01'}
+        records = processor.process_seismic_data([
+            {**base, 'event_id': 'a', 'magnitude': -1},
+            {**base, 'event_id': 'b', 'magnitude': None},
+            {**base, 'event_id': 'c', 'magnitude': 4.5, 'depth': -3}
+        ])
+        
+        assert [r['event_id'] for r in records] == ['c']
+        assert records[0]['depth'] is None
+    
+    def test_numeric_event_id(self, processor):
+        """Test integer event ids stay '7' even when another record lacks one"""
+        base = {**LOCATION, 'timestamp': '2024-01-01', 'magnitude': 3.0}
+        [record] = processor.process_seismic_data([{**base, 'event_id': 7}, {**base, 'event_id': None}])
+        assert record['event_id'] == '7'
+
+
+class TestRiverGaugeProcessing:
+    """Test validation of river gauge records"""
+    
+    def test_clean_records(self, processor, sample_river_data):
+        """Test valid readings pass through"""
+        records = processor.process_river_gauge_data(sample_river_data)
+        
+        assert len(records) == len(sample_river_data)
+        assert records[0]['flood_stage'] == 4.0
+    
+    def test_dirty_values(self, processor):
+        """Test negative levels are nulled and numeric strings parsed"""
+        [record] = processor.process_river_gauge_data([
+            {**LOCATION, 'gauge_id': 7, 'water_level': -1, 'flow_rate': '5'},
+            {**LOCATION, 'gauge_id': None}
+        ])
+        
+        assert record['gauge_id'] == '7'
+        assert record['water_level'] is None
+        assert record['flow_rate'] == 5.0
+        assert record['river_name'] == ''
+
+
+class TestAnomalyDetection:
+    """Test detect_anomalies flags outliers on the float32 scan arrays"""
+    
+    @pytest.mark.parametrize("temperature", [20.1, -3.3, 36.6])
+    def test_identical_readings_not_flagged(self, processor, temperature):
+        """Test a batch of equal readings has no temperature or precipitation anomaly"""
+        data = [{**LOCATION, 'temperature': temperature, 'precipitation': 1.1} for _ in range(20)]
+        assert processor.detect_anomalies(data, 'weather') == []
+    
+    def test_weather_outliers(self, processor):
+        """Test a temperature outlier and the heaviest rain are flagged with their thresholds"""
+        data = [{**LOCATION, 'temperature': 20.0 + 0.1 * (i % 5), 'precipitation': 0.5} for i in range(40)]
+        data.append({**LOCATION, 'temperature': 60.0, 'precipitation': 30.0})
+        
+        anomalies = processor.detect_anomalies(data, 'weather')
+        
+        temperatures = np.array([r['temperature'] for r in data], dtype=np.float32).astype(np.float64)
+        assert [(a['type'], a['value']) for a in anomalies] == [
+            ('temperature_anomaly', 60.0), ('heavy_precipitation', 30.0)
+        ]
+        assert anomalies[0]['threshold'] == pytest.approx(3 * temperatures.std(ddof=1))
+        assert anomalies[1]['threshold'] == pytest.approx(0.5)
+    
+    def test_seismic_and_gauge(self, processor):
+        """Test magnitudes from 5.0 and levels over flood stage are flagged"""
+        quakes = [{**LOCATION, 'magnitude': magnitude} for magnitude in (4.9, 5.0, 6.2)]
+        gauges = [{**LOCATION, 'water_level': level, 'flood_stage': 4.0} for level in (3.9, 4.0, 4.1)]
+        
+        assert [a['value'] for a in processor.detect_anomalies(quakes, 'seismic')] == [5.0, 6.2]
+        assert [a['value'] for a in processor.detect_anomalies(gauges, 'river_gauge')] == [4.1]
+
+
+def _without_timestamp(aggregate):
+    """Aggregate minus its computed-at timestamp, for comparing two runs"""
+    return {key: value for key, value in aggregate.items() if key != 'timestamp'}
+
+
+@pytest.fixture(scope="module")
+def global_weather():
+    """Weather records scattered over the globe"""
+    rng = np.random.default_rng(42)
+    return [
+        {'latitude': lat, 'longitude': lon, 'temperature': temp, 'precipitation': rain}
+        for lat, lon, temp, rain in zip(rng.uniform(-90, 90, 3000), rng.uniform(-180, 180, 3000),
+                                        rng.normal(15, 10, 3000), rng.exponential(2, 3000))
+    ]
+
+
+class TestSpatialIndex:
+    """Test build_index gives the same aggregates as the haversine scan"""
+    
+    @pytest.mark.parametrize("location", [(37.7749, -122.4194), (0.0, 179.9), (89.5, 0.0)])
+    @pytest.mark.parametrize("radius_km", [100, 1000, 5000, 25000])
+    def test_matches_scan(self, global_weather, location, radius_km):
+        """Test indexed aggregates equal unindexed ones, including radii past the antipode"""
+        indexed = DataProcessor()
+        indexed.build_index(global_weather)
+        
+        expected = DataProcessor().aggregate_weather_data(global_weather, location, radius_km)
+        result = indexed.aggregate_weather_data(global_weather, location, radius_km)
+        
+        assert result.keys() == expected.keys()
+        for key, value in _without_timestamp(expected).items():
+            assert result[key] == pytest.approx(value)
+    
+    def test_index_ignored_after_batch_grows(self, global_weather):
+        """Test records appended after build_index are still found"""
+        data = list(global_weather)
+        processor = DataProcessor()
+        processor.build_index(data)
+        data.append({'latitude': 10.0, 'longitude': 10.0, 'temperature': 99.0})
+        
+        result = processor.aggregate_weather_data(data, (10.0, 10.0), 1)
+        
+        assert result['count'] == 1
+        assert result['avg_temperature'] == 99.0
+
+
+class TestParallelProcessing:
+    """Test process_data_parallel returns what the serial process_* methods do"""
+    
+    @pytest.fixture
+    def dirty_weather(self, sample_weather_data):
+        """Weather batch with invalid records mixed in"""
+        return [
+            {**record, 'latitude': 95} if i % 7 == 0 else
+            {**record, 'humidity': 150} if i % 5 == 0 else record
+            for i, record in enumerate(sample_weather_data * 3)
+        ]
+    
+    @pytest.mark.parametrize("data_type,fixture", [
+        ('weather', 'dirty_weather'),
+        ('seismic', 'sample_seismic_data'),
+        ('river_gauge', 'sample_river_data')
+    ])
+    def test_matches_serial(self, processor, monkeypatch, request, data_type, fixture):
+        """Test the process pool result equals the serial one, in order"""
+        raw_data = request.getfixturevalue(fixture)
+        expected = getattr(processor, data_processor.PROCESS_METHODS[data_type])(raw_data)
+        monkeypatch.setattr(data_processor, "PARALLEL_MIN_RECORDS", 0)
+        
+        assert processor.process_data_parallel(data_type, raw_data, workers=3) == expected
+    
+    def test_small_batch_stays_in_process(self, processor, monkeypatch, sample_weather_data):
+        """Test batches under PARALLEL_MIN_RECORDS never start a pool"""
+        def no_pool(*args, **kwargs):
+            raise AssertionError("process pool started")
+        monkeypatch.setattr(data_processor, "ProcessPoolExecutor", no_pool)
+        
+        records = processor.process_data_parallel('weather', sample_weather_data, workers=4)
+        
+        assert records == processor.process_weather_data(sample_weather_data)
+
+
+class TestBulkInsert:
+    """Test bulk_insert against inserting records one by one through the ORM"""
+    
+    @pytest.fixture
+    def db_processor(self, tmp_path):
+        """Processor bound to a fresh SQLite database"""
+        processor = DataProcessor(f"sqlite:///{tmp_path / 'bulk.db'}")
+        Base.metadata.create_all(processor.engine)
+        yield processor
+        processor.engine.dispose()
+    
+    @staticmethod
+    def _rows(engine, model):
+        """Every row of model's table, without the generated columns"""
+        with Session(engine) as session:
+            return [
+                {column: getattr(row, column) for column in ('timestamp', 'latitude', 'longitude', 'temperature', 'source')}
+                for row in session.query(model).order_by(model.id)
+            ]
+    
+    def test_matches_orm_inserts(self, db_processor, tmp_path, sample_weather_data):
+        """Test the executemany insert stores the same rows as per-record session.add"""
+        records = db_processor.process_weather_data(sample_weather_data)
+        
+        reference = create_engine(f"sqlite:///{tmp_path / 'reference.db'}")
+        Base.metadata.create_all(reference)
+        with Session(reference) as session:
+            session.add_all(WeatherData(**record) for record in records)
+            session.commit()
+        
+        assert db_processor.bulk_insert('weather', records) == len(records)
+        assert self._rows(db_processor.engine, WeatherData) == self._rows(reference, WeatherData)
+        reference.dispose()
+    
+    def test_existing_events_skipped(self, db_processor, sample_seismic_data):
+        """Test re-sending an event_id leaves the stored row alone instead of failing the batch"""
+        records = db_processor.process_seismic_data(sample_seismic_data)
+        db_processor.bulk_insert('seismic', records[:10])
+        
+        changed = [{**record, 'place': 'changed'} for record in records]
+        db_processor.bulk_insert('seismic', changed)
+        
+        with Session(db_processor.engine) as session:
+            assert session.query(SeismicData).count() == len(records)
+            assert session.query(SeismicData).filter_by(place='changed').count() == len(records) - 10
+    
+    def test_check_constraint_rejects_batch(self, db_processor):
+        """Test an out-of-range value the processor did not clean fails the whole insert"""
+        records = [
+            {'timestamp': datetime(2024, 1, 1), 'latitude': 0.0, 'longitude': 0.0, 'humidity': 50.0},
+            {'timestamp': datetime(2024, 1, 1), 'latitude': 0.0, 'longitude': 0.0, 'humidity': 150.0}
+        ]
+        
+        assert db_processor.bulk_insert('weather', records) == 0
+        with Session(db_processor.engine) as session:
+            assert session.query(WeatherData).count() == 0
+    
+    def test_requires_database(self, processor):
+        """Test bulk_insert without a database_url raises"""
+        with pytest.raises(ValueError):
+            processor.bulk_insert('weather', [{'latitude': 0.0}])
+
+
+class TestStreamProcessing:
+    """Test stream_process against the batch methods and a recomputed history"""
+    
+    @pytest.fixture(scope="class")
+    def stream_weather(self):
+        """Weather feed around LOCATION with a few spikes and some unusable records"""
+        rng = np.random.default_rng(7)
+        records = []
+        for i in range(400):
+            record = {
+                **LOCATION, 'timestamp': datetime(2024, 1, 1) + timedelta(minutes=i),
+                'temperature': float(rng.normal(15, 2)), 'precipitation': float(rng.exponential(1.5))
+            }
+            if i % 97 == 50:
+                record['temperature'] = 40.0
+            if i % 31 == 0:
+                record['latitude'] = 95  # invalid
+            if i % 43 == 0:
+                record['longitude'] = 0.0  # far away
+            records.append(record)
+        return records
+    
+    def test_running_stats_match_numpy(self):
+        """Test Welford's mean and std match the two-pass computation"""
+        values = np.random.default_rng(3).normal(100, 25, 1000)
+        stats = data_processor.RunningStats()
+        for value in values:
+            stats.update(value)
+        
+        assert stats.mean == pytest.approx(values.mean())
+        assert stats.std == pytest.approx(values.std(ddof=1))
+    
+    def test_records_match_batch(self, processor, stream_weather):
+        """Test streamed records equal process_weather_data's, minus those out of radius"""
+        location = (LOCATION['latitude'], LOCATION['longitude'])
+        expected = [
+            record for record in processor.process_weather_data(stream_weather)
+            if processor._calculate_distance(location, (record['latitude'], record['longitude'])) <= 50
+        ]
+        
+        streamed = [record for record, _ in processor.stream_process(stream_weather, location)]
+        
+        assert streamed == expected
+    
+    def test_temperature_flags_match_history(self, processor, stream_weather):
+        """Test each temperature flag equals the 3-sigma check over the records streamed before it"""
+        location = (LOCATION['latitude'], LOCATION['longitude'])
+        feed = [{**record, 'precipitation': None} for record in stream_weather]
+        results = list(processor.stream_process(feed, location))
+        
+        temperatures = np.array([record['temperature'] for record, _ in results])
+        expected = [
+            i > 1 and abs(temperatures[i] - temperatures[:i].mean()) > 3 * temperatures[:i].std(ddof=1)
+            for i in range(len(results))
+        ]
+        
+        assert [flagged for _, flagged in results] == expected
+        assert all(flagged for record, flagged in results if record['temperature'] == 40.0)
+    
+    @pytest.mark.parametrize("q", [0.5, 0.95])
+    @pytest.mark.parametrize("distribution", ['exponential', 'normal', 'uniform'])
+    def test_running_quantile_matches_numpy(self, q, distribution):
+        """Test the P-squared estimate lands near the exact quantile"""
+        values = getattr(np.random.default_rng(5), distribution)(size=5000)
+        quantile = data_processor.RunningQuantile(q)
+        for value in values:
+            quantile.update(float(value))
+        
+        assert quantile.value == pytest.approx(np.quantile(values, q), rel=0.02, abs=0.02)
+    
+    def test_running_quantile_exact_for_few_values(self):
+        """Test the estimate interpolates like numpy until the markers take over"""
+        quantile = data_processor.RunningQuantile(0.95)
+        assert math.isnan(quantile.value)
+        for value in (3.0, 1.0, 2.0):
+            quantile.update(value)
+        assert quantile.value == pytest.approx(np.quantile([1.0, 2.0, 3.0], 0.95))
+    
+    def test_precipitation_flags_top_5_percent(self, processor):
+        """Test about 5% of readings are flagged, as detect_anomalies does on the whole batch"""
+        rain = np.random.default_rng(11).exponential(1.5, 5000)
+        feed = [{**LOCATION, 'timestamp': '2024-01-01', 'precipitation': float(value)} for value in rain]
+        
+        flags = np.array([flagged for _, flagged in processor.stream_process(feed, (LOCATION['latitude'], LOCATION['longitude']))])
+        batch = processor.detect_anomalies(processor.process_weather_data(feed), 'weather')
+        
+        assert 0.04 < flags.mean() < 0.07
+        assert len(batch) / len(rain) == pytest.approx(flags.mean(), abs=0.015)
+        # Once warmed up, only readings near or above the batch 95th percentile are flagged
+        assert rain[1000:][flags[1000:]].min() == pytest.approx(np.quantile(rain, 0.95), rel=0.05)
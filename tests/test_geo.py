@@ -0,0 +1,104 @@
+"""
+Tests for the vectorized distance helpers
+"""
+import pytest
+import numpy as np
+
+from src.data.data_processor import DataProcessor
+from src.utils import geo
+from src.utils.geo import bbox_mask, haversine_km
+
+SEED = 42
+
+
+@pytest.fixture(scope="module")
+def points():
+    """Random points over the whole globe, as (lats, lons)"""
+    rng = np.random.default_rng(SEED)
+    return rng.uniform(-90, 90, 2000), rng.uniform(-180, 180, 2000)
+
+
+def _reference_km(lats, lons, lat0, lon0):
+    """Distances from the per-record haversine the processor used before vectorizing"""
+    processor = DataProcessor()
+    return np.array([processor._calculate_distance((lat0, lon0), (lat, lon)) for lat, lon in zip(lats, lons)])
+
+
+# Reference points in the middle of a continent, on the antimeridian and next to a pole
+CENTERS = [(37.7749, -122.4194), (0.0, 179.9), (-10.0, -179.95), (89.5, 0.0), (-89.9, 45.0)]
+
+
+class TestHaversine:
+    """Test haversine_km against the per-record formula"""
+    
+    @pytest.mark.parametrize("lat0,lon0", CENTERS)
+    def test_matches_per_record(self, points, lat0, lon0):
+        """Test the vectorized distances match the scalar haversine"""
+        lats, lons = points
+        np.testing.assert_allclose(haversine_km(lats, lons, lat0, lon0),
+                                   _reference_km(lats, lons, lat0, lon0), rtol=1e-9, atol=1e-6)
+    
+    @pytest.mark.parametrize("lat0,lon0", CENTERS)
+    def test_kernel_matches_numpy(self, points, lat0, lon0):
+        """Test the parallel kernel agrees with the NumPy path it replaces"""
+        lats, lons = points
+        expected = haversine_km(lats, lons, lat0, lon0)
+        np.testing.assert_allclose(geo._haversine_kernel(lats, lons, lat0, lon0, np.empty_like(lats)),
+                                   expected, rtol=1e-9, atol=1e-6)
+    
+    def test_kernel_used_for_large_batches(self, points, monkeypatch):
+        """Test large 1-D batches take the kernel once enough threads are available"""
+        monkeypatch.setattr(geo, "get_num_threads", lambda: geo.JIT_MIN_THREADS)
+        monkeypatch.setattr(geo, "JIT_MIN_POINTS", 10)
+        calls = []
+        kernel = geo._haversine_kernel
+        monkeypatch.setattr(geo, "_haversine_kernel", lambda *args: calls.append(1) or kernel(*args))
+        
+        lats, lons = points
+        distances = haversine_km(lats, lons, 10.0, 20.0)
+        
+        assert calls
+        np.testing.assert_allclose(distances, _reference_km(lats, lons, 10.0, 20.0), rtol=1e-9, atol=1e-6)
+    
+    def test_broadcasts_over_reference_points(self):
+        """Test many reference points against one point give the same distances"""
+        lats = np.array([0.0, 45.0, -30.0])
+        lons = np.array([0.0, 90.0, 170.0])
+        np.testing.assert_allclose(haversine_km(10.0, 20.0, lats, lons), haversine_km(lats, lons, 10.0, 20.0))
+
+
+class TestBoundingBox:
+    """Test bbox_mask never drops a point inside the radius"""
+    
+    @pytest.mark.parametrize("lat0,lon0", CENTERS)
+    @pytest.mark.parametrize("radius_km", [1, 50, 500, 5000])
+    def test_contains_every_point_in_radius(self, points, lat0, lon0, radius_km):
+        """Test every point within radius_km is inside the box"""
+        lats, lons = points
+        within = _reference_km(lats, lons, lat0, lon0) <= radius_km
+        assert not (within & ~bbox_mask(lats, lons, lat0, lon0, radius_km)).any()
+    
+    def test_wraps_across_antimeridian(self):
+        """Test points just across longitude ±180 stay in the box"""
+        mask = bbox_mask(np.array([0.0, 0.0, 0.0]), np.array([-179.9, 179.9, 0.0]), 0.0, 179.95, 50)
+        assert mask.tolist() == [True, True, False]
+    
+    def test_prefilters(self, points):
+        """Test the box discards most far points for a small radius"""
+        lats, lons = points
+        assert bbox_mask(lats, lons, 37.7749, -122.4194, 50).sum() < 10
+
+
+class TestRadiusFilter:
+    """Test aggregate_weather_data selects the same records as a per-record scan"""
+    
+    @pytest.mark.parametrize("lat0,lon0", CENTERS)
+    def test_count_matches_per_record(self, points, lat0, lon0):
+        """Test the aggregate counts exactly the records the scalar haversine keeps"""
+        lats, lons = points
+        data = [{'latitude': lat, 'longitude': lon, 'temperature': 20.0} for lat, lon in zip(lats, lons)]
+        expected = int((_reference_km(lats, lons, lat0, lon0) <= 2000).sum())
+        
+        result = DataProcessor().aggregate_weather_data(data, (lat0, lon0), radius_km=2000)
+        
+        assert result.get('count', 0) == expected